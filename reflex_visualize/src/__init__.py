@@ -1,8 +1,20 @@
 """REFLEX Dataset visualization for analyzing human-robot interaction."""
-from src.core.data_types import VideoFrame, VisualizationConfig
-from src.core.video import VideoSource
-from .vis.visualizer import DataVisualizer
+import importlib
 
 __version__ = "1.0.0"
 __author__ = "Andreas Naoum"
 __email__ = "anaoum@kth.se"
+
+# Heavy dependencies (rerun, cv2, pandas) are only imported on first attribute access
+_LAZY_IMPORTS = {
+    'VideoFrame': '.core.data_types',
+    'VisualizationConfig': '.core.data_types',
+    'VideoSource': '.core.video',
+    'DataVisualizer': '.vis.visualizer',
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def main():
+    """Benchmark the available video decoder backends on a video file."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Video Decoder Benchmark")
+    parser.add_argument("video", type=Path, help="Video file to decode")
+    parser.add_argument("--frames", type=int, default=300,
+                        help="Number of frames decoded per backend")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale factor applied to the decoded frames")
+    parser.add_argument("--pixel-format", type=str, default="rgb", choices=["rgb", "bgr"],
+                        help="Pixel format of the decoded frames")
+    parser.add_argument("--threads", type=int, default=0,
+                        help="Decoder thread count (0 lets the decoder decide)")
+    parser.add_argument("--frame-path", action="store_true",
+                        help="Benchmark decoding plus JPEG encoding with a new array per frame "
+                             "against pooled BGR buffers, reporting throughput and allocations")
+    parser.add_argument("--jpeg-quality", type=int, default=15,
+                        help="JPEG quality used by --frame-path")
+    args = parser.parse_args()
+
+    if not args.video.is_file():
+        parser.error(f"Video not found: {args.video}")
+
+    from src.core.decoders import benchmark_backends, available_backends
+
+    if args.frame_path:
+        from src.vis.encoding import benchmark_frame_path
+
+        results = benchmark_frame_path(args.video, n_frames=args.frames, quality=args.jpeg_quality,
+                                       scale=args.scale, threads=args.threads)
+        print(f"{'backend':8s} {'path':10s} {'frames/s':>9s} {'buffers':>8s} {'allocated/frame':>16s}")
+        for name, setups in results.items():
+            for setup, result in setups.items():
+                print(f"{name:8s} {setup:10s} {result['fps']:9.1f} {result['buffers']:8d} "
+                      f"{result['transient'] / 1024:13.1f} KB")
+        return
+
+    print(f"Available backends: {', '.join(available_backends())}")
+    results = benchmark_backends(args.video, n_frames=args.frames, scale=args.scale,
+                                 pixel_format=args.pixel_format, threads=args.threads)
+    for name, fps in results.items():
+        print(f"  {name:8s} {fps:8.1f} frames/s")
+    if results:
+        print(f"Fastest: {next(iter(results))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import sys
+import time
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.manifest import DatasetManifest
+
+
+def main():
+    """Build or incrementally refresh the dataset manifest."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Manifest Builder")
+    parser.add_argument("--data-root", type=Path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="Manifest file (default: <data-root>/.reflex_manifest.json)")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Print a balanced work plan for this many workers")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+
+    start = time.perf_counter()
+    manifest = DatasetManifest.load_or_build(args.data_root, args.output)
+    elapsed = time.perf_counter() - start
+
+    print(f"Indexed {len(manifest)} participants in {elapsed:.2f}s")
+    for entry in manifest:
+        missing = f" (missing: {', '.join(entry.missing)})" if entry.missing else ""
+        print(f"  {entry.code}: {entry.total_size / 1e6:.1f} MB, {entry.frame_count} frames{missing}")
+
+    if args.workers:
+        for i, batch in enumerate(manifest.plan_batches(args.workers)):
+            print(f"Worker {i}: {', '.join(batch)}")
+
+
+if __name__ == "__main__":
+    main()
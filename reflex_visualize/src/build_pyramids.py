@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import os
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import select_participants
+
+
+def main():
+    """Precompute the min/max/mean pyramids of every numeric series into the cache."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Series Pyramids")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Folder for the levels (default: <data-root>/.reflex_cache/pyramids)")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to process (e.g. 'C3'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to process; all if omitted")
+    parser.add_argument("--factors", type=int, nargs="+", default=[8, 64, 512],
+                        help="Decimation factors of the levels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--force", action="store_true",
+                        help="Rebuild levels that are still current")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+    if any(factor < 2 for factor in args.factors):
+        parser.error("--factors must be at least 2 (factor 1 is the frame table itself)")
+
+    folders = select_participants(args.data_root, args.participant, args.strategy, largest_first=True)
+    if not folders:
+        parser.error("No participants selected")
+
+    from src.data_io.pyramids import build_all_pyramids
+
+    build_all_pyramids(folders, args.factors, args.cache_dir, workers=args.workers, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
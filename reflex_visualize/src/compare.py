@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import os
+import subprocess
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.core.data_types import ComparisonConfig
+from src.data_io.archive import as_data_path
+from src.utils.helpers import select_participants
+
+
+def main():
+    """Compare several participants around the same failure in one recording."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Multi-Participant Comparison")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to compare (e.g. 'C1 D2'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to compare; all if omitted")
+    parser.add_argument("--round", type=int, default=1,
+                        help="Round whose failure is the common onset")
+    parser.add_argument("--action", type=str, default="Pick", choices=["Pick", "Carry", "Place"],
+                        help="Action whose failure is the common onset")
+    parser.add_argument("--before", type=float, default=5.0,
+                        help="Seconds logged before the failure onset")
+    parser.add_argument("--after", type=float, default=20.0,
+                        help="Seconds logged after the failure onset")
+    parser.add_argument("--no-video", action="store_true",
+                        help="Leave out the thumbnail videos")
+    parser.add_argument("--thumbnail-width", type=int, default=160,
+                        help="Thumbnail video width in pixels")
+    parser.add_argument("--jpeg-quality", type=int, default=30,
+                        help="JPEG quality of the thumbnail videos (1-100)")
+    parser.add_argument("--decoder", type=str, default="opencv", choices=["opencv", "pyav", "ffmpeg"],
+                        help="Video decoder backend")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--output", type=Path, default=Path("comparison.rrd"),
+                        help="Merged .rrd file")
+    parser.add_argument("--headless", action="store_true",
+                        help="Only write the .rrd file, don't open the viewer")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+    if args.before < 0 or args.after <= 0:
+        parser.error("--before must not be negative and --after must be positive")
+    if args.thumbnail_width < 16 or not 1 <= args.jpeg_quality <= 100:
+        parser.error("--thumbnail-width must be at least 16 and --jpeg-quality between 1 and 100")
+
+    folders = select_participants(args.data_root, args.participant, args.strategy, largest_first=True)
+    if not folders:
+        parser.error("No participants selected")
+
+    from src.vis.comparison import build_comparison
+
+    config = ComparisonConfig(
+        round_no=args.round,
+        action=args.action,
+        before=args.before,
+        after=args.after,
+        video=not args.no_video,
+        thumbnail_width=args.thumbnail_width,
+        jpeg_quality=args.jpeg_quality,
+        decoder=args.decoder,
+        workers=args.workers,
+    )
+    done = build_comparison(folders, args.output, config)
+    if not done:
+        sys.exit(f"No participant has a Round {args.round} {args.action} failure")
+
+    print(f"Saved comparison to {args.output}")
+    if not args.headless:
+        subprocess.Popen([sys.executable, "-m", "rerun", str(args.output)])
+
+
+if __name__ == "__main__":
+    main()
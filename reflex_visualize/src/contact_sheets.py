@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import os
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import add_rerun_args, select_participants
+
+
+def main():
+    """Render the per-phase contact sheets of all participants into the cache."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Phase Contact Sheets")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--cache-dir", type=Path, default=None,
+                        help="Folder for the sheets (default: <data-root>/.reflex_cache/contact_sheets)")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to render (e.g. 'C3'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to render; all if omitted")
+    parser.add_argument("--per-phase", type=int, default=6,
+                        help="Thumbnails per phase and camera")
+    parser.add_argument("--width", type=int, default=160,
+                        help="Thumbnail width in pixels")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--decoder", type=str, default="opencv", choices=["opencv", "pyav", "ffmpeg"],
+                        help="Video decoder backend")
+    parser.add_argument("--log", action="store_true",
+                        help="Log the sheets to Rerun as static 'overview/<participant>' images")
+    add_rerun_args(parser)
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+    if args.per_phase < 1 or args.width < 16:
+        parser.error("--per-phase must be at least 1 and --width at least 16")
+
+    folders = select_participants(args.data_root, args.participant, args.strategy, largest_first=True)
+    if not folders:
+        parser.error("No participants selected")
+
+    from src.export.contact_sheets import build_contact_sheets, load_contact_sheet
+
+    done = build_contact_sheets(folders, args.cache_dir, per_phase=args.per_phase, width=args.width,
+                                workers=args.workers, decoder=args.decoder)
+
+    if args.log and done:
+        import rerun as rr
+
+        rr.script_setup(args, "REFLEX-Overview")
+        for code in done:
+            # Served from the cache filled above
+            sheet = load_contact_sheet(folders[code], args.cache_dir, args.per_phase, args.width, args.decoder)
+            rr.log(f"overview/{code}", rr.Image(sheet).compress(jpeg_quality=80), static=True)
+        rr.script_teardown(args)
+
+
+if __name__ == "__main__":
+    main()
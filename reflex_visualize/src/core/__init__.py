@@ -1,5 +1,22 @@
 """Core functionality for video processing and data handling."""
-from .data_types import VideoFrame, VisualizationConfig, EmotionData
-from .video import VideoSource
+import importlib
 
-__all__ = ['VideoFrame', 'VisualizationConfig', 'EmotionData', 'VideoSource']
+_LAZY_IMPORTS = {
+    'VideoFrame': '.data_types',
+    'VisualizationConfig': '.data_types',
+    'ComparisonConfig': '.data_types',
+    'EmotionData': '.data_types',
+    'VideoSource': '.video',
+    'GrowingVideoSource': '.video',
+    'GazeTimeline': '.gaze',
+    'phase_gaze_statistics': '.gaze',
+}
+
+__all__ = ['VideoFrame', 'VisualizationConfig', 'ComparisonConfig', 'EmotionData', 'VideoSource', 'GrowingVideoSource',
+           'GazeTimeline', 'phase_gaze_statistics']
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
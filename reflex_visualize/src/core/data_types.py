@@ -1,26 +1,76 @@
+from __future__ import annotations
+
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
 from pathlib import Path
-import numpy.typing as npt
 
-@dataclass
+if TYPE_CHECKING:  # numpy is not needed to build a configuration
+    import numpy.typing as npt
+
 class VideoFrame:
-    """Single frame from a video source with metadata."""
-    data: npt.NDArray
-    time: float
-    id_: int
+    """
+    Single frame from a video source with metadata.
+
+    A slotted class so that pooled video sources can recycle the instances:
+    the data of a pooled frame is a view into a reused buffer and is only
+    valid until the source has decoded as many frames as it has buffers.
+    """
+    __slots__ = ('data', 'time', 'id_')
+
+    def __init__(self, data: Optional[npt.NDArray], time: float, id_: int):
+        self.data = data  # None for frames skipped without decoding
+        self.time = time
+        self.id_ = id_
+
+    def __repr__(self) -> str:
+        shape = None if self.data is None else self.data.shape
+        return f"VideoFrame(data={shape}, time={self.time!r}, id_={self.id_!r})"
 
 @dataclass
 class VisualizationConfig:
     """Configuration parameters for visualization."""
     participant_code: str
     data_path: Optional[Path] = None
+    start_frame: int = 1
     max_frames: int = 18000
     jpeg_quality: int = 15
     face_3d: bool = False
     gaze_3d: bool = False
     body_3d: bool = False
     openface_confidence: float = 0.7
+    decoder: str = "opencv"
+    video_scale: float = 1.0
+    decoder_threads: int = 0
+    memory_budget: Optional[int] = None
+    loader_workers: int = 4
+    loader: str = "thread"
+    layers_dir: Optional[Path] = None
+    adaptive_quality: bool = False
+    min_jpeg_quality: int = 5
+    min_video_scale: float = 0.25
+    target_rate: Optional[int] = None
+    outside_phase_fps: Optional[float] = None
+    phase_padding: int = 0
+    overview: bool = False
+    emotion_heatmaps: bool = False
+    detail: str = "frame"
+    watch: bool = False
+    watch_interval: float = 0.5
+    watch_lag: int = 30
+    watch_timeout: Optional[float] = None
+
+@dataclass
+class ComparisonConfig:
+    """Configuration of a multi-participant comparison aligned on a failure onset."""
+    round_no: int = 1
+    action: str = "Pick"
+    before: float = 5.0
+    after: float = 20.0
+    video: bool = True
+    thumbnail_width: int = 160
+    jpeg_quality: int = 30
+    decoder: str = "opencv"
+    workers: int = 4
 
 @dataclass
 class EmotionData:
@@ -0,0 +1,460 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Type, Union
+import json
+import shutil
+import subprocess
+import time
+
+import numpy as np
+import numpy.typing as npt
+
+from ..data_io.archive import as_data_path, media_location
+
+PIXEL_FORMATS = ('bgr', 'rgb')
+
+BENCHMARK_CACHE = Path.home() / ".cache" / "reflex_viz" / "decoder_benchmark.json"
+
+
+class DecoderBackend:
+    """
+    Base class for video decoder backends.
+
+    A backend decodes frames sequentially from the current position, can seek
+    to an exact frame index, and returns frames already converted to the
+    requested pixel format and output size. Frames can be decoded into a
+    caller-provided array to avoid allocating one per frame.
+    """
+
+    name = "base"
+
+    def __init__(self, path: Union[str, Path], output_size: Optional[Tuple[int, int]] = None,
+                 scale: float = 1.0, pixel_format: str = 'bgr', threads: int = 0):
+        """
+        Args:
+            path: Video file
+            output_size: (width, height) of the returned frames, overrides scale
+            scale: Factor applied to the native frame size
+            pixel_format: 'bgr' or 'rgb'
+            threads: Decoder thread count, 0 lets the backend decide
+        """
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unsupported pixel format: {pixel_format}")
+        self.path = as_data_path(path)
+        self.requested_size = output_size
+        self.scale = scale
+        self.pixel_format = pixel_format
+        self.threads = threads
+        self.fps = 0.0
+        self.frame_count = 0
+        self.frame_size = (0, 0)
+        self.output_size = (0, 0)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Check whether the backend can be used on this host."""
+        raise NotImplementedError
+
+    def _resolve_output_size(self) -> None:
+        """Derive the output size from the native frame size once it is known."""
+        if self.requested_size:
+            self.output_size = (int(self.requested_size[0]), int(self.requested_size[1]))
+        elif self.scale != 1.0:
+            width, height = self.frame_size
+            self.output_size = (max(2, int(round(width * self.scale)) // 2 * 2),
+                                max(2, int(round(height * self.scale)) // 2 * 2))
+        else:
+            self.output_size = self.frame_size
+
+    @property
+    def resizes(self) -> bool:
+        return self.output_size != self.frame_size
+
+    @property
+    def output_shape(self) -> Tuple[int, int, int]:
+        """Array shape (height, width, 3) of the returned frames."""
+        return self.output_size[1], self.output_size[0], 3
+
+    def seek(self, index: int) -> None:
+        """Position the decoder so that the next frame read is the given zero-based index."""
+        raise NotImplementedError
+
+    def read(self, out: Optional[npt.NDArray[np.uint8]] = None) -> Optional[Tuple[npt.NDArray[np.uint8], int]]:
+        """
+        Decode the next frame.
+
+        Args:
+            out: uint8 array of output_shape to decode into, a new array is returned if None
+
+        Returns:
+            (image, zero-based index), or None at the end
+        """
+        raise NotImplementedError
+
+    def grab(self) -> Optional[int]:
+        """
+        Advance past the next frame without converting it to an image.
+
+        Returns:
+            Zero-based index of the skipped frame, or None at the end
+        """
+        decoded = self.read()
+        return decoded[1] if decoded is not None else None
+
+    @property
+    def position(self) -> int:
+        """Zero-based index of the next frame to be read."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release decoder resources."""
+
+
+class OpenCVBackend(DecoderBackend):
+    """Decoder based on cv2.VideoCapture; colour conversion and resizing happen after decoding."""
+
+    name = "opencv"
+
+    def __init__(self, path: Union[str, Path], **options):
+        super().__init__(path, **options)
+        import cv2
+        self._cv2 = cv2
+
+        params = [cv2.CAP_PROP_N_THREADS, self.threads] if self.threads else []
+        self.capture = cv2.VideoCapture(media_location(self.path), cv2.CAP_ANY, params)
+        if not self.capture.isOpened():
+            raise ValueError(f"Failed to open video file: {self.path}")
+
+        self.fps = float(self.capture.get(cv2.CAP_PROP_FPS))
+        self.frame_count = int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.frame_size = (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                           int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self._resolve_output_size()
+        self._index = 0
+        self._native: Optional[npt.NDArray[np.uint8]] = None  # Reused when the frame still has to be converted
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import cv2  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def seek(self, index: int) -> None:
+        if index != self._index:
+            self.capture.set(self._cv2.CAP_PROP_POS_FRAMES, index)
+            self._index = index
+
+    def read(self, out: Optional[npt.NDArray[np.uint8]] = None) -> Optional[Tuple[npt.NDArray[np.uint8], int]]:
+        cv2 = self._cv2
+        converts = self.resizes or self.pixel_format == 'rgb'
+        # Native BGR frames are decoded straight into out, otherwise into a reused scratch array
+        success, image = self.capture.read(image=self._native if converts else out)
+        if not success:
+            return None
+
+        index = self._index
+        self._index += 1
+        if not converts:
+            return image, index
+
+        self._native = image
+        if self.resizes:
+            image = cv2.resize(image, self.output_size, dst=out, interpolation=cv2.INTER_AREA)
+            if self.pixel_format == 'rgb':
+                image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)  # In place
+        else:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=out)
+        return image, index
+
+    def grab(self) -> Optional[int]:
+        # Skips the retrieve step: no colour conversion, resizing or copy to a new array
+        if not self.capture.grab():
+            return None
+        index = self._index
+        self._index += 1
+        return index
+
+    @property
+    def position(self) -> int:
+        return self._index
+
+    def close(self) -> None:
+        if self.capture:
+            self.capture.release()
+
+
+class PyAVBackend(DecoderBackend):
+    """Decoder based on PyAV with threaded decoding; scaling and conversion run in swscale."""
+
+    name = "pyav"
+
+    def __init__(self, path: Union[str, Path], **options):
+        super().__init__(path, **options)
+        import av
+
+        try:
+            self.container = av.open(media_location(self.path))
+        except av.error.FFmpegError as e:
+            raise ValueError(f"Failed to open video file: {self.path}: {e}")
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = "AUTO"
+        if self.threads:
+            self.stream.thread_count = self.threads
+
+        rate = self.stream.average_rate or self.stream.guessed_rate
+        self.fps = float(rate) if rate else 0.0
+        self.frame_count = int(self.stream.frames)
+        self.frame_size = (int(self.stream.codec_context.width), int(self.stream.codec_context.height))
+        self._resolve_output_size()
+
+        self._time_base = float(self.stream.time_base)
+        self._start_pts = self.stream.start_time or 0
+        self._format = 'rgb24' if self.pixel_format == 'rgb' else 'bgr24'
+        self._frames = self.container.decode(self.stream)
+        self._next_index = 0
+        self._skip_to: Optional[int] = None
+
+    @classmethod
+    def is_available(cls) -> bool:
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def _frame_index(self, frame) -> int:
+        if frame.pts is None or not self.fps:
+            return self._next_index
+        return int(round((frame.pts - self._start_pts) * self._time_base * self.fps))
+
+    def seek(self, index: int) -> None:
+        if index == self._next_index:
+            return
+        # Seek to the keyframe before the target, then decode up to the exact frame
+        target = int(index / self.fps / self._time_base) + self._start_pts if self.fps else 0
+        self.container.seek(target, stream=self.stream, backward=True, any_frame=False)
+        self._frames = self.container.decode(self.stream)
+        self._skip_to = index
+        self._next_index = index
+
+    def _next_frame(self):
+        for frame in self._frames:
+            index = self._frame_index(frame)
+            if self._skip_to is not None and index < self._skip_to:
+                continue
+            self._skip_to = None
+            self._next_index = index + 1
+            return frame, index
+        return None
+
+    def read(self, out: Optional[npt.NDArray[np.uint8]] = None) -> Optional[Tuple[npt.NDArray[np.uint8], int]]:
+        decoded = self._next_frame()
+        if decoded is None:
+            return None
+        frame, index = decoded
+        width, height = self.output_size
+        if out is None:
+            return frame.to_ndarray(format=self._format, width=width, height=height), index
+
+        # Copy the converted plane into out, dropping the padding at the end of each row
+        plane = frame.reformat(width=width, height=height, format=self._format).planes[0]
+        rows = np.frombuffer(plane, dtype=np.uint8).reshape(height, plane.line_size)
+        np.copyto(out, rows[:, :width * 3].reshape(height, width, 3))
+        return out, index
+
+    def grab(self) -> Optional[int]:
+        # Inter-coded frames still have to be decoded as references, only the swscale conversion is skipped
+        decoded = self._next_frame()
+        return decoded[1] if decoded is not None else None
+
+    @property
+    def position(self) -> int:
+        return self._next_index
+
+    def close(self) -> None:
+        self.container.close()
+
+
+class FFmpegPipeBackend(DecoderBackend):
+    """Decoder reading rawvideo from an ffmpeg subprocess; seeking restarts the process."""
+
+    name = "ffmpeg"
+
+    def __init__(self, path: Union[str, Path], **options):
+        super().__init__(path, **options)
+        from ..data_io.readers import VideoReader
+
+        self.executable = shutil.which("ffmpeg")
+        if not self.executable:
+            raise ValueError("ffmpeg executable not found")
+
+        metadata = VideoReader(self.path).read()
+        self.fps = float(metadata['fps'])
+        self.frame_count = int(metadata['frame_count'])
+        self.frame_size = (int(metadata['width']), int(metadata['height']))
+        self._resolve_output_size()
+        self._frame_bytes = self.output_size[0] * self.output_size[1] * 3
+        self._skipped = bytearray(self._frame_bytes)
+        self._process: Optional[subprocess.Popen] = None
+        self._index = 0
+        self._start(0)
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return shutil.which("ffmpeg") is not None
+
+    def _start(self, index: int) -> None:
+        self.close()
+        command = [self.executable, "-v", "error", "-nostdin"]
+        if self.threads:
+            command += ["-threads", str(self.threads)]
+        if index > 0 and self.fps:
+            command += ["-ss", f"{index / self.fps:.6f}"]
+        command += ["-i", media_location(self.path), "-map", "0:v:0", "-an",
+                    "-f", "rawvideo", "-pix_fmt", "rgb24" if self.pixel_format == 'rgb' else "bgr24"]
+        if self.resizes:
+            command += ["-vf", f"scale={self.output_size[0]}:{self.output_size[1]}:flags=area"]
+        command.append("-")
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                         bufsize=self._frame_bytes)
+        self._index = index
+
+    def seek(self, index: int) -> None:
+        if index != self._index:
+            self._start(index)
+
+    def _read_into(self, buffer) -> bool:
+        """Fill a writable buffer with the next frame from the pipe."""
+        if self._process is None:
+            return False
+        view = memoryview(buffer).cast('B')
+        filled = 0
+        while filled < self._frame_bytes:
+            count = self._process.stdout.readinto(view[filled:])
+            if not count:
+                return False
+            filled += count
+        return True
+
+    def read(self, out: Optional[npt.NDArray[np.uint8]] = None) -> Optional[Tuple[npt.NDArray[np.uint8], int]]:
+        image = out if out is not None else np.empty(self.output_shape, dtype=np.uint8)
+        if not self._read_into(image):
+            return None
+        index = self._index
+        self._index += 1
+        return image, index
+
+    def grab(self) -> Optional[int]:
+        # The pipe carries converted frames, so skipping only reads them into a scratch buffer
+        if not self._read_into(self._skipped):
+            return None
+        index = self._index
+        self._index += 1
+        return index
+
+    @property
+    def position(self) -> int:
+        return self._index
+
+    def close(self) -> None:
+        if self._process is not None:
+            self._process.stdout.close()
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+
+DECODER_BACKENDS: Dict[str, Type[DecoderBackend]] = {
+    OpenCVBackend.name: OpenCVBackend,
+    PyAVBackend.name: PyAVBackend,
+    FFmpegPipeBackend.name: FFmpegPipeBackend,
+}
+
+
+def available_backends() -> List[str]:
+    """Names of the decoder backends usable on this host."""
+    return [name for name, backend in DECODER_BACKENDS.items() if backend.is_available()]
+
+
+def create_backend(name: str, path: Union[str, Path], **options) -> DecoderBackend:
+    """Instantiate a decoder backend by name ('auto' selects the fastest one)."""
+    if name == "auto":
+        name = select_backend(path, **options)
+    if name not in DECODER_BACKENDS:
+        raise ValueError(f"Unknown decoder backend: {name} (choose from {', '.join(DECODER_BACKENDS)})")
+    if not DECODER_BACKENDS[name].is_available():
+        raise ValueError(f"Decoder backend not available on this host: {name}")
+    return DECODER_BACKENDS[name](path, **options)
+
+
+def benchmark_backends(path: Union[str, Path], n_frames: int = 150,
+                       backends: Optional[List[str]] = None, **options) -> Dict[str, float]:
+    """
+    Measure the decoding throughput of each available backend.
+
+    Args:
+        path: Video file to decode
+        n_frames: Number of frames decoded per backend
+        backends: Backends to measure, all available by default
+        **options: Decoder options (output_size, scale, pixel_format, threads)
+
+    Returns:
+        Frames per second per backend, fastest first
+    """
+    results = {}
+    for name in backends or available_backends():
+        try:
+            backend = DECODER_BACKENDS[name](path, **options)
+        except (ValueError, OSError) as e:
+            print(f"Warning: Skipping decoder backend {name}: {e}")
+            continue
+        try:
+            start = time.perf_counter()
+            decoded = 0
+            while decoded < n_frames and backend.read() is not None:
+                decoded += 1
+            elapsed = time.perf_counter() - start
+        finally:
+            backend.close()
+        if decoded:
+            results[name] = decoded / elapsed
+    return dict(sorted(results.items(), key=lambda item: item[1], reverse=True))
+
+
+def select_backend(path: Union[str, Path], cache_file: Optional[Path] = BENCHMARK_CACHE,
+                   **options) -> str:
+    """
+    Pick the fastest decoder backend for a video, benchmarking once per configuration.
+
+    Results are cached per frame size and decoder options, so later runs on the
+    same host select a backend without decoding anything.
+    """
+    from ..data_io.readers import VideoReader
+
+    metadata = VideoReader(path).read()
+    key = json.dumps({
+        'size': [metadata['width'], metadata['height']],
+        'available': available_backends(),
+        **{k: v for k, v in sorted(options.items())},
+    }, sort_keys=True)
+
+    cache = {}
+    if cache_file and cache_file.is_file():
+        try:
+            cache = json.loads(cache_file.read_text())
+        except (OSError, ValueError):
+            cache = {}
+    if key in cache and cache[key] in DECODER_BACKENDS:
+        return cache[key]
+
+    results = benchmark_backends(path, **options)
+    best = next(iter(results), OpenCVBackend.name)
+    if cache_file:
+        cache[key] = best
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            cache_file.write_text(json.dumps(cache, indent=1))
+        except OSError:
+            pass
+    return best
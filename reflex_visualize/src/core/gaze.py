@@ -0,0 +1,223 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Union
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from ..data_io.archive import as_data_path
+from ..data_io.readers import CSVReader
+
+NO_GAZE = -1
+
+
+@dataclass
+class GazeTimeline:
+    """
+    Run-length encoded gaze classification (Task/Robot/Miscellaneous).
+
+    Run ``i`` covers the inclusive frame range ``starts[i]..ends[i]`` and carries
+    the label ``labels[codes[i]]``. Frames not covered by any run have no label.
+    """
+    starts: npt.NDArray[np.int64]
+    ends: npt.NDArray[np.int64]
+    codes: npt.NDArray[np.int64]
+    labels: List[str]
+
+    @classmethod
+    def from_frame_labels(cls, frames: Iterable[int], gaze: Iterable[str]) -> 'GazeTimeline':
+        """
+        Build the timeline from per-frame labels.
+
+        Args:
+            frames: Frame number of each sample
+            gaze: Gaze label of each sample
+
+        Returns:
+            GazeTimeline with one run per contiguous block of equally labelled frames
+        """
+        df = pd.DataFrame({'frame': frames, 'gaze': gaze}).dropna()
+        df = df.drop_duplicates('frame', keep='first').sort_values('frame')
+        if df.empty:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(starts=empty, ends=empty.copy(), codes=empty.copy(), labels=[])
+
+        frame_ids = df['frame'].to_numpy(dtype=np.int64)
+        categories = pd.Categorical(df['gaze'].astype(str))
+        codes = categories.codes.astype(np.int64)
+
+        # A new run starts wherever the label changes or frames are not contiguous
+        breaks = np.flatnonzero((np.diff(codes) != 0) | (np.diff(frame_ids) != 1)) + 1
+        run_starts = np.concatenate(([0], breaks))
+        run_ends = np.concatenate((breaks - 1, [len(frame_ids) - 1]))
+
+        return cls(
+            starts=frame_ids[run_starts],
+            ends=frame_ids[run_ends],
+            codes=codes[run_starts],
+            labels=list(categories.categories),
+        )
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, frame_column: str = 'Frame',
+                       label_column: str = 'Gaze') -> 'GazeTimeline':
+        """Build the timeline from a gaze.csv DataFrame."""
+        return cls.from_frame_labels(df[frame_column], df[label_column])
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path]) -> 'GazeTimeline':
+        """Build the timeline from a gaze.csv file."""
+        return cls.from_dataframe(CSVReader(path).read(usecols=['Frame', 'Gaze']))
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def empty(self) -> bool:
+        return len(self.starts) == 0
+
+    def codes_at(self, frames: Union[int, npt.ArrayLike]) -> npt.NDArray[np.int64]:
+        """
+        Look up label codes for frames using binary search over the runs.
+
+        Args:
+            frames: Frame number or array of frame numbers
+
+        Returns:
+            Array of label codes, NO_GAZE where a frame is not covered by a run
+        """
+        frames = np.asarray(frames, dtype=np.int64)
+        if self.empty:
+            return np.full(frames.shape, NO_GAZE, dtype=np.int64)
+
+        idx = np.searchsorted(self.starts, frames, side='right') - 1
+        clipped = np.clip(idx, 0, None)
+        covered = (idx >= 0) & (frames <= self.ends[clipped])
+        return np.where(covered, self.codes[clipped], NO_GAZE)
+
+    def label_at(self, frame: int) -> Optional[str]:
+        """Get the gaze label of a single frame, or None if the frame has no label."""
+        code = int(self.codes_at(frame))
+        return self.labels[code] if code != NO_GAZE else None
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Return the runs as a DataFrame with Start Frame, End Frame and Gaze columns."""
+        return pd.DataFrame({
+            'Start Frame': self.starts,
+            'End Frame': self.ends,
+            'Gaze': [self.labels[code] for code in self.codes],
+        })
+
+
+def _frames_to_seconds(times: pd.Series) -> Callable[[npt.NDArray], npt.NDArray[np.float64]]:
+    """Create a vectorised frame -> seconds mapping from a time.csv 'Seconds' series."""
+    frames = times.index.to_numpy(dtype=np.float64)
+    seconds = times.to_numpy(dtype=np.float64)
+    period = float(np.median(np.diff(seconds))) if len(seconds) > 1 else 0.0
+
+    def to_seconds(query: npt.NDArray) -> npt.NDArray[np.float64]:
+        result = np.interp(query, frames, seconds)
+        # Extrapolate past the last recorded frame with the median frame period
+        beyond = query > frames[-1]
+        result[beyond] = seconds[-1] + (query[beyond] - frames[-1]) * period
+        return result
+
+    return to_seconds
+
+
+def phase_gaze_statistics(timeline: GazeTimeline, phases: pd.DataFrame,
+                          times: Optional[pd.Series] = None) -> pd.DataFrame:
+    """
+    Compute gaze dwell times and transition counts per analysis phase.
+
+    Args:
+        timeline: Run-length encoded gaze labels of one participant
+        phases: analysis.csv DataFrame with 'Start Frame' and 'End Frame' columns
+        times: Optional time.csv 'Seconds' column indexed by frame, used to add dwell
+            times in seconds
+
+    Returns:
+        One row per phase with the phase columns of analysis.csv followed by
+        '<label> Frames' (and '<label> Seconds') dwell columns and 'Transitions'
+    """
+    result = phases.reset_index(drop=True).copy()
+    phase_start = phases['Start Frame'].to_numpy(dtype=np.int64)[:, None]
+    phase_end = phases['End Frame'].to_numpy(dtype=np.int64)[:, None]
+    run_start = timeline.starts[None, :]
+    run_end = timeline.ends[None, :]
+
+    # Inclusive overlap of every (phase, run) pair
+    overlap_start = np.maximum(phase_start, run_start)
+    overlap_end = np.minimum(phase_end, run_end)
+    overlap = np.clip(overlap_end - overlap_start + 1, 0, None)
+
+    one_hot = np.zeros((len(timeline), len(timeline.labels)), dtype=np.float64)
+    one_hot[np.arange(len(timeline)), timeline.codes] = 1.0
+    dwell_frames = overlap @ one_hot
+
+    dwell_seconds = None
+    if times is not None and len(times):
+        to_seconds = _frames_to_seconds(times)
+        span = to_seconds((overlap_end + 1).astype(np.float64)) - to_seconds(overlap_start.astype(np.float64))
+        dwell_seconds = np.where(overlap > 0, span, 0.0) @ one_hot
+
+    for i, label in enumerate(timeline.labels):
+        result[f'{label} Frames'] = dwell_frames[:, i].astype(np.int64)
+        if dwell_seconds is not None:
+            result[f'{label} Seconds'] = dwell_seconds[:, i]
+
+    # A transition is a label change between consecutive runs that both touch the phase
+    if len(timeline) > 1:
+        changed = timeline.codes[1:] != timeline.codes[:-1]
+        inside = ((timeline.starts[1:][None, :] > phase_start)
+                  & (timeline.starts[1:][None, :] <= phase_end)
+                  & (timeline.ends[:-1][None, :] >= phase_start))
+        result['Transitions'] = (inside & changed[None, :]).sum(axis=1)
+    else:
+        result['Transitions'] = 0
+
+    return result
+
+
+def participant_gaze_statistics(data_path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Compute per-phase gaze statistics for one participant folder.
+
+    Args:
+        data_path: Participant folder containing analysis.csv, gaze.csv and time.csv
+
+    Returns:
+        DataFrame as returned by phase_gaze_statistics
+    """
+    data_path = as_data_path(data_path)
+    timeline = GazeTimeline.from_csv(data_path / "gaze.csv")
+    phases = CSVReader(data_path / "analysis.csv").read()
+
+    times = None
+    if (data_path / "time.csv").is_file():
+        times = CSVReader(data_path / "time.csv").read(usecols=['Frame', 'Seconds']).set_index('Frame')['Seconds']
+
+    return phase_gaze_statistics(timeline, phases, times)
+
+
+def dataset_gaze_statistics(participant_folders: Iterable[Path]) -> pd.DataFrame:
+    """
+    Compute per-phase gaze statistics for several participants.
+
+    Args:
+        participant_folders: Participant folders to process
+
+    Returns:
+        Concatenated statistics; dwell columns of labels a participant never
+        showed are filled with zeros
+    """
+    frames = [participant_gaze_statistics(folder) for folder in participant_folders]
+    if not frames:
+        return pd.DataFrame()
+
+    combined = pd.concat(frames, ignore_index=True)
+    frame_columns = [col for col in combined.columns if col.endswith(' Frames')]
+    second_columns = [col for col in combined.columns if col.endswith(' Seconds')]
+    combined[frame_columns] = combined[frame_columns].fillna(0).astype(np.int64)
+    combined[second_columns] = combined[second_columns].fillna(0.0)
+    return combined
@@ -0,0 +1,201 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from ..data_io.frame_table import load_frame_table, CATEGORICAL_COLUMNS
+from ..utils.helpers import select_participants
+
+# Columns describing a matched moment, taken from its first frame
+MOMENT_COLUMNS = ['Round No.', 'Object', 'Action', 'Explanation Level', 'State']
+
+
+class MomentIndex:
+    """
+    Frame-aligned table of many participants with inverted indexes on categorical columns.
+
+    Categorical filters are answered from the precomputed posting lists; numeric
+    conditions are only evaluated on the remaining candidate frames.
+    """
+
+    def __init__(self, table: pd.DataFrame):
+        """
+        Build the indexes over an already loaded table.
+
+        Args:
+            table: Concatenated frame tables, as returned by load_frame_table
+        """
+        self.table = table.sort_values(['Participant', 'Frame'], kind='stable').reset_index(drop=True)
+        for column in CATEGORICAL_COLUMNS:
+            if column in self.table.columns:
+                self.table[column] = self.table[column].astype('category')
+
+        self.indexes: Dict[str, Dict[Any, np.ndarray]] = {}
+        for column in CATEGORICAL_COLUMNS + ['Round No.']:
+            if column in self.table.columns:
+                self.indexes[column] = self._build_index(self.table[column])
+
+    @staticmethod
+    def _build_index(values: pd.Series) -> Dict[Any, np.ndarray]:
+        """Map each value of a column to the sorted row positions holding it."""
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            categories = list(values.cat.categories)
+        else:
+            categories, codes = np.unique(values.to_numpy(), return_inverse=True)
+            categories = list(categories)
+
+        order = np.argsort(codes, kind='stable')
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        offset = int((codes < 0).sum())  # Missing values sort first in the order
+        index = {}
+        for value, count in zip(categories, counts):
+            index[value] = order[offset:offset + count]
+            offset += count
+        return index
+
+    @classmethod
+    def from_data_root(cls, data_root: Union[str, Path], participants: Optional[Iterable[str]] = None,
+                       strategies: Optional[Iterable[str]] = None, workers: int = 8,
+                       cache_dir: Optional[Union[str, Path]] = None) -> 'MomentIndex':
+        """
+        Load (or build and cache) the frame tables of many participants.
+
+        Args:
+            data_root: Folder containing the strategy folders
+            participants: Participant codes to load, all by default
+            strategies: Strategy prefixes (e.g. 'C3') to load, all by default
+            workers: Number of loader threads
+            cache_dir: Frame table cache folder, see load_frame_table
+
+        Returns:
+            MomentIndex over the selected participants
+        """
+        folders = select_participants(data_root, None if participants is None else list(participants),
+                                      None if strategies is None else list(strategies), largest_first=True)
+        if not folders:
+            raise ValueError(f"No participants found under {data_root}")
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            tables = list(pool.map(
+                lambda item: load_frame_table(item[1], cache_dir=cache_dir, participant_code=item[0]),
+                folders.items()))
+        return cls(pd.concat(tables, ignore_index=True))
+
+    @property
+    def participants(self) -> List[str]:
+        return list(self.indexes['Participant'])
+
+    def _candidates(self, filters: Dict[str, Any]) -> np.ndarray:
+        """Intersect the posting lists of all categorical filters."""
+        rows = None
+        for column, wanted in filters.items():
+            if column not in self.indexes:
+                raise KeyError(f"Column is not indexed: {column}")
+            values = wanted if isinstance(wanted, (list, tuple, set)) else [wanted]
+            postings = [self.indexes[column].get(value, np.empty(0, dtype=np.int64)) for value in values]
+            matched = np.unique(np.concatenate(postings)) if len(postings) > 1 else postings[0]
+            rows = matched if rows is None else np.intersect1d(rows, matched, assume_unique=True)
+            if len(rows) == 0:
+                break
+        return np.arange(len(self.table)) if rows is None else rows
+
+    def match_frames(self, where: Optional[str] = None, **filters: Any) -> pd.DataFrame:
+        """
+        Get the individual frames matching a query.
+
+        Args:
+            where: Optional pandas expression over numeric columns, e.g. 'Confusion > 0.4'.
+                Column names with spaces must be quoted with backticks.
+            **filters: Categorical filters, e.g. Action='Carry' or State=['Failure', 'Explanation'].
+                Use underscores for spaces in column names (Explanation_Level='High').
+
+        Returns:
+            Matching rows of the frame table
+        """
+        filters = {column.replace('_', ' ') if column not in self.indexes else column: value
+                   for column, value in filters.items()}
+        rows = self._candidates(filters)
+        matched = self.table.iloc[rows]
+        if where and len(matched):
+            matched = matched[matched.eval(where).to_numpy(dtype=bool)]
+        return matched
+
+    def query(self, where: Optional[str] = None, min_frames: int = 1, **filters: Any) -> pd.DataFrame:
+        """
+        Find the frame ranges (moments) matching a query.
+
+        Args:
+            where: Optional pandas expression over numeric columns, see match_frames
+            min_frames: Drop moments shorter than this many frames
+            **filters: Categorical filters, see match_frames
+
+        Returns:
+            One row per moment with Participant, Start Frame, End Frame, Frames,
+            Start Seconds, End Seconds and the phase columns
+        """
+        matched = self.match_frames(where, **filters)
+        columns = ['Participant', 'Start Frame', 'End Frame', 'Frames', 'Start Seconds', 'End Seconds']
+        if matched.empty:
+            return pd.DataFrame(columns=columns + [c for c in MOMENT_COLUMNS if c in self.table.columns])
+
+        # Moments end at gaps, participant changes and phase boundaries
+        frames = matched['Frame'].to_numpy()
+        participants = matched['Participant'].cat.codes.to_numpy()
+        split = (np.diff(frames) != 1) | (np.diff(participants) != 0)
+        if 'Phase' in matched.columns:
+            split |= np.diff(matched['Phase'].to_numpy()) != 0
+        breaks = np.flatnonzero(split) + 1
+        first = np.concatenate(([0], breaks))
+        last = np.concatenate((breaks - 1, [len(frames) - 1]))
+
+        moments = pd.DataFrame({
+            'Participant': matched['Participant'].to_numpy()[first],
+            'Start Frame': frames[first],
+            'End Frame': frames[last],
+            'Frames': last - first + 1,
+            'Start Seconds': matched['Seconds'].to_numpy()[first],
+            'End Seconds': matched['Seconds'].to_numpy()[last],
+        })
+        for column in MOMENT_COLUMNS:
+            if column in matched.columns:
+                moments[column] = matched[column].to_numpy()[first]
+
+        return moments[moments['Frames'] >= min_frames].reset_index(drop=True)
+
+
+def open_moments(moments: pd.DataFrame, data_root: Union[str, Path], padding: int = 0,
+                 limit: Optional[int] = None, jpeg_quality: int = 15) -> None:
+    """
+    Open moments in the visualiser, one recording per moment.
+
+    Args:
+        moments: Result of MomentIndex.query
+        data_root: Folder containing the strategy folders
+        padding: Extra frames shown before and after each moment
+        limit: Open at most this many moments
+        jpeg_quality: JPEG quality of the logged video frames
+    """
+    import rerun as rr
+    from .data_types import VisualizationConfig
+    from ..vis.layouts import create_default_rrb
+    from ..vis.visualizer import DataVisualizer
+
+    rows = moments.head(limit) if limit else moments
+    folders = select_participants(data_root, list(rows['Participant'].unique()))
+    for moment in rows.to_dict('records'):
+        participant = moment['Participant']
+        start = max(1, int(moment['Start Frame']) - padding)
+        end = int(moment['End Frame']) + padding
+        rr.init(f"Participant-{participant}", recording_id=f"{participant}-{start}-{end}", spawn=True,
+                default_enabled=True)
+        rr.send_blueprint(create_default_rrb())
+        config = VisualizationConfig(
+            participant_code=participant,
+            data_path=folders[participant],
+            start_frame=start,
+            max_frames=end,
+            jpeg_quality=jpeg_quality,
+        )
+        DataVisualizer(config).log_and_visualize()
@@ -0,0 +1,69 @@
+from typing import Optional
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+
+def phase_windows(analysis: pd.DataFrame, padding: int = 0) -> npt.NDArray[np.int64]:
+    """
+    Merge the analysis phases into disjoint frame windows.
+
+    Args:
+        analysis: analysis.csv DataFrame with 'Start Frame' and 'End Frame'
+        padding: Extra frames added before and after every phase
+
+    Returns:
+        (n, 2) array of inclusive [start, end] frame windows sorted by start
+    """
+    if analysis.empty:
+        return np.empty((0, 2), dtype=np.int64)
+
+    windows = np.column_stack((analysis['Start Frame'].to_numpy(dtype=np.int64) - padding,
+                               analysis['End Frame'].to_numpy(dtype=np.int64) + padding))
+    windows = windows[np.argsort(windows[:, 0], kind='stable')]
+
+    merged = [windows[0].copy()]
+    for start, end in windows[1:]:
+        if start <= merged[-1][1] + 1:  # Overlapping or adjacent
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append(np.array([start, end]))
+    return np.array(merged, dtype=np.int64)
+
+
+class KeyframeSampler:
+    """
+    Decide which video frames have their image logged.
+
+    Frames inside the analysis windows are kept at full rate; outside of them
+    only one frame per 1 / outside_fps seconds is kept.
+    """
+
+    def __init__(self, windows: npt.NDArray[np.int64], fps: float, outside_fps: Optional[float] = None):
+        """
+        Args:
+            windows: Disjoint inclusive frame windows, as returned by phase_windows
+            fps: Frame rate of the video
+            outside_fps: Image rate outside the windows, full rate if None
+        """
+        self.starts = windows[:, 0] if len(windows) else np.empty(0, dtype=np.int64)
+        self.ends = windows[:, 1] if len(windows) else np.empty(0, dtype=np.int64)
+        if outside_fps is None or outside_fps <= 0 or not fps:
+            self.step = 1
+        else:
+            self.step = max(1, int(round(fps / outside_fps)))
+
+    def keep(self, frame: int) -> bool:
+        """Whether the image of a one-based frame is logged."""
+        if self.step == 1 or (frame - 1) % self.step == 0:
+            return True
+        i = np.searchsorted(self.starts, frame, side='right') - 1
+        return bool(i >= 0 and frame <= self.ends[i])
+
+    def keep_mask(self, frames: npt.ArrayLike) -> npt.NDArray[np.bool_]:
+        """Vectorised keep() over an array of one-based frames."""
+        frames = np.asarray(frames, dtype=np.int64)
+        mask = (frames - 1) % self.step == 0
+        i = np.searchsorted(self.starts, frames, side='right') - 1
+        inside = (i >= 0) & (frames <= self.ends[np.clip(i, 0, None)]) if len(self.starts) else False
+        return mask | inside
@@ -1,18 +1,82 @@
-from typing import Iterator, Union
-import cv2
+from collections import deque
+from typing import Callable, Deque, Iterator, List, Optional, Tuple, Union
 from pathlib import Path
+
+import numpy as np
+import numpy.typing as npt
+
+from ..data_io.archive import as_data_path
 from .data_types import VideoFrame
+from .decoders import create_backend
+
+
+class FramePool:
+    """
+    Ring of preallocated frame buffers and VideoFrame instances.
+
+    Every acquire returns the next slot of the ring, so a frame stays valid
+    until `size` more frames have been acquired. A buffer is only allocated
+    again when the frame shape changes.
+    """
+
+    def __init__(self, size: int):
+        """
+        Args:
+            size: Number of slots, i.e. frames that can be held at the same time
+        """
+        if size < 1:
+            raise ValueError(f"A frame pool needs at least one slot, got {size}")
+        self.size = size
+        self.allocations = 0
+        self._buffers: List[Optional[npt.NDArray[np.uint8]]] = [None] * size
+        self._frames = [VideoFrame(None, 0.0, 0) for _ in range(size)]
+        self._next = 0
+
+    def acquire(self, shape: Optional[Tuple[int, ...]] = None) -> Tuple[VideoFrame, Optional[npt.NDArray[np.uint8]]]:
+        """
+        Take the next slot of the ring.
+
+        Args:
+            shape: Shape of the buffer to return, None for a frame without image data
+
+        Returns:
+            (recycled frame, uint8 buffer of the given shape or None)
+        """
+        slot = self._next
+        self._next = (slot + 1) % self.size
+        if shape is None:
+            return self._frames[slot], None
+        buffer = self._buffers[slot]
+        if buffer is None or buffer.shape != shape:
+            buffer = self._buffers[slot] = np.empty(shape, dtype=np.uint8)
+            self.allocations += 1
+        return self._frames[slot], buffer
 
 
 class VideoSource:
     """Handles video file reading and streaming."""
 
-    def __init__(self, path: Union[str, Path]):
-        """Initialize video capture from given path."""
-        self.path = Path(path)
-        self.capture = cv2.VideoCapture(str(self.path))
-        if not self.capture.isOpened():
-            raise ValueError(f"Failed to open video file: {self.path}")
+    def __init__(self, path: Union[str, Path], backend: str = "opencv",
+                 output_size: Optional[Tuple[int, int]] = None, scale: float = 1.0,
+                 pixel_format: str = "bgr", threads: int = 0, buffers: int = 0):
+        """
+        Initialize video decoding from given path.
+
+        Args:
+            path: Video file
+            backend: Decoder backend ('opencv', 'pyav', 'ffmpeg' or 'auto')
+            output_size: (width, height) of the streamed frames, overrides scale
+            scale: Factor applied to the native frame size
+            pixel_format: 'bgr' or 'rgb'
+            threads: Decoder thread count, 0 lets the backend decide
+            buffers: Decode into a ring of this many reused buffers and recycle the
+                streamed VideoFrame objects; a frame is then only valid until as many
+                more frames have been streamed. 0 allocates a new array per frame.
+        """
+        self.path = as_data_path(path)
+        self.decoder = create_backend(backend, self.path, output_size=output_size, scale=scale,
+                                      pixel_format=pixel_format, threads=threads)
+        self.pool = FramePool(buffers) if buffers else None
 
     def __enter__(self):
         return self
@@ -21,22 +85,161 @@ class VideoSource:
         self.close()
 
     def close(self) -> None:
-        """Release video capture resources."""
-        if self.capture:
-            self.capture.release()
+        """Release video decoder resources."""
+        if self.decoder:
+            self.decoder.close()
+
+    def stream(self, sample: Optional[Callable[[int], bool]] = None) -> Iterator[VideoFrame]:
+        """
+        Stream video frames in the configured pixel format and size.
+
+        Args:
+            sample: Called with the zero-based index of each frame; frames it rejects
+                are grabbed without conversion and yielded with data None
+        """
+        fps = self.decoder.fps
+        while True:
+            if sample is not None and not sample(self.decoder.position):
+                id_ = self.decoder.grab()
+                if id_ is None:
+                    break
+                frame, _ = self._acquire(None)
+                frame.data = None
+            else:
+                frame, buffer = self._acquire(self.decoder.output_shape)
+                decoded = self.decoder.read(buffer)
+                if decoded is None:
+                    break
+                frame.data, id_ = decoded
+            frame.time = id_ / fps if fps else 0.0
+            frame.id_ = id_
+            yield frame
+
+    def _acquire(self, shape: Optional[Tuple[int, ...]]) -> Tuple[VideoFrame, Optional[npt.NDArray[np.uint8]]]:
+        """Recycle the next pooled frame and buffer, or create a frame to decode into a new array."""
+        if self.pool is None:
+            return VideoFrame(None, 0.0, 0), None
+        return self.pool.acquire(shape)
+
+    def grab(self) -> Optional[int]:
+        """Skip the next frame without converting it, returning its zero-based index or None at the end."""
+        return self.decoder.grab()
 
     def stream_bgr(self) -> Iterator[VideoFrame]:
         """Stream video frames in BGR format."""
-        while self.capture.isOpened():
-            id_ = int(self.capture.get(cv2.CAP_PROP_POS_FRAMES))
-            success, bgr = self.capture.read()
-
-            if not success:
-                break
+        if self.decoder.pixel_format != "bgr":
+            raise ValueError(f"Video source decodes to {self.decoder.pixel_format}, not bgr")
+        return self.stream()
 
-            time_ms = self.capture.get(cv2.CAP_PROP_POS_MSEC)
-            yield VideoFrame(data=bgr, time=time_ms * 1e-3, id_=id_)
+    def seek(self, frame_index: int) -> None:
+        """Move to a zero-based frame index so that the next streamed frame is that frame."""
+        self.decoder.seek(max(frame_index, 0))
 
     def get_frame_count(self) -> int:
         """Get total number of frames in video."""
-        return int(self.capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        return self.decoder.frame_count
+
+    def get_fps(self) -> float:
+        """Get the nominal frame rate of the video."""
+        return self.decoder.fps
+
+    def get_frame_size(self) -> Tuple[int, int]:
+        """Get the (width, height) of the streamed frames."""
+        return self.decoder.output_size
+
+
+class GrowingVideoSource:
+    """
+    Video source following a file that is still being recorded.
+
+    Frames are requested in increasing order. When the decoder reaches the
+    current end of the file, the file is reopened once it has grown and the
+    decoder seeks back to the next frame, so each update only decodes from
+    the nearest keyframe instead of the whole recording. The recording must
+    be in a format readable while it is written (e.g. fragmented MP4 or MKV).
+
+    The last frame before the end of the file may belong to a fragment that
+    is only partly written, so a frame is returned only once the frame after
+    it has been decoded too, unless the caller asks for it as final.
+    """
+
+    def __init__(self, path: Union[str, Path], **options):
+        """
+        Args:
+            path: Video file, which may not exist yet
+            **options: VideoSource options (backend, scale, pixel_format, threads)
+        """
+        self.path = Path(path)
+        self.options = options
+        self.source: Optional[VideoSource] = None
+        self.next_index = 0
+        self._size = -1
+        self._decoded: Deque[Tuple[int, VideoFrame]] = deque()
+
+    def close(self) -> None:
+        if self.source is not None:
+            self.source.close()
+            self.source = None
+        if self._decoded:  # Held frames may be incomplete, decode them again after reopening
+            self.next_index = self._decoded[0][0]
+            self._decoded.clear()
+
+    def _open(self) -> bool:
+        try:
+            self._size = self.path.stat().st_size
+            self.source = VideoSource(self.path, **self.options)
+        except (OSError, ValueError):
+            self.source = None
+            return False
+        self.source.seek(self.next_index)
+        return True
+
+    def _decode_next(self) -> bool:
+        frame = next(self.source.stream(), None)
+        if frame is None:
+            return False
+        self._decoded.append((self.next_index, frame))
+        self.next_index += 1
+        return True
+
+    def frame_at(self, index: int, final: bool = False) -> Optional[VideoFrame]:
+        """
+        Decode the frame with the given zero-based index if it has been recorded.
+
+        Frames before it are skipped without conversion. The same index can be
+        requested again until a later one is.
+
+        Args:
+            index: Zero-based frame index, not lower than the previous request
+            final: Return the frame even if nothing has been recorded after it
+
+        Returns:
+            VideoFrame, or None if the recording has not reached the frame yet
+        """
+        while self._decoded and self._decoded[0][0] < index:
+            self._decoded.popleft()
+
+        last_needed = index if final else index + 1
+        for _ in range(2):  # Retry once after reopening a grown file
+            if self.source is None and not self._open():
+                return None
+
+            if not self._decoded:
+                while self.next_index < index and self.source.grab() is not None:
+                    self.next_index += 1
+            while index <= self.next_index <= last_needed and self._decode_next():
+                pass
+            if self.next_index > last_needed:
+                return self._decoded[0][1]
+
+            try:
+                grown = self.path.stat().st_size != self._size
+            except OSError:
+                grown = False
+            if not grown:
+                return None
+            self.close()
+        return None
+
+    def get_frame_size(self) -> Tuple[int, int]:
+        return self.source.get_frame_size() if self.source is not None else (0, 0)
@@ -1,9 +1,27 @@
 # data_io/__init__.py
 """Input/Output operations for various data formats."""
-from .readers import (
-    DataReader, CSVReader, AudioDataReader,
-)
+import importlib
+
+_LAZY_IMPORTS = {
+    'DataReader': '.readers',
+    'CSVReader': '.readers',
+    'AudioDataReader': '.readers',
+    'VideoReader': '.readers',
+    'DatasetManifest': '.manifest',
+    'CSVTail': '.tail',
+    'ModalityLoader': '.modalities',
+    'ArchivePath': '.archive',
+    'FrameService': '.service',
+    'validate_participant': '.preflight',
+}
 
 __all__ = [
-    'DataReader', 'CSVReader', 'AudioDataReader'
+    'DataReader', 'CSVReader', 'AudioDataReader', 'VideoReader', 'DatasetManifest', 'CSVTail',
+    'ModalityLoader', 'ArchivePath', 'FrameService', 'validate_participant'
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
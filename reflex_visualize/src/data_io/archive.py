@@ -0,0 +1,305 @@
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple, Union
+import functools
+import hashlib
+import io
+import os
+import shutil
+import struct
+import threading
+import zipfile
+
+ARCHIVE_SCHEME = "zip://"
+ARCHIVE_SEPARATOR = "!/"
+
+ARCHIVE_CACHE_DIR = Path.home() / ".cache" / "reflex_viz" / "archive"
+ARCHIVE_CACHE_BYTES = 2 << 30
+
+_LOCAL_HEADER = struct.Struct("<4s5H3I2H")  # Fixed part of a zip local file header
+
+
+@dataclass(frozen=True)
+class ArchiveStat:
+    """The part of os.stat_result available for an archive member."""
+    st_size: int
+    st_mtime: float
+    st_mtime_ns: int
+
+
+class _ArchiveIndex:
+    """Central directory of an archive: members by name and the folders they imply."""
+
+    def __init__(self, archive: Path):
+        # Only the central directory at the end of the archive is read here
+        self.zip = zipfile.ZipFile(archive)
+        self.files: Dict[str, zipfile.ZipInfo] = {}
+        self.dirs: Set[str] = {""}
+        for info in self.zip.infolist():
+            name = info.filename.rstrip("/")
+            if not info.is_dir():
+                self.files[name] = info
+            parts = name.split("/")
+            self.dirs.update("/".join(parts[:i]) for i in range(1, len(parts) + (1 if info.is_dir() else 0)))
+        stat = archive.stat()
+        self.mtime = stat.st_mtime
+        self.mtime_ns = stat.st_mtime_ns
+
+
+@functools.lru_cache(maxsize=8)
+def _open_index(archive: str, mtime_ns: int, size: int, pid: int) -> _ArchiveIndex:
+    return _ArchiveIndex(Path(archive))
+
+
+def _archive_index(archive: Path) -> _ArchiveIndex:
+    """
+    Open an archive once per process; a rewritten archive is opened again.
+
+    Forked workers open their own handle, since a file offset shared with
+    the parent would interleave their reads.
+    """
+    stat = archive.stat()
+    return _open_index(str(archive), stat.st_mtime_ns, stat.st_size, os.getpid())
+
+
+class ArchivePath:
+    """
+    Path of a file or folder inside a zip archive.
+
+    Implements the part of the pathlib.Path API used on participant folders
+    (joining, is_file, is_dir, iterdir, stat, open), so a participant can be
+    read directly from a dataset archive. Written as
+    'zip://archive.zip!/C1-Fixed-Low/C1-1/hume.csv'.
+    """
+
+    __slots__ = ('archive', 'member')
+
+    def __init__(self, archive: Union[str, Path], member: str = ""):
+        self.archive = Path(archive).absolute()
+        self.member = member.strip("/")
+
+    @classmethod
+    def parse(cls, text: str) -> 'ArchivePath':
+        """Parse 'zip://archive.zip!/member' (the member part is optional)."""
+        location = text[len(ARCHIVE_SCHEME):] if text.startswith(ARCHIVE_SCHEME) else text
+        archive, _, member = location.partition(ARCHIVE_SEPARATOR)
+        return cls(archive.rstrip("!"), member)
+
+    def __str__(self) -> str:
+        return f"{ARCHIVE_SCHEME}{self.archive}{ARCHIVE_SEPARATOR}{self.member}"
+
+    def __repr__(self) -> str:
+        return f"ArchivePath({str(self)!r})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ArchivePath) and (self.archive, self.member) == (other.archive, other.member)
+
+    def __hash__(self) -> int:
+        return hash((self.archive, self.member))
+
+    def __truediv__(self, other: Union[str, Path]) -> 'ArchivePath':
+        child = str(other).strip("/")
+        return ArchivePath(self.archive, f"{self.member}/{child}" if self.member else child)
+
+    def __reduce__(self):
+        return ArchivePath, (self.archive, self.member)
+
+    @property
+    def name(self) -> str:
+        return self.member.rpartition("/")[2] if self.member else self.archive.name
+
+    @property
+    def suffix(self) -> str:
+        return Path(self.name).suffix
+
+    @property
+    def parent(self) -> 'ArchivePath':
+        return ArchivePath(self.archive, self.member.rpartition("/")[0])
+
+    @property
+    def info(self) -> Optional[zipfile.ZipInfo]:
+        """Central directory entry of the member, None for folders and missing members."""
+        try:
+            return _archive_index(self.archive).files.get(self.member)
+        except (OSError, zipfile.BadZipFile):
+            return None
+
+    def is_file(self) -> bool:
+        return self.info is not None
+
+    def is_dir(self) -> bool:
+        try:
+            return self.member in _archive_index(self.archive).dirs
+        except (OSError, zipfile.BadZipFile):
+            return False
+
+    def exists(self) -> bool:
+        return self.is_file() or self.is_dir()
+
+    def iterdir(self) -> Iterator['ArchivePath']:
+        index = _archive_index(self.archive)
+        prefix = f"{self.member}/" if self.member else ""
+        children = {name[len(prefix):].split("/")[0]
+                    for name in list(index.files) + list(index.dirs) if name.startswith(prefix) and name != self.member}
+        for child in sorted(children):
+            yield self / child
+
+    def stat(self) -> ArchiveStat:
+        """Size and modification time of a member; folders report the archive's modification time."""
+        info = self.info
+        if info is None:
+            if not self.is_dir():
+                raise FileNotFoundError(f"File not found: {self}")
+            index = _archive_index(self.archive)
+            return ArchiveStat(0, index.mtime, index.mtime_ns)
+        mtime = datetime(*info.date_time).timestamp()
+        return ArchiveStat(info.file_size, mtime, int(mtime * 1e9))
+
+    def open(self, mode: str = "r", encoding: Optional[str] = None):
+        """Open a member for streamed reading, decompressing on the fly."""
+        if mode not in ("r", "rb"):
+            raise ValueError(f"Archive members are read-only, unsupported mode: {mode}")
+        info = self.info
+        if info is None:
+            raise FileNotFoundError(f"File not found: {self}")
+        stream = _archive_index(self.archive).zip.open(info)
+        return stream if mode == "rb" else io.TextIOWrapper(stream, encoding=encoding or "utf-8")
+
+    def read_bytes(self) -> bytes:
+        with self.open("rb") as stream:
+            return stream.read()
+
+    def read_text(self, encoding: Optional[str] = None) -> str:
+        with self.open("r", encoding=encoding) as stream:
+            return stream.read()
+
+    def byte_range(self) -> Optional[Tuple[int, int]]:
+        """
+        Location of a stored (uncompressed) member in the archive file.
+
+        Returns:
+            (offset, size) of the member data, or None if the member is compressed
+        """
+        info = self.info
+        if info is None or info.compress_type != zipfile.ZIP_STORED or info.flag_bits & 0x1:
+            return None
+        with open(self.archive, "rb") as archive:
+            archive.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(archive.read(_LOCAL_HEADER.size))
+        if header[0] != b"PK\x03\x04":
+            raise ValueError(f"Corrupt local header for {self}")
+        name_length, extra_length = header[-2:]
+        return info.header_offset + _LOCAL_HEADER.size + name_length + extra_length, info.file_size
+
+
+DataPath = Union[Path, ArchivePath]
+
+
+def as_data_path(value: Union[str, Path, ArchivePath]) -> DataPath:
+    """
+    Convert a command line value or path to a data path.
+
+    'zip://' locations and paths of existing .zip files become ArchivePaths
+    (the archive root); everything else is a regular Path.
+    """
+    if isinstance(value, ArchivePath):
+        return value
+    text = str(value)
+    if text.startswith(ARCHIVE_SCHEME):
+        return ArchivePath.parse(text)
+    path = Path(value)
+    if path.suffix.lower() == ".zip" and path.is_file():
+        return ArchivePath(path)
+    return path
+
+
+def local_root(data_path: DataPath) -> Path:
+    """
+    Writable folder for the caches of a dataset.
+
+    Two levels above a participant folder (the data root) on disk, the
+    folder holding the archive for participants read from an archive.
+    """
+    if isinstance(data_path, ArchivePath):
+        return data_path.archive.parent
+    return data_path.parent.parent
+
+
+class ArchiveCache:
+    """
+    Least recently used disk cache of extracted archive members.
+
+    Extracted files are keyed by archive, member and CRC, so an updated
+    archive never serves a stale copy. Files are evicted by last use once
+    the cache exceeds its size.
+    """
+
+    def __init__(self, directory: Union[str, Path] = ARCHIVE_CACHE_DIR, max_bytes: int = ARCHIVE_CACHE_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _cache_file(self, path: ArchivePath, info: zipfile.ZipInfo) -> Path:
+        key = hashlib.sha1(f"{path.archive}|{path.member}|{info.CRC}|{info.file_size}".encode()).hexdigest()[:20]
+        return self.directory / f"{key}{path.suffix}"
+
+    def get(self, path: ArchivePath) -> Path:
+        """Return a local copy of a member, extracting it on first use."""
+        info = path.info
+        if info is None:
+            raise FileNotFoundError(f"File not found: {path}")
+        cache_file = self._cache_file(path, info)
+        with self._lock:
+            if cache_file.is_file():
+                os.utime(cache_file)  # Mark as recently used
+                return cache_file
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+            with path.open("rb") as source, open(tmp_file, "wb") as target:
+                shutil.copyfileobj(source, target, 1 << 20)
+            tmp_file.replace(cache_file)
+            self._evict(keep=cache_file)
+        return cache_file
+
+    def _evict(self, keep: Path) -> None:
+        files = [(file.stat().st_mtime, file.stat().st_size, file)
+                 for file in self.directory.iterdir() if file.is_file() and not file.name.endswith(".tmp")]
+        total = sum(size for _, size, _ in files)
+        for _, size, file in sorted(files):
+            if total <= self.max_bytes:
+                break
+            if file != keep:
+                file.unlink(missing_ok=True)
+                total -= size
+
+    def clear(self) -> None:
+        """Delete every cached file."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+_cache = ArchiveCache()
+
+
+def configure_archive_cache(directory: Optional[Union[str, Path]] = None, max_bytes: Optional[int] = None) -> None:
+    """Change the folder or size of the cache used for compressed archive members."""
+    global _cache
+    _cache = ArchiveCache(directory or _cache.directory, max_bytes if max_bytes is not None else _cache.max_bytes)
+
+
+def media_location(path: Union[str, Path, ArchivePath]) -> str:
+    """
+    Location of a video that FFmpeg-based decoders (OpenCV, PyAV, ffmpeg) can open.
+
+    A stored archive member is read in place through FFmpeg's subfile
+    protocol, which maps the member's byte range of the archive to a file;
+    a compressed member is extracted into the disk cache first.
+    """
+    path = as_data_path(path)
+    if not isinstance(path, ArchivePath):
+        return str(path)
+    byte_range = path.byte_range()
+    if byte_range is None:
+        return str(_cache.get(path))
+    offset, size = byte_range
+    return f"subfile,,start,{offset},end,{offset + size},,:{path.archive}"
@@ -0,0 +1,156 @@
+from pathlib import Path
+from typing import List, Optional, Union
+import numpy as np
+import pandas as pd
+
+from .archive import as_data_path, local_root
+from .readers import CSVReader
+
+# Source files joined into the frame table, in join order
+FRAME_TABLE_SOURCES = ("time.csv", "analysis.csv", "gaze.csv", "facetorch.csv", "hume.csv")
+
+# analysis.csv columns copied onto every frame of a phase
+PHASE_COLUMNS = ['Round No.', 'Object', 'Action', 'Explanation Level', 'State']
+
+# Columns stored as pandas categoricals and indexed by MomentIndex
+CATEGORICAL_COLUMNS = ['Participant', 'Object', 'Action', 'Explanation Level', 'State', 'Gaze', 'FER Label']
+
+DEFAULT_CACHE_DIR = ".reflex_cache"
+
+
+def assign_phases(frames: np.ndarray, analysis: pd.DataFrame) -> np.ndarray:
+    """
+    Find the analysis phase of every frame.
+
+    Phases share their boundary frame (the End Frame of one phase is the Start
+    Frame of the next); such frames are assigned to the later phase.
+
+    Args:
+        frames: Frame numbers
+        analysis: analysis.csv DataFrame
+
+    Returns:
+        Row position in analysis for every frame, -1 outside all phases
+    """
+    if analysis.empty:
+        return np.full(len(frames), -1, dtype=np.int64)
+
+    order = np.argsort(analysis['Start Frame'].to_numpy(), kind='stable')
+    starts = analysis['Start Frame'].to_numpy(dtype=np.float64)[order]
+    ends = analysis['End Frame'].to_numpy(dtype=np.float64)[order]
+
+    idx = np.searchsorted(starts, frames, side='right') - 1
+    clipped = np.clip(idx, 0, None)
+    inside = (idx >= 0) & (frames <= ends[clipped])
+    return np.where(inside, order[clipped], -1)
+
+
+def build_frame_table(data_path: Union[str, Path], participant_code: Optional[str] = None) -> pd.DataFrame:
+    """
+    Join the per-frame data of one participant into a single columnar table.
+
+    The table has one row per time.csv frame with the phase columns of
+    analysis.csv, the gaze label, facetorch affect and all numeric Hume columns.
+    Missing source files leave their columns out.
+
+    Args:
+        data_path: Participant folder
+        participant_code: Participant code, defaults to the folder name
+
+    Returns:
+        Frame-aligned DataFrame with compact dtypes
+    """
+    data_path = as_data_path(data_path)
+    code = participant_code or data_path.name
+
+    times = CSVReader(data_path / "time.csv").read(usecols=['Frame', 'Seconds'])
+    table = pd.DataFrame({
+        'Frame': times['Frame'].to_numpy(dtype=np.int32),
+        'Seconds': times['Seconds'].to_numpy(dtype=np.float32),
+    })
+    frames = table['Frame'].to_numpy()
+
+    if (data_path / "analysis.csv").is_file():
+        analysis = CSVReader(data_path / "analysis.csv").read()
+        phase = assign_phases(frames, analysis)
+        in_phase = phase >= 0
+        table['Phase'] = phase.astype(np.int16)
+        for column in PHASE_COLUMNS:
+            if column not in analysis.columns:
+                continue
+            values = analysis[column].to_numpy()[np.clip(phase, 0, None)] if len(analysis) else phase
+            if column == 'Round No.':
+                table[column] = np.where(in_phase, values, 0).astype(np.int8)
+            else:
+                table[column] = pd.Series(values, dtype=object).where(in_phase)
+
+    if (data_path / "gaze.csv").is_file():
+        gaze = CSVReader(data_path / "gaze.csv").read(usecols=['Frame', 'Gaze'])
+        gaze = gaze.drop_duplicates('Frame').set_index('Frame')['Gaze']
+        table['Gaze'] = gaze.reindex(frames).to_numpy()
+
+    if (data_path / "facetorch.csv").is_file():
+        facetorch = CSVReader(data_path / "facetorch.csv").read(
+            usecols=['Frame ID', 'FER Label', 'Valence', 'Arousal'])
+        facetorch = facetorch.drop_duplicates('Frame ID').set_index('Frame ID').reindex(frames)
+        table['FER Label'] = facetorch['FER Label'].to_numpy()
+        table['Valence'] = facetorch['Valence'].to_numpy(dtype=np.float32)
+        table['Arousal'] = facetorch['Arousal'].to_numpy(dtype=np.float32)
+
+    if (data_path / "hume.csv").is_file():
+        hume = CSVReader(data_path / "hume.csv").read()
+        hume = hume.drop_duplicates('Frame').set_index('Frame')
+        numeric = [col for col in hume.select_dtypes(include='number').columns if col not in table.columns]
+        hume = hume[numeric].reindex(frames).astype(np.float32)
+        table = pd.concat([table, hume.reset_index(drop=True)], axis=1)
+
+    table.insert(0, 'Participant', code)
+    for column in CATEGORICAL_COLUMNS:
+        if column in table.columns:
+            table[column] = table[column].astype('category')
+    return table
+
+
+def _cache_is_current(cache_file: Path, data_path: Path) -> bool:
+    if not cache_file.is_file():
+        return False
+    cache_mtime = cache_file.stat().st_mtime
+    return all(
+        (data_path / name).stat().st_mtime <= cache_mtime
+        for name in FRAME_TABLE_SOURCES if (data_path / name).is_file()
+    )
+
+
+def load_frame_table(data_path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                     participant_code: Optional[str] = None,
+                     columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Load the frame table of a participant, using a cached Parquet copy when current.
+
+    Args:
+        data_path: Participant folder
+        cache_dir: Folder for the cached tables, by default '.reflex_cache/frames'
+            inside the data root (two levels above the participant folder)
+        participant_code: Participant code, defaults to the folder name
+        columns: Subset of columns to read from the cache
+
+    Returns:
+        Frame-aligned DataFrame as returned by build_frame_table
+    """
+    data_path = as_data_path(data_path)
+    code = participant_code or data_path.name
+    cache_dir = Path(cache_dir) if cache_dir else local_root(data_path) / DEFAULT_CACHE_DIR / "frames"
+    cache_file = cache_dir / f"{code}.parquet"
+
+    if _cache_is_current(cache_file, data_path):
+        return pd.read_parquet(cache_file, columns=columns)
+
+    table = build_frame_table(data_path, code)
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp")
+        table.to_parquet(tmp_file, index=False)
+        tmp_file.replace(cache_file)
+    except OSError as e:  # Read-only data roots still work, just without caching
+        print(f"Warning: Could not cache frame table for {code}: {e}")
+    return table[columns] if columns else table
@@ -0,0 +1,290 @@
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+import heapq
+import json
+import os
+
+from ..utils.helpers import STRATEGY_FOLDERS, list_participant_folders, strategy_folder_path
+from .archive import ArchivePath, DataPath, as_data_path
+
+MANIFEST_VERSION = 1
+DEFAULT_MANIFEST_NAME = ".reflex_manifest.json"
+
+# Files expected in every participant folder (see Dataset/DatasetGuide.md)
+PARTICIPANT_FILES = (
+    "analysis.csv", "facetorch.csv", "openface.csv", "gaze.csv", "hume.csv",
+    "body.csv", "speech.csv", "time.csv", "video_cam1.mp4", "video_cam2.mp4",
+)
+
+
+def count_csv_rows(path: Union[str, Path], chunk_size: int = 1 << 20) -> int:
+    """
+    Count the data rows of a CSV file without parsing it.
+
+    Rows are counted as lines after the header, so quoted fields spanning
+    several lines are counted more than once.
+    """
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":  # Last line without a trailing newline
+        lines += 1
+    return max(lines - 1, 0)
+
+
+@dataclass
+class FileEntry:
+    """Metadata of a single participant file."""
+    name: str
+    size: int
+    mtime: float
+    rows: Optional[int] = None
+    video: Optional[Dict] = None
+
+    def is_current(self, stat: os.stat_result) -> bool:
+        """Check whether the entry still matches the file on disk."""
+        return self.size == stat.st_size and self.mtime == stat.st_mtime
+
+
+@dataclass
+class ParticipantEntry:
+    """Manifest entry for one participant folder."""
+    code: str
+    path: str
+    files: Dict[str, FileEntry] = field(default_factory=dict)
+
+    @property
+    def missing(self) -> List[str]:
+        return [name for name in PARTICIPANT_FILES if name not in self.files]
+
+    @property
+    def total_size(self) -> int:
+        return sum(entry.size for entry in self.files.values())
+
+    @property
+    def frame_count(self) -> int:
+        """Number of cam1 frames, falling back to the rows of time.csv."""
+        video = self.files.get("video_cam1.mp4")
+        if video and video.video:
+            return int(video.video.get('frame_count', 0))
+        times = self.files.get("time.csv")
+        return times.rows if times and times.rows else 0
+
+    def has(self, name: str) -> bool:
+        return name in self.files
+
+
+class DatasetManifest:
+    """
+    Cached index of the participants, files and video metadata under a data root.
+
+    The manifest is stored as JSON and refreshed incrementally: files whose size
+    and modification time did not change keep their cached row counts and
+    video metadata.
+    """
+
+    def __init__(self, data_root: Union[str, Path],
+                 participants: Optional[Dict[str, ParticipantEntry]] = None):
+        self.data_root = Path(data_root)
+        self.participants = participants or {}
+
+    def __iter__(self) -> Iterator[ParticipantEntry]:
+        return iter(self.participants.values())
+
+    def __len__(self) -> int:
+        return len(self.participants)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.participants
+
+    def participant(self, code: str) -> Optional[ParticipantEntry]:
+        return self.participants.get(code)
+
+    def participant_folder(self, code: str) -> Optional[Path]:
+        """Get the absolute folder of a participant, or None if it is not in the manifest."""
+        entry = self.participants.get(code)
+        return self.data_root / entry.path if entry else None
+
+    @staticmethod
+    def default_path(data_root: Union[str, Path]) -> Path:
+        return Path(data_root) / DEFAULT_MANIFEST_NAME
+
+    @classmethod
+    def build(cls, data_root: Union[str, Path],
+              previous: Optional['DatasetManifest'] = None) -> 'DatasetManifest':
+        """
+        Scan the data root and build a manifest.
+
+        Args:
+            data_root: Folder containing the strategy folders
+            previous: Earlier manifest whose unchanged entries are reused
+
+        Returns:
+            Up-to-date DatasetManifest
+        """
+        data_root = Path(data_root)
+        participants = {}
+        for code, folder in list_participant_folders(data_root).items():
+            cached = previous.participant(code) if previous else None
+            entry = ParticipantEntry(code=code, path=folder.relative_to(data_root).as_posix())
+
+            for name in PARTICIPANT_FILES:
+                file_path = folder / name
+                try:
+                    stat = file_path.stat()
+                except FileNotFoundError:
+                    continue
+
+                cached_file = cached.files.get(name) if cached else None
+                if cached_file and cached_file.is_current(stat):
+                    entry.files[name] = cached_file
+                else:
+                    entry.files[name] = cls._scan_file(file_path, stat)
+
+            participants[code] = entry
+
+        return cls(data_root, participants)
+
+    @staticmethod
+    def _scan_file(file_path: Path, stat: os.stat_result) -> FileEntry:
+        """Collect the metadata of a single file."""
+        entry = FileEntry(name=file_path.name, size=stat.st_size, mtime=stat.st_mtime)
+        if file_path.suffix == ".csv":
+            entry.rows = count_csv_rows(file_path)
+        elif file_path.suffix == ".mp4":
+            from .readers import VideoReader
+            try:
+                entry.video = VideoReader(file_path).read()
+            except (ValueError, ZeroDivisionError):
+                entry.video = None
+        return entry
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> 'DatasetManifest':
+        """Load a manifest from a JSON file."""
+        path = Path(path)
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        if raw.get('version') != MANIFEST_VERSION:
+            raise ValueError(f"Unsupported manifest version in {path}: {raw.get('version')}")
+
+        participants = {
+            code: ParticipantEntry(
+                code=code,
+                path=item['path'],
+                files={name: FileEntry(**file) for name, file in item['files'].items()},
+            )
+            for code, item in raw['participants'].items()
+        }
+        return cls(raw['data_root'], participants)
+
+    def save(self, path: Optional[Union[str, Path]] = None) -> Path:
+        """Write the manifest as JSON, by default into the data root."""
+        path = Path(path) if path else self.default_path(self.data_root)
+        raw = {
+            'version': MANIFEST_VERSION,
+            'data_root': str(self.data_root),
+            'participants': {code: asdict(entry) for code, entry in self.participants.items()},
+        }
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(raw, f, indent=1)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load_or_build(cls, data_root: Union[str, Path], path: Optional[Union[str, Path]] = None,
+                      refresh: bool = True) -> 'DatasetManifest':
+        """
+        Load the cached manifest, refreshing and saving it if requested.
+
+        Args:
+            data_root: Folder containing the strategy folders
+            path: Manifest file, by default inside the data root
+            refresh: Rescan changed files; if False a cached manifest is returned as is
+
+        Returns:
+            DatasetManifest
+        """
+        path = Path(path) if path else cls.default_path(data_root)
+        previous = None
+        if path.is_file():
+            try:
+                previous = cls.load(path)
+            except (ValueError, KeyError, TypeError, json.JSONDecodeError):
+                previous = None
+            if previous is not None:
+                previous.data_root = Path(data_root)
+                if not refresh:
+                    return previous
+
+        manifest = cls.build(data_root, previous)
+        manifest.save(path)
+        return manifest
+
+    def plan_batches(self, n_workers: int, codes: Optional[List[str]] = None) -> List[List[str]]:
+        """
+        Split participants into balanced batches by size (longest processing time first).
+
+        Args:
+            n_workers: Number of batches to create
+            codes: Participants to schedule, all participants by default
+
+        Returns:
+            List of participant code lists, one per worker
+        """
+        codes = list(codes) if codes is not None else list(self.participants)
+        n_workers = max(1, min(n_workers, len(codes))) if codes else 1
+        heap = [(0, i) for i in range(n_workers)]
+        batches: List[List[str]] = [[] for _ in range(n_workers)]
+        for code in sorted(codes, key=lambda c: self.participants[c].total_size, reverse=True):
+            load, i = heapq.heappop(heap)
+            batches[i].append(code)
+            heapq.heappush(heap, (load + self.participants[code].total_size, i))
+        return batches
+
+    def to_dataframe(self):
+        """Return one row per participant file as a pandas DataFrame."""
+        import pandas as pd
+
+        rows = []
+        for entry in self:
+            for name, file in entry.files.items():
+                row = {'Participant': entry.code, 'File': name, 'Size': file.size,
+                       'Modified': file.mtime, 'Rows': file.rows}
+                if file.video:
+                    row.update({'Frames': file.video.get('frame_count'), 'FPS': file.video.get('fps'),
+                                'Width': file.video.get('width'), 'Height': file.video.get('height')})
+                rows.append(row)
+        return pd.DataFrame(rows)
+
+
+def resolve_participant_folder(code: str, data_root: Union[str, Path, ArchivePath]) -> Optional[DataPath]:
+    """
+    Resolve a participant folder using the cached manifest when present.
+
+    Falls back to the strategy folder naming convention without scanning;
+    archives are never scanned into a manifest, only resolved by convention.
+    """
+    data_root = as_data_path(data_root)
+    if isinstance(data_root, Path):
+        manifest_path = DatasetManifest.default_path(data_root)
+        if manifest_path.is_file():
+            try:
+                entry = DatasetManifest.load(manifest_path).participant(code)
+                if entry is not None:
+                    return data_root / entry.path
+            except (ValueError, KeyError, TypeError, json.JSONDecodeError):
+                pass
+
+    strategy = code[:2]
+    if strategy not in STRATEGY_FOLDERS:
+        return None
+    return strategy_folder_path(data_root, STRATEGY_FOLDERS[strategy]) / code
@@ -0,0 +1,201 @@
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+import re
+import threading
+import time
+
+import pandas as pd
+
+from .archive import as_data_path
+from .readers import AudioDataReader, CSVReader
+from ..utils.memory import downcast_floats
+
+EXECUTORS = ("thread", "process")
+
+
+def _read_analysis(path: Path, **options) -> pd.DataFrame:
+    return CSVReader(path).read()
+
+
+def _read_times(path: Path, **options) -> pd.DataFrame:
+    return CSVReader(path).read().set_index('Frame')
+
+
+def _read_openface(path: Path, face_3d: bool = True, **options) -> pd.DataFrame:
+    # Without the 3D face the X_/Y_/Z_ landmark columns are never parsed
+    usecols = None if face_3d else (lambda col: re.fullmatch(r"[XYZ]_\d+", col) is None)
+    return downcast_floats(CSVReader(path).read(usecols=usecols).set_index('frame'))
+
+
+def _read_speech(path: Path, **options) -> List[Dict]:
+    return AudioDataReader(path).read()
+
+
+def _read_gaze(path: Path, **options):
+    from ..core.gaze import GazeTimeline
+    return GazeTimeline.from_dataframe(CSVReader(path).read())
+
+
+def _read_body(path: Path, body_3d: bool = True, **options) -> pd.DataFrame:
+    usecols = None if body_3d else (lambda col: "_3d_" not in col)
+    return downcast_floats(CSVReader(path).read(usecols=usecols))
+
+
+def _read_frame_data(path: Path, **options) -> pd.DataFrame:
+    return downcast_floats(CSVReader(path).read())
+
+
+def _empty_gaze():
+    from ..core.gaze import GazeTimeline
+    return GazeTimeline.from_frame_labels([], [])
+
+
+@dataclass(frozen=True)
+class Modality:
+    """A participant file and how to load it, or what stands in for it when the file is absent."""
+    name: str
+    file: str
+    read: Callable[..., Any]  # Module level, so that it can run in a worker process
+    absent: Callable[[], Any]
+
+
+MODALITIES: Dict[str, Modality] = {modality.name: modality for modality in (
+    Modality("analysis", "analysis.csv", _read_analysis,
+             lambda: pd.DataFrame(columns=['Round No.', 'Action', 'State', 'Start Frame', 'End Frame'])),
+    Modality("times", "time.csv", _read_times, lambda: pd.DataFrame(columns=['Frame', 'Seconds']).set_index('Frame')),
+    Modality("openface", "openface.csv", _read_openface, lambda: pd.DataFrame(columns=['frame']).set_index('frame')),
+    Modality("speech", "speech.csv", _read_speech, list),
+    Modality("gaze", "gaze.csv", _read_gaze, _empty_gaze),
+    Modality("body", "body.csv", _read_body, lambda: pd.DataFrame(columns=['Frame'])),
+    Modality("hume", "hume.csv", _read_frame_data, lambda: pd.DataFrame(columns=['Frame'])),
+    Modality("facetorch", "facetorch.csv", _read_frame_data, lambda: pd.DataFrame(columns=['Frame ID'])),
+)}
+
+
+def _load_task(name: str, data_path: Path, options: Dict[str, Any]) -> Tuple[Any, float]:
+    start = time.perf_counter()
+    modality = MODALITIES[name]
+    return modality.read(data_path / modality.file, **options), time.perf_counter() - start
+
+
+class ModalityLoader:
+    """
+    Load the modality files of a participant concurrently and on demand.
+
+    Modalities passed to start are read in a thread or process pool right
+    away; any other modality is read synchronously the first time it is
+    requested. A missing file is not an error: the modality is marked absent
+    and an empty stand-in value is returned instead.
+    """
+
+    def __init__(self, data_path: Union[str, Path], workers: int = 4, executor: str = "thread",
+                 **options):
+        """
+        Args:
+            data_path: Participant folder
+            workers: Maximum number of files read at the same time
+            executor: 'thread' or 'process' pool
+            **options: Passed to the readers (face_3d, body_3d)
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor} (choose from {', '.join(EXECUTORS)})")
+        self.data_path = as_data_path(data_path)
+        self.workers = max(1, workers)
+        self.executor = executor
+        self.options = options
+        self.absent: Set[str] = set()
+        self.timings: Dict[str, float] = {}
+        self._futures: Dict[str, Future] = {}
+        self._values: Dict[str, Any] = {}
+        self._pool: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _exists(self, name: str) -> bool:
+        if (self.data_path / MODALITIES[name].file).is_file():
+            return True
+        if name not in self.absent:
+            self.absent.add(name)
+            print(f"Note: {MODALITIES[name].file} not found, {name} data is absent")
+        return False
+
+    def start(self, names: Iterable[str]) -> None:
+        """Start reading the given modalities in the background."""
+        names = [name for name in names
+                 if name not in self._futures and name not in self._values and self._exists(name)]
+        if not names:
+            return
+        if self._pool is None:
+            pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+            self._pool = pool_class(max_workers=min(self.workers, len(names)))
+        for name in names:
+            self._futures[name] = self._pool.submit(_load_task, name, self.data_path, self.options)
+
+    def loaded(self, name: str) -> bool:
+        return name in self._values
+
+    def get(self, name: str) -> Any:
+        """
+        Return a modality, waiting for its background read or reading it now.
+
+        Raises:
+            ValueError: If the file exists but cannot be parsed
+        """
+        with self._lock:
+            if name in self._values:
+                return self._values[name]
+            if name in self._futures:
+                value, elapsed = self._futures.pop(name).result()
+            elif self._exists(name):
+                value, elapsed = _load_task(name, self.data_path, self.options)
+            else:
+                value, elapsed = MODALITIES[name].absent(), 0.0
+            self._values[name] = value
+            self.timings[name] = elapsed
+            return value
+
+    def close(self) -> None:
+        """Shut the pool down, cancelling reads that were never requested."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def summary(self) -> str:
+        """One line listing the loaded modalities, the slowest one and the absent ones."""
+        loaded = {name: elapsed for name, elapsed in self.timings.items() if name not in self.absent}
+        if loaded:
+            slowest = max(loaded, key=loaded.get)
+            text = (f"Loaded {len(loaded)} modalities ({', '.join(sorted(loaded))}), "
+                    f"slowest {slowest} {loaded[slowest]:.2f}s")
+        else:
+            text = "No modalities loaded"
+        if self.absent:
+            text += f"; absent: {', '.join(sorted(self.absent))}"
+        return text
+
+
+class LazyModality:
+    """
+    Attribute descriptor backed by a ModalityLoader.
+
+    The first read of the attribute fetches the modality from the instance's
+    `modalities` loader and keeps it in the instance dictionary; assigning
+    the attribute replaces the value, e.g. after dropping columns.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        if self.name not in obj.__dict__:
+            obj.__dict__[self.name] = obj.modalities.get(self.name)
+            on_load = getattr(obj, '_on_modality_loaded', None)
+            if on_load is not None:
+                on_load(self.name)
+        return obj.__dict__[self.name]
+
+    def __set__(self, obj, value) -> None:
+        obj.__dict__[self.name] = value
@@ -0,0 +1,263 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import csv
+import difflib
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from .archive import DataPath, as_data_path
+from .frame_table import PHASE_COLUMNS, assign_phases
+from .manifest import PARTICIPANT_FILES
+from .readers import FRAME_COLUMNS, CSVReader, VideoReader
+
+ERROR = "error"
+WARNING = "warning"
+
+# Without these files a run cannot start
+REQUIRED_FILES = ("time.csv", "analysis.csv", "video_cam1.mp4")
+
+# Columns the loaders read from each file
+REQUIRED_COLUMNS = {
+    "time.csv": ['Frame', 'Seconds'],
+    "analysis.csv": ['Start Frame', 'End Frame'] + PHASE_COLUMNS,
+    "gaze.csv": ['Frame', 'Gaze'],
+    "facetorch.csv": ['Frame ID', 'FER Label', 'Valence', 'Arousal'],
+    "hume.csv": ['Frame', 'x', 'y', 'w', 'h'],
+    "openface.csv": ['frame', 'success', 'confidence'],
+    "body.csv": ['Frame'],
+    "speech.csv": ['Id', 'Text', 'BeginTime', 'EndTime'],
+}
+
+# Per-frame files that only have rows inside the analysis phases
+PHASE_BOUND_FILES = ("gaze.csv", "hume.csv")
+
+
+@dataclass
+class Issue:
+    """A problem found in a participant folder; errors stop a run, warnings degrade it."""
+    participant: str
+    file: str
+    severity: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.severity.capitalize()}: {self.participant} {self.file}: {self.message}"
+
+
+def _rows(positions: npt.NDArray[np.int64], limit: int = 5) -> str:
+    """Describe data rows by their line numbers in the file (the header is line 1)."""
+    lines = ", ".join(str(position + 2) for position in positions[:limit])
+    more = f" and {len(positions) - limit} more" if len(positions) > limit else ""
+    return f"line{'s' if len(positions) > 1 else ''} {lines}{more}"
+
+
+class _Preflight:
+    """Checks of one participant folder, collecting every issue instead of stopping at the first."""
+
+    def __init__(self, data_path: DataPath, code: str):
+        self.data_path = data_path
+        self.code = code
+        self.issues: List[Issue] = []
+        self.headers: Dict[str, List[str]] = {}
+        self.frame_count: Optional[int] = None
+        self.analysis: Optional[pd.DataFrame] = None
+
+    def report(self, file: str, severity: str, message: str) -> None:
+        self.issues.append(Issue(self.code, file, severity, message))
+
+    def read(self, name: str, columns: List[str]) -> pd.DataFrame:
+        return CSVReader(self.data_path / name).read(usecols=columns)
+
+    def numbers(self, name: str, values: pd.Series) -> npt.NDArray[np.float64]:
+        """Column as floats; cells that are not numbers are reported and become NaN, empty cells stay NaN."""
+        numbers = pd.to_numeric(values, errors='coerce')
+        invalid = np.flatnonzero((numbers.isna() & values.notna()).to_numpy())
+        if len(invalid):
+            self.report(name, ERROR, f"{values.name} is not a number at {_rows(invalid)}")
+        return numbers.to_numpy(dtype=np.float64)
+
+    def check_files(self) -> None:
+        """Report missing files and read the header of every CSV file."""
+        for name in PARTICIPANT_FILES:
+            if not (self.data_path / name).is_file():
+                self.report(name, ERROR if name in REQUIRED_FILES else WARNING, "File is missing")
+
+        for name, required in REQUIRED_COLUMNS.items():
+            if not (self.data_path / name).is_file():
+                continue
+            try:
+                # Only the first line; pandas would build an empty column for each of the hundreds of AUs
+                with (self.data_path / name).open("r", encoding="utf-8") as stream:
+                    header = next(csv.reader(stream), [])
+            except (UnicodeDecodeError, csv.Error, OSError) as e:
+                self.report(name, ERROR, f"Could not read the header: {e}")
+                continue
+            missing = [column for column in required if column not in header]
+            for column in missing:
+                close = difflib.get_close_matches(column, header, n=1, cutoff=0.6)
+                hint = f" (found '{close[0]}')" if close else ""
+                self.report(name, ERROR, f"Column '{column}' is missing{hint}")
+            if not missing:
+                self.headers[name] = header
+
+    def check_videos(self) -> None:
+        """Read the video metadata; the cam1 frame count bounds every frame number."""
+        for name in ("video_cam1.mp4", "video_cam2.mp4"):
+            if not (self.data_path / name).is_file():
+                continue
+            severity = ERROR if name in REQUIRED_FILES else WARNING
+            try:
+                frame_count = VideoReader(self.data_path / name).read()['frame_count']
+            except ValueError as e:
+                self.report(name, severity, str(e))
+                continue
+            if frame_count <= 0:
+                self.report(name, severity, "Video has no frames")
+            elif name == "video_cam1.mp4":
+                self.frame_count = frame_count
+
+    def check_times(self) -> None:
+        if "time.csv" not in self.headers:
+            return
+        times = self.read("time.csv", REQUIRED_COLUMNS["time.csv"])
+        frames = self.numbers("time.csv", times['Frame'])
+        seconds = self.numbers("time.csv", times['Seconds'])
+
+        unordered = np.flatnonzero(np.diff(frames) <= 0) + 1
+        if len(unordered):
+            self.report("time.csv", ERROR, f"Frame is not strictly increasing at {_rows(unordered)}")
+        missing = np.flatnonzero(times[['Frame', 'Seconds']].isna().any(axis=1).to_numpy())
+        if len(missing):
+            self.report("time.csv", ERROR, f"Frame or Seconds is empty at {_rows(missing)}")
+        backwards = np.flatnonzero(np.diff(seconds) < 0) + 1
+        if len(backwards):
+            self.report("time.csv", WARNING, f"Seconds decreases at {_rows(backwards)}")
+        if self.frame_count and len(frames) != self.frame_count:
+            self.report("time.csv", WARNING, f"{len(frames)} rows for {self.frame_count} cam1 frames")
+
+    def check_analysis(self) -> None:
+        if "analysis.csv" not in self.headers:
+            return
+        analysis = self.read("analysis.csv", REQUIRED_COLUMNS["analysis.csv"])
+        starts = self.numbers("analysis.csv", analysis['Start Frame'])
+        ends = self.numbers("analysis.csv", analysis['End Frame'])
+
+        missing = np.flatnonzero(analysis[['Start Frame', 'End Frame']].isna().any(axis=1).to_numpy())
+        if len(missing):
+            self.report("analysis.csv", ERROR, f"Start Frame or End Frame is empty at {_rows(missing)}")
+        inverted = np.flatnonzero(starts > ends)
+        if len(inverted):
+            self.report("analysis.csv", ERROR, f"Phase ends before it starts at {_rows(inverted)}")
+        if self.frame_count:
+            beyond = np.flatnonzero(ends > self.frame_count)
+            if len(beyond):
+                self.report("analysis.csv", ERROR,
+                            f"Phase ends after the last cam1 frame ({self.frame_count}) at {_rows(beyond)}")
+
+        # Consecutive phases may share their boundary frame, but not more
+        order = np.argsort(starts, kind='stable')
+        overlapping = order[1:][starts[order][1:] < ends[order][:-1]]
+        if len(overlapping):
+            self.report("analysis.csv", WARNING, f"Phase overlaps the previous phase at {_rows(np.sort(overlapping))}")
+
+        empty = np.flatnonzero(analysis[['Action', 'State']].isna().any(axis=1).to_numpy())
+        if len(empty):
+            self.report("analysis.csv", WARNING, f"Action or State is empty at {_rows(empty)}")
+        # Phases are only assigned from complete, numeric bounds
+        if not (np.isnan(starts).any() or np.isnan(ends).any()):
+            self.analysis = analysis.assign(**{'Start Frame': starts, 'End Frame': ends})
+
+    def check_frame_files(self) -> None:
+        for name, column in FRAME_COLUMNS.items():
+            if name == "time.csv" or name not in self.headers:
+                continue
+            values = self.read(name, [column])[column]
+            frames = self.numbers(name, values)
+
+            missing = np.flatnonzero(values.isna().to_numpy())
+            if len(missing):
+                self.report(name, WARNING, f"{column} is empty at {_rows(missing)}")
+            if self.frame_count:
+                outside = np.flatnonzero((frames < 0) | (frames > self.frame_count))
+                if len(outside):
+                    self.report(name, WARNING, f"{len(outside)} rows outside the cam1 frames "
+                                               f"(0 to {self.frame_count}), at {_rows(outside)}")
+            valid = frames[~np.isnan(frames)]
+            duplicates = len(valid) - len(np.unique(valid))
+            if duplicates:
+                self.report(name, WARNING, f"{duplicates} rows repeat an earlier {column}")
+            if name in PHASE_BOUND_FILES and self.analysis is not None and len(self.analysis):
+                numbered = np.flatnonzero(~np.isnan(frames))  # Rows without a frame number are reported above
+                outside = numbered[assign_phases(frames[numbered], self.analysis) < 0]
+                if len(outside):
+                    self.report(name, WARNING, f"{len(outside)} rows outside the analysis phases, at {_rows(outside)}")
+
+
+def validate_participant(data_path: Union[str, Path, DataPath], participant_code: Optional[str] = None,
+                         check_video: bool = True) -> List[Issue]:
+    """
+    Check a participant folder before anything is decoded.
+
+    Only the CSV headers and the columns that are checked are read, plus
+    the video metadata. The checks cover missing files and columns (with the
+    closest existing column name), frame order in time.csv, phase bounds
+    against the cam1 length, and per-frame rows outside the video or the
+    analysis phases.
+
+    Args:
+        data_path: Participant folder
+        participant_code: Participant code, defaults to the folder name
+        check_video: Open the videos to check them and read the cam1 frame count
+
+    Returns:
+        Every issue found, errors first
+    """
+    data_path = as_data_path(data_path)
+    preflight = _Preflight(data_path, participant_code or data_path.name)
+    preflight.check_files()
+    if check_video:
+        preflight.check_videos()
+    preflight.check_times()
+    preflight.check_analysis()
+    preflight.check_frame_files()
+    return sorted(preflight.issues, key=lambda issue: issue.severity != ERROR)
+
+
+def has_errors(issues: List[Issue]) -> bool:
+    return any(issue.severity == ERROR for issue in issues)
+
+
+def _preflight_task(args) -> tuple:
+    code, data_path, check_video = args
+    try:
+        return code, validate_participant(data_path, code, check_video)
+    except (ValueError, OSError) as e:
+        return code, [Issue(code, "", ERROR, f"Preflight failed: {e}")]
+
+
+def validate_dataset(participant_folders: Dict[str, Union[str, Path, DataPath]], workers: int = 4,
+                     check_video: bool = True) -> Dict[str, List[Issue]]:
+    """
+    Check many participants in a process pool.
+
+    Args:
+        participant_folders: Mapping of participant code to folder
+        workers: Number of worker processes
+        check_video: Open the videos to check them and read the cam1 frame count
+
+    Returns:
+        Issues of every participant, by code
+    """
+    tasks = [(code, as_data_path(folder), check_video) for code, folder in participant_folders.items()]
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_preflight_task, task) for task in tasks]
+        for future in as_completed(futures):
+            code, issues = future.result()
+            results[code] = issues
+    return dict(sorted(results.items()))
@@ -0,0 +1,201 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from .archive import DataPath, as_data_path, local_root
+from .frame_table import DEFAULT_CACHE_DIR, FRAME_TABLE_SOURCES, load_frame_table
+
+# Decimation factors of the pyramid levels; factor 1 is the frame table itself
+PYRAMID_FACTORS = (8, 64, 512)
+
+STATISTICS = ("min", "max", "mean")
+
+# Frame table columns that are not time series
+NON_SERIES_COLUMNS = {'Frame', 'Seconds', 'Phase', 'Round No.', 'x', 'y', 'w', 'h'}
+
+# Series points per stream that '--detail auto' aims to stay under
+AUTO_MAX_POINTS = 2000
+
+
+def series_columns(table: pd.DataFrame) -> List[str]:
+    """Numeric time series of a frame table (facetorch affect, Hume emotions and AUs)."""
+    return [column for column in table.select_dtypes(include='number').columns if column not in NON_SERIES_COLUMNS]
+
+
+def build_pyramid_level(table: pd.DataFrame, factor: int, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    Decimate the series of a frame table into bins of `factor` frames.
+
+    Bin k holds frames k * factor + 1 to (k + 1) * factor. Every bin has
+    the Frame and Seconds of its first frame, the number of frames in it,
+    and '<column>:min', '<column>:max' and '<column>:mean' of every series,
+    ignoring missing values (NaN if the bin has none).
+
+    Args:
+        table: Frame table sorted by frame
+        factor: Frames per bin
+        columns: Series to decimate, all numeric series by default
+
+    Returns:
+        One row per bin holding at least one frame
+    """
+    columns = series_columns(table) if columns is None else list(columns)
+    frames = table['Frame'].to_numpy()
+    bins = (frames - 1) // factor
+    starts = np.flatnonzero(np.r_[True, bins[1:] != bins[:-1]]) if len(frames) else np.array([], dtype=np.int64)
+
+    level = {
+        'Frame': frames[starts],
+        'Seconds': table['Seconds'].to_numpy()[starts],
+        'Frames': np.diff(np.r_[starts, len(frames)]).astype(np.int32),
+    }
+    if not len(starts):
+        return pd.DataFrame(level | {f"{column}:{stat}": [] for column in columns for stat in STATISTICS})
+
+    for column in columns:
+        values = table[column].to_numpy(dtype=np.float32)
+        valid = ~np.isnan(values)
+        counts = np.add.reduceat(valid.astype(np.int32), starts)
+        sums = np.add.reduceat(np.where(valid, values, 0).astype(np.float64), starts)
+        # fmin/fmax skip NaN unless the whole bin is NaN
+        level[f"{column}:min"] = np.fmin.reduceat(values, starts)
+        level[f"{column}:max"] = np.fmax.reduceat(values, starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            level[f"{column}:mean"] = np.where(counts > 0, sums / counts, np.nan).astype(np.float32)
+    return pd.DataFrame(level)
+
+
+def choose_factor(frame_count: int, factors: Sequence[int] = PYRAMID_FACTORS,
+                  max_points: int = AUTO_MAX_POINTS) -> int:
+    """Smallest decimation factor that keeps a series of frame_count frames under max_points, else the largest."""
+    for factor in sorted(factors):
+        if math.ceil(frame_count / factor) <= max_points:
+            return factor
+    return max(factors)
+
+
+def _pyramid_dir(data_path: DataPath, cache_dir: Optional[Union[str, Path]]) -> Path:
+    return Path(cache_dir) if cache_dir else local_root(data_path) / DEFAULT_CACHE_DIR / "pyramids"
+
+
+def _cache_is_current(cache_file: Path, data_path: Path) -> bool:
+    if not cache_file.is_file():
+        return False
+    cache_mtime = cache_file.stat().st_mtime
+    return all(
+        (data_path / name).stat().st_mtime <= cache_mtime
+        for name in FRAME_TABLE_SOURCES if (data_path / name).is_file()
+    )
+
+
+def build_pyramids(data_path: Union[str, Path], factors: Sequence[int] = PYRAMID_FACTORS,
+                   cache_dir: Optional[Union[str, Path]] = None, participant_code: Optional[str] = None,
+                   force: bool = False) -> Dict[int, Path]:
+    """
+    Build and cache the pyramid levels of a participant as Parquet files.
+
+    The levels are stored next to the cached frame tables, one file per
+    level, so an overview only reads the level it shows. Levels that are
+    newer than their source files are kept.
+
+    Args:
+        data_path: Participant folder
+        factors: Decimation factors to build
+        cache_dir: Folder for the levels, by default '.reflex_cache/pyramids' inside the data root
+        participant_code: Participant code, defaults to the folder name
+        force: Rebuild levels that are still current
+
+    Returns:
+        Cached file of every level
+    """
+    data_path = as_data_path(data_path)
+    code = participant_code or data_path.name
+    cache_dir = _pyramid_dir(data_path, cache_dir)
+    files = {factor: cache_dir / f"{code}-x{factor}.parquet" for factor in factors}
+    stale = [factor for factor, file in files.items() if force or not _cache_is_current(file, data_path)]
+    if not stale:
+        return files
+
+    table = load_frame_table(data_path, participant_code=code)
+    columns = series_columns(table)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for factor in stale:
+        tmp_file = files[factor].with_suffix(".tmp")
+        build_pyramid_level(table, factor, columns).to_parquet(tmp_file, index=False)
+        tmp_file.replace(files[factor])
+    return files
+
+
+def load_pyramid(data_path: Union[str, Path], factor: int, columns: Optional[Sequence[str]] = None,
+                 cache_dir: Optional[Union[str, Path]] = None,
+                 participant_code: Optional[str] = None) -> pd.DataFrame:
+    """
+    Load one pyramid level of a participant, building the cached levels when needed.
+
+    Args:
+        data_path: Participant folder
+        factor: Decimation factor of the level
+        columns: Series to read (all three statistics of each), all by default
+        cache_dir: Folder for the levels, by default '.reflex_cache/pyramids' inside the data root
+        participant_code: Participant code, defaults to the folder name
+
+    Returns:
+        Level as returned by build_pyramid_level
+    """
+    factors = sorted(set(PYRAMID_FACTORS) | {factor})
+    cache_file = build_pyramids(data_path, factors, cache_dir, participant_code)[factor]
+    if columns is None:
+        return pd.read_parquet(cache_file)
+    import pyarrow.parquet as pq  # Installed with rerun-sdk
+
+    available = set(pq.read_schema(cache_file).names)
+    wanted = ['Frame', 'Seconds', 'Frames'] + [f"{column}:{stat}" for column in columns for stat in STATISTICS]
+    return pd.read_parquet(cache_file, columns=[column for column in wanted if column in available])
+
+
+def _pyramid_task(args) -> Tuple[str, Optional[str]]:
+    code, data_path, factors, cache_dir, force = args
+    try:
+        build_pyramids(data_path, factors, cache_dir, code, force)
+    except (ValueError, OSError, KeyError) as e:
+        return code, str(e)
+    return code, None
+
+
+def build_all_pyramids(participant_folders: Dict[str, Union[str, Path, DataPath]],
+                       factors: Sequence[int] = PYRAMID_FACTORS, cache_dir: Optional[Union[str, Path]] = None,
+                       workers: int = 4, force: bool = False) -> List[str]:
+    """
+    Build (or refresh) the cached pyramids of many participants in a process pool.
+
+    Args:
+        participant_folders: Mapping of participant code to folder
+        factors: Decimation factors to build
+        cache_dir: Folder for the levels, by default '.reflex_cache/pyramids' of each dataset
+        workers: Number of worker processes
+        force: Rebuild levels that are still current
+
+    Returns:
+        Codes of the participants with pyramids
+    """
+    tasks = [(code, as_data_path(folder), tuple(factors), cache_dir, force)
+             for code, folder in participant_folders.items()]
+
+    done = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_pyramid_task, task) for task in tasks]
+        for future in as_completed(futures):
+            code, error = future.result()
+            if error:
+                print(f"Warning: No pyramids for {code}: {error}")
+            else:
+                done.append(code)
+
+    print(f"Pyramids for {len(done)} participants in {time.perf_counter() - start:.1f}s")
+    return sorted(done)
@@ -5,12 +5,24 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from .archive import ArchivePath, as_data_path, media_location
+
+# Name of the frame number column of every frame-indexed participant file
+FRAME_COLUMNS = {
+    "time.csv": "Frame",
+    "openface.csv": "frame",
+    "gaze.csv": "Frame",
+    "body.csv": "Frame",
+    "hume.csv": "Frame",
+    "facetorch.csv": "Frame ID",
+}
+
 
 class DataReader:
     """Base class for data readers."""
 
     def __init__(self, file_path: Union[str, Path]):
-        self.file_path = Path(file_path)
+        self.file_path = as_data_path(file_path)
         if not self.file_path.exists():
             raise FileNotFoundError(f"File not found: {self.file_path}")
 
@@ -29,6 +41,9 @@ class CSVReader(DataReader):
     def read(self, **kwargs) -> pd.DataFrame:
         """Read CSV file into pandas DataFrame."""
         try:
+            if isinstance(self.file_path, ArchivePath):  # Streamed from the archive without extracting
+                with self.file_path.open("rb") as stream:
+                    return pd.read_csv(stream, encoding=self.encoding, **kwargs)
             return pd.read_csv(self.file_path, encoding=self.encoding, **kwargs)
         except Exception as e:
             raise ValueError(f"Error reading CSV {self.file_path}: {str(e)}")
@@ -39,7 +54,11 @@ class AudioDataReader(CSVReader):
 
     def read(self) -> List[Dict]:
         """Read and parse audio data with emotion scores."""
-        df = super().read()
+        return self.parse(super().read())
+
+    @staticmethod
+    def parse(df: pd.DataFrame) -> List[Dict]:
+        """Convert speech.csv rows into segment dictionaries."""
         try:
             required_columns = ['Id', 'Text', 'BeginTime', 'EndTime']
             if not all(col in df.columns for col in required_columns):
@@ -100,17 +119,17 @@ class VideoReader(DataReader):
     def read(self) -> Dict:
         """Read video metadata."""
         import cv2
-        cap = cv2.VideoCapture(str(self.file_path))
+        cap = cv2.VideoCapture(media_location(self.file_path))
         if not cap.isOpened():
             raise ValueError(f"Could not open video file: {self.file_path}")
 
+        fps = cap.get(cv2.CAP_PROP_FPS)
         metadata = {
             'frame_count': int(cap.get(cv2.CAP_PROP_FRAME_COUNT)),
-            'fps': cap.get(cv2.CAP_PROP_FPS),
+            'fps': fps,
             'width': int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
             'height': int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-            'duration': float(cap.get(cv2.CAP_PROP_FRAME_COUNT) /
-                              cap.get(cv2.CAP_PROP_FPS))
+            'duration': float(cap.get(cv2.CAP_PROP_FRAME_COUNT) / fps) if fps else 0.0
         }
         cap.release()
         return metadata
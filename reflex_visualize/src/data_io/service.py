@@ -0,0 +1,364 @@
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+from urllib.parse import parse_qs, unquote, urlsplit
+import io
+import json
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from .archive import DataPath, as_data_path
+from .frame_table import PHASE_COLUMNS, load_frame_table
+from .modalities import MODALITIES
+from .readers import CSVReader
+
+# Frame-table columns served for each modality; 'hume' is every other numeric column
+TABLE_MODALITIES = {
+    'phase': ['Phase'] + PHASE_COLUMNS,
+    'gaze': ['Gaze'],
+    'facetorch': ['FER Label', 'Valence', 'Arousal'],
+}
+
+# Wide per-frame files read with the visualiser's loaders on first request, and their frame column
+FILE_MODALITIES = {'openface': 'frame', 'body': 'Frame'}
+
+SERVICE_MODALITIES = (*TABLE_MODALITIES, 'hume', *FILE_MODALITIES)
+
+BASE_COLUMNS = ['Frame', 'Seconds']
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+
+
+class ServiceError(Exception):
+    """A request the service cannot answer, with the HTTP status to answer it with."""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class FrameSlices:
+    """Rows sorted by frame number, so that frame ranges are found by binary search."""
+
+    def __init__(self, table: pd.DataFrame, frame_column: str):
+        self.table = table.sort_values(frame_column, kind='stable').reset_index(drop=True)
+        self.frame_column = frame_column
+        self.frames = self.table[frame_column].to_numpy()
+
+    def range(self, start: int, end: int) -> pd.DataFrame:
+        """Rows of the frames from start to end, both included."""
+        lo = np.searchsorted(self.frames, start, side='left')
+        hi = np.searchsorted(self.frames, end, side='right')
+        return self.table.iloc[lo:hi]
+
+
+class ParticipantData:
+    """
+    In-memory tables of one participant.
+
+    The frame table (phases, gaze, facetorch and Hume) is loaded up front;
+    OpenFace and body landmarks are only read when first requested.
+    """
+
+    def __init__(self, code: str, data_path: DataPath):
+        self.code = code
+        self.data_path = data_path
+        self.frames = FrameSlices(load_frame_table(data_path, participant_code=code).drop(columns='Participant'),
+                                  'Frame')
+        analysis = data_path / "analysis.csv"
+        self.phases = CSVReader(analysis).read() if analysis.is_file() else pd.DataFrame()
+        self._files: Dict[str, Optional[FrameSlices]] = {}
+        self._lock = threading.Lock()
+
+        known = {column for columns in TABLE_MODALITIES.values() for column in columns} | set(BASE_COLUMNS)
+        self.hume_columns = [column for column in self.frames.table.columns if column not in known]
+
+    def table_columns(self, modality: str) -> List[str]:
+        """Frame-table columns of a modality that this participant has."""
+        if modality == 'hume':
+            return self.hume_columns
+        return [column for column in TABLE_MODALITIES[modality] if column in self.frames.table.columns]
+
+    def file_slices(self, modality: str) -> Optional[FrameSlices]:
+        """Indexed table of a file modality, read on first use; None if the file is absent."""
+        with self._lock:
+            if modality not in self._files:
+                path = self.data_path / MODALITIES[modality].file
+                slices = None
+                if path.is_file():
+                    table = MODALITIES[modality].read(path)
+                    if table.index.name == FILE_MODALITIES[modality]:
+                        table = table.reset_index()
+                    slices = FrameSlices(table, FILE_MODALITIES[modality])
+                self._files[modality] = slices
+            return self._files[modality]
+
+    def available(self) -> List[str]:
+        """Modalities with data for this participant (file modalities are checked, not loaded)."""
+        present = [name for name in (*TABLE_MODALITIES, 'hume') if self.table_columns(name)]
+        return present + [name for name in FILE_MODALITIES if (self.data_path / MODALITIES[name].file).is_file()]
+
+    def slice(self, start: int, end: int, modalities: Sequence[str]) -> pd.DataFrame:
+        """
+        Frames from start to end (both included) with the columns of the requested modalities.
+
+        File modality columns are prefixed with '<modality>.' and left empty
+        for frames missing from their file.
+        """
+        columns = list(BASE_COLUMNS)
+        for modality in modalities:
+            if modality in FILE_MODALITIES:
+                continue
+            columns += [column for column in self.table_columns(modality) if column not in columns]
+        result = self.frames.range(start, end)[columns].reset_index(drop=True)
+
+        for modality in modalities:
+            slices = self.file_slices(modality) if modality in FILE_MODALITIES else None
+            if slices is None:
+                continue
+            part = slices.range(start, end).drop_duplicates(slices.frame_column).set_index(slices.frame_column)
+            part = part.reindex(result['Frame'].to_numpy()).add_prefix(f"{modality}.")
+            result = pd.concat([result, part.reset_index(drop=True)], axis=1)
+        return result
+
+
+class ParticipantCache:
+    """
+    Least recently used participants kept in memory.
+
+    A participant is loaded once even when many requests for it arrive at
+    the same time; requests for other participants are not held up by it.
+    """
+
+    def __init__(self, participant_folders: Dict[str, Union[str, DataPath]], max_participants: int = 8):
+        self.folders = {code: as_data_path(folder) for code, folder in participant_folders.items()}
+        self.max_participants = max(1, max_participants)
+        self._entries: 'OrderedDict[str, ParticipantData]' = OrderedDict()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _cached(self, code: str) -> Optional[ParticipantData]:
+        data = self._entries.get(code)
+        if data is not None:
+            self._entries.move_to_end(code)
+        return data
+
+    def get(self, code: str) -> ParticipantData:
+        """
+        Return the tables of a participant, loading them if needed.
+
+        Raises:
+            KeyError: If the participant is not in the dataset
+        """
+        with self._lock:
+            data = self._cached(code)
+            if data is not None:
+                return data
+            if code not in self.folders:
+                raise KeyError(code)
+            load_lock = self._loading.setdefault(code, threading.Lock())
+
+        with load_lock:
+            with self._lock:
+                data = self._cached(code)
+                if data is not None:
+                    return data
+            data = ParticipantData(code, self.folders[code])
+            with self._lock:
+                self._entries[code] = data
+                self._loading.pop(code, None)
+                while len(self._entries) > self.max_participants:
+                    self._entries.popitem(last=False)
+        return data
+
+    @property
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._entries)
+
+
+def _parse_frames(text: str) -> Tuple[int, int]:
+    """Parse '700' or '700:760' (both ends included; either end may be left out)."""
+    try:
+        if ":" not in text:
+            frame = int(text)
+            return frame, frame
+        start, _, end = text.partition(":")
+        start = int(start) if start else 0
+        end = int(end) if end else np.iinfo(np.int64).max
+    except ValueError:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Invalid frame range: {text}")
+    if end < start:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Frame range ends before it starts: {text}")
+    return start, end
+
+
+def _parse_modalities(values: List[str]) -> List[str]:
+    names = [name.strip() for value in values for name in value.split(",") if name.strip()]
+    if not names:
+        return list(SERVICE_MODALITIES)
+    unknown = [name for name in names if name not in SERVICE_MODALITIES]
+    if unknown:
+        raise ServiceError(HTTPStatus.BAD_REQUEST, f"Unknown modalities {', '.join(unknown)} "
+                                                   f"(available: {', '.join(SERVICE_MODALITIES)})")
+    return list(dict.fromkeys(names))
+
+
+def _records(table: pd.DataFrame) -> str:
+    return table.to_json(orient='records', double_precision=6) if len(table) else "[]"
+
+
+def _arrow(table: pd.DataFrame) -> bytes:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ServiceError(HTTPStatus.NOT_ACCEPTABLE, "Arrow output requires pyarrow")
+    arrow_table = pa.Table.from_pandas(table, preserve_index=False)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, arrow_table.schema) as writer:
+        writer.write_table(arrow_table)
+    return sink.getvalue()
+
+
+class FrameService:
+    """
+    Answers the data service's requests from a cache of indexed participant tables.
+
+    Routes (all GET):
+        /participants
+        /participants/<code>
+        /participants/<code>/phases
+        /participants/<code>/frames/<start>:<end>?modalities=hume,gaze&format=json|arrow
+    """
+
+    def __init__(self, participant_folders: Dict[str, Union[str, DataPath]], max_participants: int = 8):
+        self.cache = ParticipantCache(participant_folders, max_participants)
+
+    def handle(self, target: str) -> Tuple[str, bytes]:
+        """
+        Answer a request target.
+
+        Args:
+            target: Path and query string of the request
+
+        Returns:
+            (content type, body)
+
+        Raises:
+            ServiceError: For unknown routes, participants and invalid parameters
+        """
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        query = parse_qs(url.query)
+        if not parts or parts[0] != "participants" or len(parts) > 4:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown route: {url.path}")
+
+        if len(parts) == 1:
+            body = json.dumps({'participants': list(self.cache.folders), 'loaded': self.cache.loaded})
+            return "application/json", body.encode()
+
+        data = self._participant(parts[1])
+        if len(parts) == 2:
+            frames = data.frames.frames
+            body = json.dumps({
+                'participant': data.code,
+                'frames': int(len(frames)),
+                'first_frame': int(frames[0]) if len(frames) else None,
+                'last_frame': int(frames[-1]) if len(frames) else None,
+                'modalities': data.available(),
+                'phases': int(len(data.phases)),
+            })
+            return "application/json", body.encode()
+
+        if parts[2] == "phases" and len(parts) == 3:
+            return "application/json", f'{{"participant": {json.dumps(data.code)}, ' \
+                                       f'"phases": {_records(data.phases)}}}'.encode()
+
+        if parts[2] == "frames" and len(parts) == 4:
+            start, end = _parse_frames(parts[3])
+            table = self._slice(data, start, end, _parse_modalities(query.get('modalities', [])))
+            output = query.get('format', ['json'])[-1]
+            if output == "arrow":
+                return ARROW_STREAM, _arrow(table)
+            if output != "json":
+                raise ServiceError(HTTPStatus.BAD_REQUEST, f"Unknown format: {output}")
+            return "application/json", f'{{"participant": {json.dumps(data.code)}, "rows": {len(table)}, ' \
+                                       f'"frames": {_records(table)}}}'.encode()
+
+        raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown route: {url.path}")
+
+    def _participant(self, code: str) -> ParticipantData:
+        try:
+            return self.cache.get(code)
+        except KeyError:
+            raise ServiceError(HTTPStatus.NOT_FOUND, f"Unknown participant: {code}")
+        except (ValueError, OSError) as e:
+            raise ServiceError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Could not load {code}: {e}")
+
+    @staticmethod
+    def _slice(data: ParticipantData, start: int, end: int, modalities: Sequence[str]) -> pd.DataFrame:
+        # File modalities are read on their first request and may fail then, long after the participant loaded
+        try:
+            return data.slice(start, end, modalities)
+        except (ValueError, OSError, KeyError) as e:
+            raise ServiceError(HTTPStatus.INTERNAL_SERVER_ERROR, f"Could not load {data.code}: {e}")
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    server: 'FrameServer'
+    protocol_version = "HTTP/1.1"  # Keep-alive, so clients can reuse their connection
+
+    def do_GET(self):
+        start = time.perf_counter()
+        try:
+            content_type, body = self.server.service.handle(self.path)
+            status = HTTPStatus.OK
+        except ServiceError as e:
+            content_type, body, status = "application/json", json.dumps({'error': str(e)}).encode(), e.status
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Server-Timing", f"query;dur={(time.perf_counter() - start) * 1e3:.2f}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class FrameServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering every request from a shared FrameService."""
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], service: FrameService, verbose: bool = False):
+        super().__init__(address, _RequestHandler)
+        self.service = service
+        self.verbose = verbose
+
+
+def serve(participant_folders: Dict[str, Union[str, DataPath]], host: str = "127.0.0.1", port: int = 8765,
+          max_participants: int = 8, verbose: bool = False) -> None:
+    """
+    Serve per-frame slices of the participants until interrupted.
+
+    Args:
+        participant_folders: Mapping of participant code to folder
+        host: Address to listen on
+        port: Port to listen on (0 picks a free port)
+        max_participants: Participants kept in memory
+        verbose: Log every request
+    """
+    server = FrameServer((host, port), FrameService(participant_folders, max_participants), verbose)
+    host, port = server.server_address[:2]
+    print(f"Serving {len(participant_folders)} participants on http://{host}:{port}/participants")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,75 @@
+from io import BytesIO
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+
+class CSVTail:
+    """
+    Incremental reader for a CSV file that is still being appended to.
+
+    Each call to read_new parses only the bytes appended since the previous
+    call, starting from a saved offset. A last line without its newline is
+    left for the next call, so rows are never split. If the file shrinks it is
+    assumed to have been rewritten and is read again from the start.
+    """
+
+    def __init__(self, file_path: Union[str, Path], encoding: str = 'utf-8'):
+        self.file_path = Path(file_path)
+        self.encoding = encoding
+        self.offset = 0
+        self.header: Optional[bytes] = None
+        self._empty_rows: Optional[pd.DataFrame] = None
+
+    @property
+    def exists(self) -> bool:
+        return self.file_path.is_file()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.header = None
+        self._empty_rows = None
+
+    def read_new(self) -> Optional[pd.DataFrame]:
+        """
+        Parse the complete rows appended since the last call.
+
+        Returns:
+            DataFrame of the new rows (possibly empty), or None while the file
+            does not exist or its header line is incomplete
+        """
+        try:
+            size = self.file_path.stat().st_size
+        except OSError:
+            return None
+        if size < self.offset:
+            self._reset()
+        if size == self.offset:
+            return self._empty()
+
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+
+        end = data.rfind(b'\n')
+        if end < 0:  # No complete line yet
+            return self._empty()
+        data = data[:end + 1]
+        self.offset += len(data)
+
+        if self.header is None:
+            header_end = data.find(b'\n') + 1
+            self.header = data[:header_end]
+            self._empty_rows = pd.read_csv(BytesIO(self.header), encoding=self.encoding)
+            data = data[header_end:]
+
+        if not data.strip():
+            return self._empty()
+        try:
+            return pd.read_csv(BytesIO(self.header + data), encoding=self.encoding)
+        except Exception as e:
+            raise ValueError(f"Error reading CSV {self.file_path}: {str(e)}")
+
+    def _empty(self) -> Optional[pd.DataFrame]:
+        return self._empty_rows.copy() if self._empty_rows is not None else None
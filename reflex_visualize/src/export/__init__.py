@@ -0,0 +1,24 @@
+"""Export of clips and derived media for use outside the visualizer."""
+import importlib
+
+_LAZY_IMPORTS = {
+    'ClipJob': '.clips',
+    'plan_clip_jobs': '.clips',
+    'export_participant_clips': '.clips',
+    'export_dataset_clips': '.clips',
+    'render_contact_sheet': '.contact_sheets',
+    'load_contact_sheet': '.contact_sheets',
+    'build_contact_sheets': '.contact_sheets',
+    'load_overlay_tracks': '.overlay_video',
+    'export_overlay_video': '.overlay_video',
+}
+
+__all__ = ['ClipJob', 'plan_clip_jobs', 'export_participant_clips', 'export_dataset_clips',
+           'render_contact_sheet', 'load_contact_sheet', 'build_contact_sheets',
+           'load_overlay_tracks', 'export_overlay_video']
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
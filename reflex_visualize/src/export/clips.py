@@ -0,0 +1,229 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from ..data_io.archive import as_data_path
+from ..data_io.readers import CSVReader, FRAME_COLUMNS
+from ..utils.helpers import get_synchronized_start
+
+PARTIAL_SUFFIX = ".partial"
+
+
+@dataclass
+class ClipJob:
+    """A single phase window to export."""
+    participant: str
+    round_num: int
+    action: str
+    state: str
+    start_frame: int
+    end_frame: int
+
+    @property
+    def name(self) -> str:
+        return f"R{self.round_num}-{self.action}-{self.state}-{self.start_frame}-{self.end_frame}"
+
+
+def plan_clip_jobs(analysis: pd.DataFrame, participant: str, states: Optional[Sequence[str]] = ("Failure",),
+                   padding: int = 0) -> List[ClipJob]:
+    """
+    Create one clip job per analysis phase of the selected states.
+
+    Args:
+        analysis: analysis.csv DataFrame of the participant
+        participant: Participant code
+        states: Phase states to export, all phases if None
+        padding: Extra frames added before and after every phase
+
+    Returns:
+        Clip jobs sorted by start frame
+    """
+    phases = analysis if states is None else analysis[analysis['State'].isin(states)]
+    jobs = [
+        ClipJob(
+            participant=participant,
+            round_num=int(row['Round No.']),
+            action=str(row['Action']),
+            state=str(row['State']),
+            start_frame=max(1, int(row['Start Frame']) - padding),
+            end_frame=int(row['End Frame']) + padding,
+        )
+        for _, row in phases.iterrows()
+    ]
+    return sorted(jobs, key=lambda job: job.start_frame)
+
+
+def _copy_frames(source, writer_path: Path, first_index: int, count: int) -> int:
+    """
+    Seek to a zero-based frame index and write the following frames to a new video.
+
+    Returns:
+        Number of frames written
+    """
+    import cv2
+
+    source.seek(first_index)
+    writer = cv2.VideoWriter(str(writer_path), cv2.VideoWriter_fourcc(*"mp4v"),
+                             source.get_fps() or 30.0, source.get_frame_size())
+    written = 0
+    try:
+        for frame in source.stream_bgr():
+            if written >= count:
+                break
+            writer.write(frame.data)
+            written += 1
+    finally:
+        writer.release()
+    return written
+
+
+def _slice_frames(df: pd.DataFrame, column: str, start: int, end: int) -> pd.DataFrame:
+    """Slice the rows of a frame-sorted DataFrame whose frame lies in [start, end]."""
+    frames = df[column].to_numpy()
+    lo, hi = np.searchsorted(frames, [start, end + 1])
+    return df.iloc[lo:hi]
+
+
+def export_participant_clips(data_path: Union[str, Path], output_dir: Union[str, Path], jobs: List[ClipJob],
+                             include_video: bool = True) -> Tuple[int, int]:
+    """
+    Export the clips of one participant.
+
+    Each clip is written into '<name>.partial' and renamed when complete, so an
+    interrupted export can be resumed: finished clips are skipped and partial
+    ones are redone.
+
+    Args:
+        data_path: Participant folder
+        output_dir: Folder receiving one sub-folder per clip
+        jobs: Clip jobs of this participant
+        include_video: Write the cam1/cam2 video segments
+
+    Returns:
+        (clips exported, video frames written)
+    """
+    from ..core.video import VideoSource
+
+    data_path = as_data_path(data_path)
+    output_dir = Path(output_dir)
+    pending = [job for job in jobs if not (output_dir / job.name).is_dir()]
+    if not pending:
+        return 0, 0
+
+    # Load each frame-indexed file once, sorted for binary search slicing
+    tables: Dict[str, Tuple[pd.DataFrame, str]] = {}
+    for name, column in FRAME_COLUMNS.items():
+        if (data_path / name).is_file():
+            df = CSVReader(data_path / name).read()
+            tables[name] = (df.sort_values(column, kind='stable').reset_index(drop=True), column)
+    speech = CSVReader(data_path / "speech.csv").read() if (data_path / "speech.csv").is_file() else None
+    analysis = CSVReader(data_path / "analysis.csv").read()
+
+    cam1_path = data_path / "video_cam1.mp4"
+    cam2_path = data_path / "video_cam2.mp4"
+    cam1 = VideoSource(cam1_path) if include_video and cam1_path.is_file() else None
+    cam2 = VideoSource(cam2_path) if include_video and cam2_path.is_file() else None
+
+    exported = 0
+    frames_written = 0
+    try:
+        for job in pending:
+            final_dir = output_dir / job.name
+            partial_dir = output_dir / (job.name + PARTIAL_SUFFIX)
+            if partial_dir.exists():
+                shutil.rmtree(partial_dir)
+            partial_dir.mkdir(parents=True)
+
+            for name, (df, column) in tables.items():
+                _slice_frames(df, column, job.start_frame, job.end_frame).to_csv(partial_dir / name, index=False)
+
+            phase = analysis[(analysis['Start Frame'] <= job.end_frame) & (analysis['End Frame'] >= job.start_frame)]
+            phase.to_csv(partial_dir / "analysis.csv", index=False)
+
+            if speech is not None and "time.csv" in tables:
+                seconds = _slice_frames(*tables["time.csv"], job.start_frame, job.end_frame)['Seconds']
+                if not seconds.empty:
+                    overlapping = (speech['EndTime'] >= seconds.iloc[0]) & (speech['BeginTime'] <= seconds.iloc[-1])
+                    speech[overlapping].to_csv(partial_dir / "speech.csv", index=False)
+
+            n_frames = job.end_frame - job.start_frame + 1
+            if cam1 is not None:
+                frames_written += _copy_frames(cam1, partial_dir / "video_cam1.mp4", job.start_frame - 1, n_frames)
+            if cam2 is not None:
+                first = get_synchronized_start(job.start_frame)
+                count = get_synchronized_start(job.end_frame + 1) - first
+                frames_written += _copy_frames(cam2, partial_dir / "video_cam2.mp4", first, count)
+
+            partial_dir.rename(final_dir)
+            exported += 1
+    finally:
+        for source in (cam1, cam2):
+            if source is not None:
+                source.close()
+
+    return exported, frames_written
+
+
+def _export_participant_task(args) -> Tuple[str, int, int]:
+    code, data_path, output_dir, jobs, include_video = args
+    exported, frames = export_participant_clips(data_path, output_dir, jobs, include_video)
+    return code, exported, frames
+
+
+def export_dataset_clips(participant_folders: Dict[str, Path], output_root: Union[str, Path],
+                         states: Optional[Sequence[str]] = ("Failure",), padding: int = 0,
+                         workers: int = 4, include_video: bool = True) -> Tuple[int, int]:
+    """
+    Export phase clips of many participants in a process pool.
+
+    Participants are the unit of work so every worker opens each video only once
+    and seeks between windows. Larger participants are scheduled first.
+
+    Args:
+        participant_folders: Mapping of participant code to folder
+        output_root: Output folder, receives one folder per participant
+        states: Phase states to export, all phases if None
+        padding: Extra frames added before and after every phase
+        workers: Number of worker processes
+        include_video: Write the cam1/cam2 video segments
+
+    Returns:
+        (clips exported, video frames written)
+    """
+    output_root = Path(output_root)
+    tasks = []
+    for code, folder in participant_folders.items():
+        analysis_path = as_data_path(folder) / "analysis.csv"
+        if not analysis_path.is_file():
+            print(f"Warning: Skipping {code}, analysis.csv not found")
+            continue
+        jobs = plan_clip_jobs(CSVReader(analysis_path).read(), code, states, padding)
+        if jobs:
+            tasks.append((code, as_data_path(folder), output_root / code, jobs, include_video))
+
+    def task_size(task) -> int:
+        video = task[1] / "video_cam1.mp4"
+        return video.stat().st_size if video.is_file() else 0
+
+    tasks.sort(key=task_size, reverse=True)
+
+    total_clips = 0
+    total_frames = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_export_participant_task, task) for task in tasks]
+        for future in as_completed(futures):
+            code, exported, frames = future.result()
+            total_clips += exported
+            total_frames += frames
+            print(f"{code}: {exported} clips, {frames} frames")
+
+    elapsed = time.perf_counter() - start
+    print(f"Exported {total_clips} clips ({total_frames} frames) in {elapsed:.1f}s")
+    return total_clips, total_frames
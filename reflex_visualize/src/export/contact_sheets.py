@@ -0,0 +1,225 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+import time
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from ..data_io.archive import as_data_path, local_root
+from ..data_io.frame_table import DEFAULT_CACHE_DIR
+from ..data_io.readers import CSVReader, VideoReader
+from ..utils.helpers import get_synchronized_start
+
+SHEET_INPUTS = ("analysis.csv", "video_cam1.mp4", "video_cam2.mp4")
+
+LABEL_HEIGHT = 22
+BACKGROUND = (32, 32, 32)
+TEXT_COLOR = (235, 235, 235)
+
+# Forward gaps up to this many frames are skipped with grab() instead of seeking
+MAX_GRAB_GAP = 48
+
+
+def thumbnail_frames(analysis: pd.DataFrame, per_phase: int) -> List[List[int]]:
+    """
+    Pick evenly spaced one-based frames inside every analysis phase.
+
+    Returns:
+        One list of frames per analysis row, in row order
+    """
+    frames = []
+    for start, end in zip(analysis['Start Frame'].astype(int), analysis['End Frame'].astype(int)):
+        count = min(per_phase, end - start + 1)
+        frames.append(sorted(set(np.linspace(start, end, count).round().astype(int).tolist())))
+    return frames
+
+
+def _decode_thumbnails(video_path: Path, indexes: List[int], width: int,
+                       decoder: str) -> Dict[int, npt.NDArray[np.uint8]]:
+    """Seek to each zero-based index in increasing order and decode one downscaled RGB frame."""
+    from ..core.video import VideoSource
+
+    thumbnails = {}
+    if not video_path.is_file():
+        return thumbnails
+
+    native_width = VideoReader(video_path).read()['width']
+    scale = min(1.0, width / native_width) if native_width else 1.0
+
+    with VideoSource(video_path, backend=decoder, scale=scale, pixel_format="rgb") as video:
+        for index in sorted(set(indexes)):
+            gap = index - video.decoder.position
+            if 0 <= gap <= MAX_GRAB_GAP:
+                for _ in range(gap):
+                    video.grab()
+            else:
+                video.seek(index)
+            frame = next(video.stream(), None)
+            if frame is not None:
+                thumbnails[index] = frame.data
+    return thumbnails
+
+
+def _label(width: int, text: str) -> npt.NDArray[np.uint8]:
+    strip = np.full((LABEL_HEIGHT, width, 3), BACKGROUND, dtype=np.uint8)
+    cv2.putText(strip, text, (6, LABEL_HEIGHT - 7), cv2.FONT_HERSHEY_SIMPLEX, 0.5, TEXT_COLOR, 1, cv2.LINE_AA)
+    return strip
+
+
+def _fit(image: Optional[npt.NDArray[np.uint8]], size: Tuple[int, int]) -> npt.NDArray[np.uint8]:
+    """Resize a thumbnail to (width, height), or return a blank tile if it is missing."""
+    if image is None:
+        return np.full((size[1], size[0], 3), BACKGROUND, dtype=np.uint8)
+    if (image.shape[1], image.shape[0]) != size:
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+    return image
+
+
+def render_contact_sheet(data_path: Union[str, Path], per_phase: int = 6, width: int = 160,
+                         decoder: str = "opencv") -> Optional[npt.NDArray[np.uint8]]:
+    """
+    Render a mosaic of thumbnails per analysis phase for both cameras.
+
+    Every phase gets a label row (round, action, state and frame range)
+    followed by its cam1 thumbnails and, next to them, the synchronized cam2
+    thumbnails. Only the sampled frames are decoded: each video is opened
+    once and seeked forward from one sampled frame to the next, and the two
+    cameras are decoded in parallel threads.
+
+    Args:
+        data_path: Participant folder
+        per_phase: Thumbnails per phase and camera
+        width: Thumbnail width in pixels
+        decoder: Video decoder backend
+
+    Returns:
+        RGB image, or None if the participant has no analysis phases
+    """
+    data_path = as_data_path(data_path)
+    analysis = CSVReader(data_path / "analysis.csv").read()
+    if analysis.empty:
+        return None
+
+    frames = thumbnail_frames(analysis, per_phase)
+    cam1_indexes = [frame - 1 for phase in frames for frame in phase]
+    # The secondary frame shown for a primary frame is the last one skipped up to it
+    cam2_indexes = [get_synchronized_start(frame + 1) - 1 for phase in frames for frame in phase]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        cam1_future = pool.submit(_decode_thumbnails, data_path / "video_cam1.mp4", cam1_indexes, width, decoder)
+        cam2_future = pool.submit(_decode_thumbnails, data_path / "video_cam2.mp4", cam2_indexes, width, decoder)
+        cam1, cam2 = cam1_future.result(), cam2_future.result()
+
+    sample = next(iter(cam1.values()), None)
+    height = int(round(width * sample.shape[0] / sample.shape[1])) if sample is not None else width * 3 // 4
+    size = (width, height)
+    columns = per_phase * (2 if cam2 else 1)
+
+    rows = []
+    for (_, phase), phase_frames in zip(analysis.iterrows(), frames):
+        tiles = [_fit(cam1.get(frame - 1), size) for frame in phase_frames]
+        tiles += [_fit(None, size)] * (per_phase - len(tiles))
+        if cam2:
+            cam2_tiles = [_fit(cam2.get(get_synchronized_start(frame + 1) - 1), size) for frame in phase_frames]
+            tiles += cam2_tiles + [_fit(None, size)] * (per_phase - len(cam2_tiles))
+        text = (f"R{int(phase['Round No.'])} {phase['Action']} - {phase['State']} "
+                f"({int(phase['Start Frame'])}-{int(phase['End Frame'])})")
+        rows.append(_label(width * columns, text))
+        rows.append(np.hstack(tiles))
+    return np.vstack(rows)
+
+
+def _cache_is_current(cache_file: Path, data_path: Path) -> bool:
+    if not cache_file.is_file():
+        return False
+    cache_mtime = cache_file.stat().st_mtime
+    return all(
+        (data_path / name).stat().st_mtime <= cache_mtime
+        for name in SHEET_INPUTS if (data_path / name).is_file()
+    )
+
+
+def load_contact_sheet(data_path: Union[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                       per_phase: int = 6, width: int = 160,
+                       decoder: str = "opencv") -> Optional[npt.NDArray[np.uint8]]:
+    """
+    Load the contact sheet of a participant, rendering and caching it as PNG when needed.
+
+    Args:
+        data_path: Participant folder
+        cache_dir: Folder for the cached sheets, by default '.reflex_cache/contact_sheets'
+        per_phase: Thumbnails per phase and camera
+        width: Thumbnail width in pixels
+        decoder: Video decoder backend
+
+    Returns:
+        RGB image, or None if the participant has no analysis phases
+    """
+    data_path = as_data_path(data_path)
+    code = data_path.name
+    cache_dir = Path(cache_dir) if cache_dir else local_root(data_path) / DEFAULT_CACHE_DIR / "contact_sheets"
+    cache_file = cache_dir / f"{code}-{per_phase}x{width}.png"
+
+    if _cache_is_current(cache_file, data_path):
+        image = cv2.imread(str(cache_file))
+        if image is not None:
+            return cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+
+    sheet = render_contact_sheet(data_path, per_phase, width, decoder)
+    if sheet is None:
+        return None
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(".tmp.png")
+        cv2.imwrite(str(tmp_file), cv2.cvtColor(sheet, cv2.COLOR_RGB2BGR))
+        tmp_file.replace(cache_file)
+    except OSError as e:
+        print(f"Warning: Could not cache contact sheet for {code}: {e}")
+    return sheet
+
+
+def _contact_sheet_task(args) -> Tuple[str, Optional[str]]:
+    code, data_path, cache_dir, per_phase, width, decoder = args
+    try:
+        sheet = load_contact_sheet(data_path, cache_dir, per_phase, width, decoder)
+    except (ValueError, OSError) as e:
+        return code, str(e)
+    return code, None if sheet is not None else "no analysis phases"
+
+
+def build_contact_sheets(participant_folders: Dict[str, Path], cache_dir: Optional[Union[str, Path]] = None,
+                         per_phase: int = 6, width: int = 160, workers: int = 4,
+                         decoder: str = "opencv") -> List[str]:
+    """
+    Render (or refresh) the cached contact sheets of many participants in a process pool.
+
+    Args:
+        participant_folders: Mapping of participant code to folder
+        cache_dir: Folder for the cached sheets, by default '.reflex_cache/contact_sheets' of each dataset
+        per_phase: Thumbnails per phase and camera
+        width: Thumbnail width in pixels
+        workers: Number of worker processes
+        decoder: Video decoder backend
+
+    Returns:
+        Codes of the participants with a contact sheet
+    """
+    tasks = [(code, as_data_path(folder), cache_dir, per_phase, width, decoder)
+             for code, folder in participant_folders.items()]
+
+    done = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [pool.submit(_contact_sheet_task, task) for task in tasks]
+        for future in as_completed(futures):
+            code, error = future.result()
+            if error:
+                print(f"Warning: No contact sheet for {code}: {error}")
+            else:
+                done.append(code)
+
+    print(f"Contact sheets for {len(done)} participants in {time.perf_counter() - start:.1f}s")
+    return sorted(done)
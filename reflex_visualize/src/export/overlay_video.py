@@ -0,0 +1,374 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple, Union
+import shutil
+import subprocess
+import tempfile
+import time
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from ..data_io.archive import as_data_path
+from ..data_io.readers import AudioDataReader, CSVReader, VideoReader
+from ..vis.lists import POSE_CONNECTIONS
+
+BODY_KEYPOINTS = list(range(11, 25))
+BODY_CONNECTIONS = [
+    (BODY_KEYPOINTS.index(a), BODY_KEYPOINTS.index(b))
+    for a, b in sorted(POSE_CONNECTIONS) if a in BODY_KEYPOINTS and b in BODY_KEYPOINTS
+]
+
+# Frames per chunk below which splitting costs more than it saves
+MIN_CHUNK_FRAMES = 150
+
+FACE_COLOR = (0, 255, 255)
+GAZE_COLOR = (255, 0, 255)
+BODY_COLOR = (0, 200, 0)
+BOX_COLOR = (255, 128, 0)
+CAPTION_COLOR = (255, 255, 255)
+
+
+@dataclass
+class FrameTrack:
+    """Per-frame values of one modality, sorted by frame for binary search."""
+    frames: npt.NDArray[np.int64]
+    values: npt.NDArray[np.float32]
+
+    @classmethod
+    def empty(cls, shape: Tuple[int, ...] = ()) -> "FrameTrack":
+        return cls(np.empty(0, dtype=np.int64), np.empty((0,) + shape, dtype=np.float32))
+
+    def at(self, frame: int) -> Optional[npt.NDArray[np.float32]]:
+        i = np.searchsorted(self.frames, frame)
+        if i < len(self.frames) and self.frames[i] == frame:
+            return self.values[i]
+        return None
+
+    def slice(self, start: int, end: int) -> "FrameTrack":
+        """Rows whose frame lies in [start, end]."""
+        lo, hi = np.searchsorted(self.frames, [start, end + 1])
+        return FrameTrack(self.frames[lo:hi], self.values[lo:hi])
+
+
+@dataclass
+class CaptionTrack:
+    """Text shown over inclusive frame intervals."""
+    starts: npt.NDArray[np.int64]
+    ends: npt.NDArray[np.int64]
+    texts: List[str]
+
+    def at(self, frame: int) -> Optional[str]:
+        i = np.searchsorted(self.starts, frame, side='right') - 1
+        if i >= 0 and frame <= self.ends[i]:
+            return self.texts[i]
+        return None
+
+    def slice(self, start: int, end: int) -> "CaptionTrack":
+        keep = (self.ends >= start) & (self.starts <= end)
+        return CaptionTrack(self.starts[keep], self.ends[keep], [t for t, k in zip(self.texts, keep) if k])
+
+
+@dataclass
+class OverlayTracks:
+    """All overlay data of a participant as frame-indexed arrays, loaded once and shared with the workers."""
+    face: FrameTrack = field(default_factory=lambda: FrameTrack.empty((68, 2)))
+    gaze: FrameTrack = field(default_factory=lambda: FrameTrack.empty((2, 2)))
+    body: FrameTrack = field(default_factory=lambda: FrameTrack.empty((len(BODY_KEYPOINTS), 2)))
+    box: FrameTrack = field(default_factory=lambda: FrameTrack.empty((4,)))
+    failure: CaptionTrack = field(default_factory=lambda: CaptionTrack(np.empty(0, np.int64), np.empty(0, np.int64), []))
+    transcript: CaptionTrack = field(default_factory=lambda: CaptionTrack(np.empty(0, np.int64), np.empty(0, np.int64), []))
+
+    def slice(self, start: int, end: int) -> "OverlayTracks":
+        """The part of every track needed to render frames [start, end]."""
+        return OverlayTracks(self.face.slice(start, end), self.gaze.slice(start, end), self.body.slice(start, end),
+                             self.box.slice(start, end), self.failure.slice(start, end),
+                             self.transcript.slice(start, end))
+
+
+def _sorted_captions(starts: Sequence[int], ends: Sequence[int], texts: List[str]) -> CaptionTrack:
+    order = np.argsort(np.asarray(starts, dtype=np.int64), kind='stable')
+    return CaptionTrack(np.asarray(starts, dtype=np.int64)[order], np.asarray(ends, dtype=np.int64)[order],
+                        [texts[i] for i in order])
+
+
+def load_overlay_tracks(data_path: Union[str, Path], openface_confidence: float = 0.7) -> OverlayTracks:
+    """
+    Load the overlay data of a participant into frame-indexed arrays.
+
+    OpenFace rows below the confidence threshold are dropped and, when a frame
+    has several faces, the most confident one is kept. Transcript segments are
+    converted from seconds to frames through time.csv.
+
+    Args:
+        data_path: Participant folder
+        openface_confidence: Minimum OpenFace confidence
+
+    Returns:
+        OverlayTracks; modalities whose file is missing are empty
+    """
+    data_path = as_data_path(data_path)
+    tracks = OverlayTracks()
+
+    if (data_path / "openface.csv").is_file():
+        df = CSVReader(data_path / "openface.csv").read()
+        if 'success' in df.columns:
+            df = df[df['success'].astype(int) == 1]
+        if 'confidence' in df.columns:
+            df = df[df['confidence'] >= openface_confidence].sort_values('confidence', ascending=False)
+        df = df.drop_duplicates('frame').sort_values('frame')
+        frames = df['frame'].to_numpy(dtype=np.int64)
+        if all(f'x_{i}' in df.columns for i in range(68)):
+            face = np.stack([df[[f'x_{i}' for i in range(68)]].to_numpy(),
+                             df[[f'y_{i}' for i in range(68)]].to_numpy()], axis=-1)
+            tracks.face = FrameTrack(frames, face.astype(np.float32))
+        if all(f'gaze_{eye}_{axis}' in df.columns for eye in (0, 1) for axis in ('x', 'y')):
+            gaze = df[['gaze_0_x', 'gaze_0_y', 'gaze_1_x', 'gaze_1_y']].to_numpy().reshape(-1, 2, 2)
+            tracks.gaze = FrameTrack(frames, gaze.astype(np.float32))
+
+    if (data_path / "body.csv").is_file():
+        df = CSVReader(data_path / "body.csv").read().drop_duplicates('Frame').sort_values('Frame')
+        columns = [(f'{i}_x', f'{i}_y') for i in BODY_KEYPOINTS]
+        if all(x in df.columns and y in df.columns for x, y in columns):
+            body = np.stack([df[[x for x, _ in columns]].to_numpy(),
+                             df[[y for _, y in columns]].to_numpy()], axis=-1)
+            tracks.body = FrameTrack(df['Frame'].to_numpy(dtype=np.int64), body.astype(np.float32))
+
+    if (data_path / "hume.csv").is_file():
+        df = CSVReader(data_path / "hume.csv").read()
+        df = df.dropna(subset=['x', 'y', 'w', 'h']).drop_duplicates('Frame').sort_values('Frame')
+        tracks.box = FrameTrack(df['Frame'].to_numpy(dtype=np.int64),
+                                df[['x', 'y', 'w', 'h']].to_numpy(dtype=np.float32))
+
+    if (data_path / "analysis.csv").is_file():
+        analysis = CSVReader(data_path / "analysis.csv").read()
+        texts = [f"{row['Action']} Failure at Round {row['Round No.']} - Phase: {row['State']}"
+                 for _, row in analysis.iterrows()]
+        tracks.failure = _sorted_captions(analysis['Start Frame'].astype(int), analysis['End Frame'].astype(int),
+                                          texts)
+
+    if (data_path / "speech.csv").is_file() and (data_path / "time.csv").is_file():
+        times = CSVReader(data_path / "time.csv").read().sort_values('Seconds')
+        seconds = times['Seconds'].to_numpy(dtype=float)
+        frames = times['Frame'].to_numpy(dtype=np.int64)
+        segments = [s for s in AudioDataReader(data_path / "speech.csv").read() if s['end'] >= s['begin']]
+        if segments and len(frames):
+            first = np.searchsorted(seconds, [s['begin'] for s in segments])
+            last = np.searchsorted(seconds, [s['end'] for s in segments], side='right') - 1
+            keep = (first <= last) & (first < len(frames)) & (last >= 0)
+            tracks.transcript = _sorted_captions(
+                frames[first[keep]], frames[last[keep]],
+                [f"{s['speaker']}: {s['text']}" for s, k in zip(segments, keep) if k])
+
+    return tracks
+
+
+def _put_caption(image: npt.NDArray[np.uint8], text: str, bottom: int, scale: float) -> None:
+    """Draw a line of text on a dark band whose lower edge is at `bottom`, cut to the image width."""
+    font_scale = 0.5 * scale
+    thickness = max(1, int(round(scale)))
+    (text_width, text_height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+    if text_width > image.shape[1] - 10:
+        text = text[:max(1, int(len(text) * (image.shape[1] - 10) / text_width) - 3)] + "..."
+    top = bottom - text_height - baseline - 8
+    image[max(top, 0):bottom] //= 3
+    cv2.putText(image, text, (5, bottom - baseline - 4), cv2.FONT_HERSHEY_SIMPLEX, font_scale, CAPTION_COLOR,
+                thickness, cv2.LINE_AA)
+
+
+def draw_overlays(image: npt.NDArray[np.uint8], frame: int, tracks: OverlayTracks, scale: float) -> None:
+    """
+    Draw the overlays of a one-based frame onto a BGR image in place.
+
+    Args:
+        image: Decoded frame
+        frame: One-based frame number
+        tracks: Overlay data
+        scale: Ratio of the image size to the native video size
+    """
+    height, width = image.shape[:2]
+    radius = max(1, int(round(2 * scale)))
+
+    face = tracks.face.at(frame)
+    if face is not None:
+        for x, y in np.round(face * scale).astype(np.int32):
+            cv2.circle(image, (int(x), int(y)), radius, FACE_COLOR, -1, cv2.LINE_AA)
+
+        # Gaze directions start at the eye centres (landmarks 36-41 and 42-47)
+        gaze = tracks.gaze.at(frame)
+        if gaze is not None:
+            eyes = np.stack([face[36:42].mean(axis=0), face[42:48].mean(axis=0)]) * scale
+            length = max(np.linalg.norm(eyes[1] - eyes[0]), 10.0) * 1.5
+            for centre, direction in zip(eyes, gaze):
+                end = centre + direction * length
+                cv2.arrowedLine(image, tuple(int(v) for v in centre), tuple(int(v) for v in end), GAZE_COLOR,
+                                radius, cv2.LINE_AA, tipLength=0.25)
+
+    body = tracks.body.at(frame)
+    if body is not None:
+        points = body * np.array([width, height], dtype=np.float32)
+        valid = ~np.isnan(points).any(axis=1)
+        for a, b in BODY_CONNECTIONS:
+            if valid[a] and valid[b]:
+                cv2.line(image, tuple(int(v) for v in points[a]), tuple(int(v) for v in points[b]), BODY_COLOR,
+                         radius, cv2.LINE_AA)
+        for point in points[valid]:
+            cv2.circle(image, (int(point[0]), int(point[1])), radius + 1, BODY_COLOR, -1, cv2.LINE_AA)
+
+    box = tracks.box.at(frame)
+    if box is not None:
+        x, y, w, h = (box * scale).astype(int)
+        cv2.rectangle(image, (x, y), (x + w, y + h), BOX_COLOR, radius)
+
+    text_scale = max(height / 480, 0.6)
+    failure = tracks.failure.at(frame)
+    if failure:
+        _put_caption(image, failure, int(30 * text_scale), text_scale)
+    transcript = tracks.transcript.at(frame)
+    if transcript:
+        _put_caption(image, transcript, height, text_scale)
+
+
+def render_overlay_chunk(video_path: Union[str, Path], output_path: Union[str, Path], tracks: OverlayTracks,
+                         first_frame: int, last_frame: int, scale: float = 1.0,
+                         decoder: str = "opencv") -> int:
+    """
+    Render the one-based frames [first_frame, last_frame] with overlays into a video file.
+
+    Returns:
+        Number of frames written
+    """
+    from ..core.video import VideoSource
+
+    # Frames are drawn on and written right away, so the decoder can reuse two buffers
+    with VideoSource(video_path, backend=decoder, scale=scale, pixel_format="bgr", buffers=2) as video:
+        overlay_scale = video.get_frame_size()[0] / video.decoder.frame_size[0] if video.decoder.frame_size[0] else 1.0
+        writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*"mp4v"), video.get_fps() or 30.0,
+                                 video.get_frame_size())
+        written = 0
+        try:
+            video.seek(first_frame - 1)
+            for frame in video.stream_bgr():
+                frame_id = frame.id_ + 1
+                if frame_id > last_frame:
+                    break
+                draw_overlays(frame.data, frame_id, tracks, overlay_scale)
+                writer.write(frame.data)
+                written += 1
+        finally:
+            writer.release()
+    return written
+
+
+def _render_chunk_task(args) -> Tuple[int, int]:
+    index, video_path, output_path, tracks, first_frame, last_frame, scale, decoder = args
+    return index, render_overlay_chunk(video_path, output_path, tracks, first_frame, last_frame, scale, decoder)
+
+
+def split_frames(first_frame: int, last_frame: int, n_chunks: int) -> List[Tuple[int, int]]:
+    """Split an inclusive frame range into at most n_chunks contiguous ranges of similar size."""
+    total = last_frame - first_frame + 1
+    n_chunks = max(1, min(n_chunks, total // MIN_CHUNK_FRAMES or 1))
+    bounds = np.linspace(first_frame, last_frame + 1, n_chunks + 1).round().astype(int)
+    return [(int(start), int(end) - 1) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+def concatenate_videos(parts: List[Path], output_path: Path) -> None:
+    """
+    Concatenate video files with the same encoding settings.
+
+    Uses the ffmpeg concat demuxer without re-encoding when ffmpeg is
+    available, otherwise rewrites the frames with cv2.VideoWriter.
+    """
+    executable = shutil.which("ffmpeg")
+    if executable:
+        list_file = output_path.with_suffix(".concat.txt")
+        list_file.write_text("".join(f"file '{part.resolve()}'\n" for part in parts))
+        try:
+            subprocess.run([executable, "-v", "error", "-y", "-f", "concat", "-safe", "0", "-i", str(list_file),
+                            "-c", "copy", str(output_path)], check=True)
+        finally:
+            list_file.unlink()
+        return
+
+    print("Warning: ffmpeg not found, re-encoding the chunks to concatenate them")
+    writer = None
+    try:
+        for part in parts:
+            capture = cv2.VideoCapture(str(part))
+            if writer is None:
+                size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+                writer = cv2.VideoWriter(str(output_path), cv2.VideoWriter_fourcc(*"mp4v"),
+                                         capture.get(cv2.CAP_PROP_FPS) or 30.0, size)
+            while True:
+                success, image = capture.read()
+                if not success:
+                    break
+                writer.write(image)
+            capture.release()
+    finally:
+        if writer is not None:
+            writer.release()
+
+
+def export_overlay_video(data_path: Union[str, Path], output_path: Union[str, Path], start_frame: int = 1,
+                         end_frame: Optional[int] = None, workers: int = 4, scale: float = 1.0,
+                         openface_confidence: float = 0.7, decoder: str = "opencv") -> Tuple[int, float]:
+    """
+    Export cam1 of a participant with burnt-in overlays.
+
+    The overlay data is loaded once into frame-indexed arrays. The frame range
+    is split into contiguous chunks rendered and encoded by parallel processes,
+    each seeking to its first frame and receiving only its slice of the
+    overlay data; the chunk files are then concatenated.
+
+    Args:
+        data_path: Participant folder
+        output_path: MP4 file to write
+        start_frame: First one-based frame to export
+        end_frame: Last one-based frame to export, the end of the video if None
+        workers: Number of worker processes
+        scale: Scale factor applied to the video frames
+        openface_confidence: Minimum OpenFace confidence for face and gaze overlays
+        decoder: Video decoder backend
+
+    Returns:
+        (frames written, frames per second)
+    """
+    data_path = as_data_path(data_path)
+    output_path = Path(output_path)
+    video_path = data_path / "video_cam1.mp4"
+
+    frame_count = VideoReader(video_path).read()['frame_count']
+    end_frame = min(end_frame or frame_count, frame_count)
+    if end_frame < start_frame:
+        raise ValueError(f"No frames to export between {start_frame} and {end_frame}")
+
+    start = time.perf_counter()
+    tracks = load_overlay_tracks(data_path, openface_confidence)
+    chunks = split_frames(start_frame, end_frame, max(1, workers) * 2)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory(dir=output_path.parent, prefix=".overlay-") as tmp_dir:
+        parts = [Path(tmp_dir) / f"chunk_{i:04d}.mp4" for i in range(len(chunks))]
+        tasks = [(i, video_path, parts[i], tracks.slice(first, last), first, last, scale, decoder)
+                 for i, (first, last) in enumerate(chunks)]
+
+        written = 0
+        with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+            for _, frames in pool.map(_render_chunk_task, tasks):
+                written += frames
+
+        if len(parts) == 1:
+            shutil.move(str(parts[0]), output_path)
+        else:
+            concatenate_videos(parts, output_path)
+
+    elapsed = time.perf_counter() - start
+    fps = written / elapsed if elapsed else 0.0
+    print(f"Exported {written} frames to {output_path} in {elapsed:.1f}s ({fps:.1f} frames/s, "
+          f"{len(chunks)} chunks, {workers} workers)")
+    return written, fps
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import os
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import select_participants
+
+
+def main():
+    """Export video and data clips of analysis phases for all participants."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Phase Clip Export")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--output", type=Path, required=True,
+                        help="Folder to write the clips to")
+    parser.add_argument("--states", type=str, nargs="*", default=["Failure"],
+                        help="Phase states to export (default: Failure); pass no value for all phases")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to export (e.g. 'C3'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to export; all if omitted")
+    parser.add_argument("--padding", type=int, default=0,
+                        help="Extra frames before and after every phase")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--no-video", action="store_true",
+                        help="Only export the sliced CSV files")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+
+    folders = select_participants(args.data_root, args.participant, args.strategy)
+    if not folders:
+        parser.error("No participants selected")
+
+    from src.export.clips import export_dataset_clips
+
+    export_dataset_clips(folders, args.output, states=args.states or None, padding=args.padding,
+                         workers=args.workers, include_video=not args.no_video)
+
+
+if __name__ == "__main__":
+    main()
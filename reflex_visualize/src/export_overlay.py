@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import os
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import validate_participant_code, get_participant_folder
+from src.data_io.manifest import resolve_participant_folder
+
+
+def main():
+    """Export a participant's cam1 video with burnt-in overlays."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Overlay Video Export")
+    parser.add_argument("--participant", type=str, required=True,
+                        help="Participant code/ Folder Name (e.g., 'C1-1')")
+    parser.add_argument("--output", type=Path, required=True,
+                        help="MP4 file to write")
+    parser.add_argument("--data-path", type=as_data_path, default=None,
+                        help="Path to the data directory (optional)")
+    parser.add_argument("--data-root", type=as_data_path, default=None,
+                        help="Dataset folder containing the strategy folders (optional)")
+    parser.add_argument("--start-frame", type=int, default=1,
+                        help="First frame to export")
+    parser.add_argument("--max-frames", type=int, default=None,
+                        help="Last frame to export (default: end of the video)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="Scale factor applied to the video frames")
+    parser.add_argument("--openface-confidence", type=float, default=0.7,
+                        help="Minimum confidence threshold for OpenFace data (0.0-1.0)")
+    parser.add_argument("--decoder", type=str, default="opencv", choices=["opencv", "pyav", "ffmpeg"],
+                        help="Video decoder backend")
+    args = parser.parse_args()
+
+    if not validate_participant_code(args.participant):
+        parser.error(f"Invalid participant code: {args.participant}")
+
+    if args.data_path:
+        data_path = args.data_path
+    elif args.data_root:
+        data_path = resolve_participant_folder(args.participant, args.data_root)
+    else:
+        data_path = get_participant_folder(args.participant)
+    if not data_path or not data_path.is_dir():
+        parser.error(f"Could not find data for participant: {args.participant}")
+    if not (data_path / "video_cam1.mp4").is_file():
+        parser.error(f"Video 1 not found at: {data_path / 'video_cam1.mp4'}")
+    if args.start_frame < 1 or not 0.0 < args.scale <= 1.0:
+        parser.error("--start-frame must be at least 1 and --scale between 0.0 and 1.0")
+
+    from src.export.overlay_video import export_overlay_video
+
+    export_overlay_video(data_path, args.output, start_frame=args.start_frame, end_frame=args.max_frames,
+                         workers=args.workers, scale=args.scale, openface_confidence=args.openface_confidence,
+                         decoder=args.decoder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import validate_participant_code, get_participant_folder, list_participant_folders
+
+
+def main():
+    """Compute gaze dwell times and transitions per failure phase."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Gaze Phase Statistics")
+    parser.add_argument("--participant", type=str, default=None,
+                        help="Participant code/ Folder Name (e.g., 'C1-1'); all participants if omitted")
+    parser.add_argument("--data-root", type=as_data_path, default=None,
+                        help="Dataset folder containing the strategy folders (optional)")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="CSV file to write the statistics to (prints to stdout if omitted)")
+    args = parser.parse_args()
+
+    if args.participant and not validate_participant_code(args.participant):
+        parser.error(f"Invalid participant code: {args.participant}")
+
+    from src.core.gaze import participant_gaze_statistics, dataset_gaze_statistics
+
+    if args.participant:
+        if args.data_root:
+            folder = list_participant_folders(args.data_root).get(args.participant)
+        else:
+            folder = get_participant_folder(args.participant)
+        if not folder or not folder.is_dir():
+            parser.error(f"Could not find data for participant: {args.participant}")
+        stats = participant_gaze_statistics(folder)
+    else:
+        data_root = args.data_root or Path.cwd().parent.parent / 'Dataset'
+        stats = dataset_gaze_statistics(list_participant_folders(data_root).values())
+
+    if args.output:
+        stats.to_csv(args.output, index=False)
+    else:
+        print(stats.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
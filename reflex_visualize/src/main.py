@@ -1,30 +1,37 @@
 #!/usr/bin/env python3
 import argparse
 from pathlib import Path
-import rerun as rr
-import rerun.blueprint as rrb
+import subprocess
 import sys
-import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if __name__ == "__main__" and not __package__:
+    # Allow running as a script (python src/main.py) as well as through the installed entry point
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-from core.data_types import VisualizationConfig
-from vis.visualizer import DataVisualizer
-from utils.helpers import validate_participant_code, get_participant_folder
-from vis.layouts import create_default_rrb
+from src.data_io.archive import ArchivePath, as_data_path, configure_archive_cache
+from src.utils.helpers import validate_participant_code, get_participant_folder, add_rerun_args
+from src.data_io.manifest import resolve_participant_folder
+from src.utils.memory import parse_size
 
+# 'frame' or a decimation factor of data_io.pyramids.PYRAMID_FACTORS (not imported here, it needs pandas)
+DETAIL_CHOICES = ["frame", "auto", "8", "64", "512"]
 
-def main():
-    """Main entry point for the visualization."""
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command-line parser without importing any heavy dependency."""
     parser = argparse.ArgumentParser(description="REFLEX Dataset - Rerun Visualization")
     parser.add_argument("--participant", type=str, required=True,
                         help="Participant code/ Folder Name (e.g., 'C1-1')")
+    parser.add_argument("--start-frame", type=int, default=1,
+                        help="First frame to process")
     parser.add_argument("--max-frames", type=int, default=18000,
                         help="Maximum number of frames to process")
     parser.add_argument("--jpeg-quality", type=int, default=15,
                         help="JPEG compression quality for images (1-100)")
-    parser.add_argument("--data-path", type=Path, default=None,
-                        help="Path to the data directory (optional)")
+    parser.add_argument("--data-path", type=as_data_path, default=None,
+                        help="Path to the data directory, or 'zip://archive.zip!/C1-Fixed-Low/C1-1' (optional)")
+    parser.add_argument("--data-root", type=as_data_path, default=None,
+                        help="Dataset folder or .zip archive containing the strategy folders; uses its manifest if present (optional)")
     parser.add_argument("--face-3d", action="store_true",
                         help="Enable 3D face visualization")
     parser.add_argument("--gaze-3d", action="store_true",
@@ -33,41 +40,180 @@ def main():
                         help="Enable 3D body visualization")
     parser.add_argument("--openface-confidence", type=float, default=0.7,
                         help="Minimum confidence threshold for OpenFace data (0.0-1.0)")
-    rr.script_add_args(parser)
+    parser.add_argument("--decoder", type=str, default="opencv",
+                        choices=["opencv", "pyav", "ffmpeg", "auto"],
+                        help="Video decoder backend; 'auto' benchmarks once and picks the fastest")
+    parser.add_argument("--video-scale", type=float, default=1.0,
+                        help="Scale factor applied to the decoded video frames (0.0-1.0)")
+    parser.add_argument("--decoder-threads", type=int, default=0,
+                        help="Decoder thread count (0 lets the decoder decide)")
+    parser.add_argument("--memory-budget", type=parse_size, default=None,
+                        help="Memory budget for loaded data and caches, e.g. '2G' (optional)")
+    parser.add_argument("--archive-cache-size", type=parse_size, default=None,
+                        help="Disk cache for videos extracted from compressed archives, e.g. '4G' (default: 2G)")
+    parser.add_argument("--loader-workers", type=int, default=4,
+                        help="Data files read concurrently at startup")
+    parser.add_argument("--loader", type=str, default="thread", choices=["thread", "process"],
+                        help="Read the data files in a thread or process pool")
+    parser.add_argument("--layers-dir", type=Path, default=None,
+                        help="Write one .rrd file per modality to this folder, rebuilding only changed layers (optional)")
+    parser.add_argument("--rebuild-layers", action="store_true",
+                        help="Rebuild all layers in --layers-dir even if they are up to date")
+    parser.add_argument("--adaptive-quality", action="store_true",
+                        help="Adapt JPEG quality (up to --jpeg-quality) and image scale to the sink throughput")
+    parser.add_argument("--min-jpeg-quality", type=int, default=5,
+                        help="Lowest JPEG quality used by --adaptive-quality")
+    parser.add_argument("--min-video-scale", type=float, default=0.25,
+                        help="Smallest image scale used by --adaptive-quality (0.0-1.0)")
+    parser.add_argument("--target-rate", type=parse_size, default=None,
+                        help="Bytes per second to stay under with --adaptive-quality, e.g. '2M' (optional)")
+    parser.add_argument("--outside-phase-fps", type=float, default=None,
+                        help="Image rate outside the analysis phases, e.g. 1; full rate everywhere if omitted")
+    parser.add_argument("--phase-padding", type=int, default=0,
+                        help="Frames around each analysis phase also logged at full image rate")
+    parser.add_argument("--overview", action="store_true",
+                        help="Log a cached contact sheet of thumbnails per analysis phase as a static overview")
+    parser.add_argument("--emotion-heatmaps", action="store_true",
+                        help="Log all Hume and speech prosody scores once as static heatmaps with a frame cursor, "
+                             "instead of one time series per emotion")
+    parser.add_argument("--detail", type=str, default="frame", choices=DETAIL_CHOICES,
+                        help="Resolution of the affect and emotion series: 'frame' logs every frame, a decimation "
+                             "factor logs the cached min/max/mean pyramid level once, 'auto' picks the factor")
+    parser.add_argument("--watch", action="store_true",
+                        help="Follow a session that is still being recorded and log new frames as they arrive")
+    parser.add_argument("--watch-interval", type=float, default=0.5,
+                        help="Seconds between checks for new data in --watch mode")
+    parser.add_argument("--watch-lag", type=int, default=30,
+                        help="Frames to wait for lagging data files in --watch mode")
+    parser.add_argument("--watch-timeout", type=float, default=None,
+                        help="Stop --watch mode after this many seconds without new frames (optional)")
+    parser.add_argument("--skip-preflight", action="store_true",
+                        help="Start without first checking the participant files (always skipped in --watch mode)")
+    add_rerun_args(parser)
+    return parser
+
+
+def main():
+    """Main entry point for the visualization."""
+    parser = build_parser()
     args = parser.parse_args()
 
     # Validate participant code and get data path
     if not validate_participant_code(args.participant):
-        raise ValueError(f"Invalid participant code: {args.participant}")
+        parser.error(f"Invalid participant code: {args.participant}")
 
-    data_path = get_participant_folder(args.participant)
-    if not data_path:
-        raise ValueError(f"Could not find data for participant: {args.participant}")
+    if args.data_path:
+        data_path = args.data_path
+    elif args.data_root:
+        data_path = resolve_participant_folder(args.participant, args.data_root)
+    else:
+        data_path = get_participant_folder(args.participant)
+    if not data_path or not data_path.is_dir():
+        parser.error(f"Could not find data for participant: {args.participant}")
 
     # Process video and associated data
     video_cam1 = data_path / "video_cam1.mp4"
-    if not video_cam1:
-        raise ValueError(f"Error: Video 1 not found or is not a file at: {video_cam1}")
+    if not video_cam1.is_file() and not args.watch:
+        parser.error(f"Video 1 not found or is not a file at: {video_cam1}")
 
-    rr.script_teardown(args)
-    default_blueprint = create_default_rrb()
-    rr.script_setup(args, f"Participant-{args.participant}", default_blueprint)
+    if args.layers_dir and (args.connect or args.serve or args.save or args.stdout):
+        parser.error("--layers-dir writes its own files; it can only be combined with --headless")
+    if args.rebuild_layers and not args.layers_dir:
+        parser.error("--rebuild-layers requires --layers-dir")
+    if args.adaptive_quality and args.layers_dir:
+        parser.error("--adaptive-quality adapts to a live sink and cannot be combined with --layers-dir")
+    if args.watch and (args.layers_dir or args.outside_phase_fps is not None or args.emotion_heatmaps
+                       or args.detail != "frame"):
+        parser.error("--watch cannot be combined with --layers-dir, --outside-phase-fps, --emotion-heatmaps "
+                     "or --detail")
+    if args.outside_phase_fps is not None and args.outside_phase_fps <= 0:
+        parser.error("--outside-phase-fps must be positive")
+    if args.watch and isinstance(data_path, ArchivePath):
+        parser.error("--watch follows files being recorded and cannot read from an archive")
+    if args.archive_cache_size is not None:
+        configure_archive_cache(max_bytes=args.archive_cache_size)
+    if args.loader_workers < 1:
+        parser.error("--loader-workers must be at least 1")
+    if not 0.0 < args.min_video_scale <= 1.0:
+        parser.error("--min-video-scale must be between 0.0 and 1.0")
+    if args.decoder in ("pyav", "ffmpeg"):  # OpenCV is always installed, 'auto' picks an available backend
+        from src.core.decoders import DECODER_BACKENDS
+
+        if not DECODER_BACKENDS[args.decoder].is_available():
+            parser.error(f"--decoder {args.decoder} is not available on this host "
+                         f"({'ffmpeg is not on PATH' if args.decoder == 'ffmpeg' else 'PyAV is not installed'})")
+
+    # Files still being recorded are incomplete by design, so --watch starts without the check
+    if not args.skip_preflight and not args.watch:
+        from src.data_io.preflight import has_errors, validate_participant
+
+        issues = validate_participant(data_path, args.participant)
+        for issue in issues:
+            print(issue)
+        if has_errors(issues):
+            sys.exit(f"Preflight check of {args.participant} failed; fix the errors above or pass --skip-preflight")
+
+    # Heavy dependencies are only imported once the arguments are known to be valid
+    import rerun as rr
+    from src.core.data_types import VisualizationConfig
+    from src.vis.visualizer import DataVisualizer
+    from src.vis.layouts import create_default_rrb
+    from src.vis.layers import LayeredRecording
+
+    application_id = f"Participant-{args.participant}"
+    if args.layers_dir:
+        # Nothing is logged to the global recording, every layer has its own file sink
+        rr.init(application_id)
+    else:
+        default_blueprint = create_default_rrb(overview=args.overview, adaptive=args.adaptive_quality,
+                                               heatmaps=args.emotion_heatmaps, lod=args.detail != "frame")
+        rr.script_setup(args, application_id, default_blueprint=default_blueprint)
 
     config = VisualizationConfig(
         participant_code=args.participant,
         data_path=data_path,
+        start_frame=args.start_frame,
         max_frames=args.max_frames,
         jpeg_quality=args.jpeg_quality,
         face_3d=args.face_3d,
         gaze_3d=args.gaze_3d,
         body_3d=args.body_3d,
-        openface_confidence=args.openface_confidence
+        openface_confidence=args.openface_confidence,
+        decoder=args.decoder,
+        video_scale=args.video_scale,
+        decoder_threads=args.decoder_threads,
+        memory_budget=args.memory_budget,
+        loader_workers=args.loader_workers,
+        loader=args.loader,
+        layers_dir=args.layers_dir,
+        adaptive_quality=args.adaptive_quality,
+        min_jpeg_quality=args.min_jpeg_quality,
+        min_video_scale=args.min_video_scale,
+        target_rate=args.target_rate,
+        outside_phase_fps=args.outside_phase_fps,
+        phase_padding=args.phase_padding,
+        overview=args.overview,
+        emotion_heatmaps=args.emotion_heatmaps,
+        detail=args.detail,
+        watch=args.watch,
+        watch_interval=args.watch_interval,
+        watch_lag=args.watch_lag,
+        watch_timeout=args.watch_timeout
     )
 
-    visualizer = DataVisualizer(config)
+    recording = LayeredRecording(application_id, config.layers_dir, config, force=args.rebuild_layers)
+    if config.watch:
+        from src.vis.live import LiveVisualizer
+        visualizer = LiveVisualizer(config, recording)
+    else:
+        visualizer = DataVisualizer(config, recording)
     visualizer.log_and_visualize()
 
-
+    if not args.layers_dir:
+        rr.script_teardown(args)
+    elif not args.headless:
+        # Opening the layers together merges them into one recording
+        subprocess.Popen([sys.executable, "-m", "rerun", *map(str, recording.files())])
 
 
 if __name__ == "__main__":
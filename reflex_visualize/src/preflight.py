@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import os
+import sys
+import time
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import select_participants
+
+
+def main():
+    """Check participant folders for missing files, misnamed columns and out-of-range frames before a batch run."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Preflight Check")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to check (e.g. 'C3'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to check; all if omitted")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Number of worker processes")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="CSV file to write every issue to")
+    parser.add_argument("--errors-only", action="store_true",
+                        help="Only print errors, not warnings")
+    parser.add_argument("--no-video", action="store_true",
+                        help="Do not open the videos (skips the checks against the cam1 frame count)")
+    parser.add_argument("--list-ok", action="store_true",
+                        help="Print the codes of the participants without errors, one per line, for batch jobs")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+
+    folders = select_participants(args.data_root, args.participant, args.strategy, largest_first=True)
+    if not folders:
+        parser.error("No participants selected")
+
+    from dataclasses import asdict
+
+    import pandas as pd
+
+    from src.data_io.preflight import ERROR, has_errors, validate_dataset
+
+    # With --list-ok stdout only holds participant codes, everything else goes to stderr
+    report = sys.stderr if args.list_ok else sys.stdout
+
+    start = time.perf_counter()
+    results = validate_dataset(folders, workers=args.workers, check_video=not args.no_video)
+    issues = [issue for participant_issues in results.values() for issue in participant_issues]
+    failed = sum(has_errors(participant_issues) for participant_issues in results.values())
+    print(f"Checked {len(results)} participants in {time.perf_counter() - start:.2f}s, {failed} with errors",
+          file=report)
+
+    if args.list_ok:
+        for code, participant_issues in results.items():
+            if not has_errors(participant_issues):
+                print(code)
+    else:
+        for issue in issues:
+            if issue.severity == ERROR or not args.errors_only:
+                print(issue)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame([asdict(issue) for issue in issues],
+                     columns=['participant', 'file', 'severity', 'message']).to_csv(args.output, index=False)
+        print(f"Wrote {len(issues)} issues to {args.output}", file=report)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import sys
+import time
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+
+
+def main():
+    """Query frame ranges across participants and optionally open them in the visualiser."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Moment Query")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to search (e.g. 'C3'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to search; all if omitted")
+    parser.add_argument("--round", type=int, nargs="*", default=None, help="Round numbers")
+    parser.add_argument("--action", type=str, nargs="*", default=None, help="Actions (Pick, Carry, Place)")
+    parser.add_argument("--state", type=str, nargs="*", default=None,
+                        help="Phase states (Pre, Failure, Explanation, Resolution)")
+    parser.add_argument("--gaze", type=str, nargs="*", default=None, help="Gaze labels (Task, Robot, Miscellaneous)")
+    parser.add_argument("--where", type=str, default=None,
+                        help="Numeric condition, e.g. 'Confusion > 0.4'")
+    parser.add_argument("--min-frames", type=int, default=1,
+                        help="Minimum length of a moment in frames")
+    parser.add_argument("--output", type=Path, default=None,
+                        help="CSV file to write the moments to (prints to stdout if omitted)")
+    parser.add_argument("--open", type=int, default=0,
+                        help="Open the first N moments in the visualiser")
+    parser.add_argument("--padding", type=int, default=10,
+                        help="Frames shown before and after an opened moment")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+
+    from src.core.query import MomentIndex, open_moments
+
+    start = time.perf_counter()
+    index = MomentIndex.from_data_root(args.data_root, participants=args.participant, strategies=args.strategy)
+    loaded = time.perf_counter()
+
+    filters = {'Round No.': args.round, 'Action': args.action, 'State': args.state, 'Gaze': args.gaze}
+    moments = index.query(where=args.where, min_frames=args.min_frames,
+                          **{column: value for column, value in filters.items() if value})
+    queried = time.perf_counter()
+
+    if args.output:
+        moments.to_csv(args.output, index=False)
+    else:
+        print(moments.to_string(index=False))
+    print(f"{len(moments)} moments in {len(index.participants)} participants "
+          f"(load {loaded - start:.2f}s, query {(queried - loaded) * 1e3:.1f}ms)", file=sys.stderr)
+
+    if args.open:
+        open_moments(moments, args.data_root, padding=args.padding, limit=args.open)
+
+
+if __name__ == "__main__":
+    main()
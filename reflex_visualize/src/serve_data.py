@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import sys
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.data_io.archive import as_data_path
+from src.utils.helpers import select_participants
+
+
+def main():
+    """Serve indexed per-frame slices of the participants over local HTTP."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Local Data Service")
+    parser.add_argument("--data-root", type=as_data_path, required=True,
+                        help="Dataset folder containing the strategy folders")
+    parser.add_argument("--strategy", type=str, nargs="*", default=None,
+                        help="Strategy prefixes to serve (e.g. 'C3'); all if omitted")
+    parser.add_argument("--participant", type=str, nargs="*", default=None,
+                        help="Participant codes to serve; all if omitted")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8765,
+                        help="Port to listen on")
+    parser.add_argument("--cache-size", type=int, default=8,
+                        help="Participants kept in memory")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Log every request")
+    args = parser.parse_args()
+
+    if not args.data_root.is_dir():
+        parser.error(f"Data root not found: {args.data_root}")
+    if args.cache_size < 1:
+        parser.error("--cache-size must be at least 1")
+
+    folders = select_participants(args.data_root, args.participant, args.strategy)
+    if not folders:
+        parser.error("No participants selected")
+
+    from src.data_io.service import serve
+
+    serve(folders, host=args.host, port=args.port, max_participants=args.cache_size, verbose=args.verbose)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+import argparse
+from pathlib import Path
+import sys
+import time
+
+if __name__ == "__main__" and not __package__:
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.memory import format_size, parse_size
+
+
+def main():
+    """Run a bandwidth-limited TCP sink to test adaptive streaming locally."""
+    parser = argparse.ArgumentParser(description="REFLEX Dataset - Throttled Rerun Sink")
+    parser.add_argument("--host", type=str, default="127.0.0.1",
+                        help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=9877,
+                        help="Port to listen on; connect with --connect --addr host:port")
+    parser.add_argument("--rate", type=parse_size, default=None,
+                        help="Maximum bytes per second, e.g. '500K' (unlimited if omitted)")
+    args = parser.parse_args()
+
+    from src.utils.sink import ThrottledSink
+
+    sink = ThrottledSink(args.host, args.port, args.rate).start()
+    limit = f"{format_size(args.rate)}/s" if args.rate else "unlimited"
+    print(f"Listening on {sink.address[0]}:{sink.address[1]} ({limit})")
+    try:
+        previous = 0
+        while True:
+            time.sleep(1.0)
+            received = sink.received
+            if received != previous:
+                print(f"received {format_size(received - previous)}/s, total {format_size(received)}")
+            previous = received
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sink.close()
+
+
+if __name__ == "__main__":
+    main()
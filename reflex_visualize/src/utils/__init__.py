@@ -1,10 +1,10 @@
 """Utility functions and helper classes."""
 from .helpers import (
-    validate_participant_code, get_participant_folder,
-    setup_logging, configure_error_handling
+    validate_participant_code, get_participant_folder, list_participant_folders,
+    select_participants, setup_logging, configure_error_handling
 )
 
 __all__ = [
-    'validate_participant_code', 'get_participant_folder',
-    'setup_logging', 'configure_error_handling'
+    'validate_participant_code', 'get_participant_folder', 'list_participant_folders',
+    'select_participants', 'setup_logging', 'configure_error_handling'
 ]
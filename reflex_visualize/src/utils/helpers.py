@@ -1,9 +1,20 @@
-from typing import Optional
+from typing import Dict, Optional, Sequence, Union
 from pathlib import Path
+import argparse
 import re
 import logging
 import sys
 
+from ..data_io.archive import ArchivePath, DataPath, as_data_path
+
+STRATEGY_FOLDERS = {
+    "C1": "C1-Fixed-Low",
+    "C2": "C2-Fixed-Medium",
+    "C3": "C3-Fixed-High",
+    "D1": "D1-Decay-Smooth",
+    "D2": "D2-Decay-Rapid"
+}
+
 
 def setup_logging(debug: bool = False) -> None:
     """Configure logging for the application."""
@@ -31,34 +42,149 @@ def configure_error_handling() -> None:
     sys.excepthook = global_exception_handler
 
 
+def add_rerun_args(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the common Rerun script arguments to a parser.
+
+    Mirrors rr.script_add_args so that argument parsing and validation do not
+    need to import rerun; the parsed namespace can be passed to rr.script_setup.
+    """
+    parser.add_argument("--headless", action="store_true", help="Don't show GUI")
+    parser.add_argument("--connect", dest="connect", action="store_true",
+                        help="Connect to an external viewer")
+    parser.add_argument("--serve", dest="serve", action="store_true",
+                        help="Serve a web viewer (WARNING: experimental feature)")
+    parser.add_argument("--addr", type=str, default=None, help="Connect to this ip:port")
+    parser.add_argument("--save", type=str, default=None, help="Save data to a .rrd file at this path")
+    parser.add_argument("-o", "--stdout", dest="stdout", action="store_true",
+                        help="Log data to standard output, to be piped into a Rerun Viewer")
+
+
 def validate_participant_code(code: str) -> bool:
     """Validate participant code format."""
     pattern = r"^(C[1-3]|D[1-2])-([1-9]|1[0-1])$"
     return bool(re.match(pattern, code))
 
 
-def get_participant_folder(code: str) -> Optional[Path]:
-    """Get participant data folder path."""
+def strategy_folder_path(data_root: Union[str, Path, ArchivePath], strategy_folder: str) -> DataPath:
+    """
+    Folder of a strategy under a data root.
+
+    When the folder has not been extracted, the '<strategy folder>.zip'
+    archive next to it is read instead.
+    """
+    data_root = as_data_path(data_root)
+    folder = data_root / strategy_folder
+    if isinstance(data_root, Path) and not folder.is_dir() and (data_root / f"{strategy_folder}.zip").is_file():
+        archive = ArchivePath(data_root / f"{strategy_folder}.zip")
+        return archive / strategy_folder if (archive / strategy_folder).is_dir() else archive
+    return folder
+
+
+def get_participant_folder(code: str, data_root: Optional[Union[Path, ArchivePath]] = None) -> Optional[DataPath]:
+    """
+    Get participant data folder path.
+
+    Args:
+        code: Participant code (e.g. 'C1-1')
+        data_root: Folder containing the strategy folders; defaults to the
+            'Dataset' folder two levels above the working directory
+    """
     if not validate_participant_code(code):
         return None
 
     strategy = code[:2]
-    strategy_folders = {
-        "C1": "C1-Fixed-Low",
-        "C2": "C2-Fixed-Medium",
-        "C3": "C3-Fixed-High",
-        "D1": "D1-Decay-Smooth",
-        "D2": "D2-Decay-Rapid"
-    }
 
-    current_path = Path.cwd()
-    origin_path = current_path.parent.parent
-    return origin_path / 'Dataset' / strategy_folders[strategy] / code
+    if data_root is None:
+        current_path = Path.cwd()
+        data_root = current_path.parent.parent / 'Dataset'
+    return strategy_folder_path(data_root, STRATEGY_FOLDERS[strategy]) / code
+
 
-    # return Path('Dataset') / strategy_folders[strategy] / code
+def list_participant_folders(dataset_root: Union[Path, ArchivePath]) -> Dict[str, DataPath]:
+    """
+    Find all participant folders present under a dataset root.
 
+    Args:
+        dataset_root: Folder containing the strategy folders (e.g. 'Dataset')
 
-def get_synchronized_frame(video_source, primary_frame_id):
+    Returns:
+        Mapping of participant code to folder, sorted by code
+    """
+    folders = {}
+    for strategy_folder in STRATEGY_FOLDERS.values():
+        strategy_path = strategy_folder_path(dataset_root, strategy_folder)
+        if not strategy_path.is_dir():
+            continue
+        for folder in strategy_path.iterdir():
+            if folder.is_dir() and validate_participant_code(folder.name):
+                folders[folder.name] = folder
+    return dict(sorted(folders.items()))
+
+
+def _has_archived_strategies(data_root: Path) -> bool:
+    """Check whether a strategy folder is only present as a '.zip' archive next to the others."""
+    return any(not (data_root / folder).is_dir() and (data_root / f"{folder}.zip").is_file()
+               for folder in STRATEGY_FOLDERS.values())
+
+
+def select_participants(data_root: Union[str, Path, ArchivePath], participants: Optional[Sequence[str]] = None,
+                        strategies: Optional[Sequence[str]] = None,
+                        largest_first: bool = False) -> Dict[str, DataPath]:
+    """
+    Select participant folders of a dataset for a batch tool.
+
+    Local data roots are read through the cached dataset manifest, which is
+    refreshed incrementally; archives are listed directly.
+
+    Args:
+        data_root: Folder (or archive) containing the strategy folders
+        participants: Participant codes to keep, all if None or empty
+        strategies: Strategy prefixes to keep (e.g. 'C3'), all if None or empty
+        largest_first: Order by the size of the participant files, largest first, so that a
+            process pool starts the longest jobs first; by code otherwise
+
+    Returns:
+        Mapping of participant code to folder
+    """
+    data_root = as_data_path(data_root)
+    manifest = None
+    if isinstance(data_root, Path) and not _has_archived_strategies(data_root):
+        from ..data_io.manifest import DatasetManifest
+
+        try:
+            manifest = DatasetManifest.load_or_build(data_root)
+        except OSError:  # The manifest cannot be saved into a read-only data root
+            manifest = DatasetManifest.build(data_root)
+        folders = {entry.code: manifest.participant_folder(entry.code) for entry in manifest}
+    else:
+        folders = list_participant_folders(data_root)
+
+    if participants:
+        folders = {code: path for code, path in folders.items() if code in participants}
+    if strategies:
+        folders = {code: path for code, path in folders.items() if code.startswith(tuple(strategies))}
+
+    if largest_first and manifest is not None:
+        order = sorted(folders, key=lambda code: manifest.participant(code).total_size, reverse=True)
+    else:
+        order = sorted(folders)
+    return {code: folders[code] for code in order}
+
+
+def get_synchronized_start(primary_frame_id: int) -> int:
+    """
+    Get the secondary camera frame index matching a primary frame ID.
+
+    Inverse of the skipping pattern in get_synchronized_frame: after primary
+    frames 1..n-1 the secondary camera has advanced 3 frames per primary frame
+    plus one extra frame for every third primary frame.
+    """
+    previous = max(primary_frame_id - 1, 0)
+    return 3 * previous + previous // 3
+
+
+def get_synchronized_frame(video_source, primary_frame_id, decode=True):
     """
     Get a synchronized frame from the secondary camera.
 
@@ -67,20 +193,20 @@ def get_synchronized_frame(video_source, primary_frame_id):
     Args:
         video_source: VideoSource object for the secondary camera
         primary_frame_id: Frame ID from the primary camera
+        decode: Convert the synchronized frame; if False all frames are only skipped
 
     Returns:
-        VideoFrame or None if no frame is available
+        VideoFrame or None if no frame is available (or decode is False)
     """
     # Determine how many frames to skip based on the primary frame ID
     frames_to_skip = 4 if primary_frame_id % 3 == 0 else 3
 
-    # Get the last frame after skipping the appropriate number
-    frame2 = None
-    for _ in range(frames_to_skip):
-        next_frame = next(video_source.stream_bgr(), None)
-        if next_frame is not None:
-            frame2 = next_frame
-        else:
-            break
+    # Only the last frame is returned, the ones before it are skipped without conversion
+    for _ in range(frames_to_skip - 1):
+        if video_source.grab() is None:
+            return None
 
-    return frame2
+    if not decode:
+        video_source.grab()
+        return None
+    return next(video_source.stream(), None)
@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+import dataclasses
+import re
+import sys
+
+_SIZE_UNITS = {'': 1, 'B': 1, 'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30, 'T': 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """
+    Parse a human readable size such as '512M', '2G' or '1.5GB' into bytes.
+
+    Raises:
+        ValueError: If the text is not a valid size
+    """
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([KMGT]?)(?:I?B)?\s*", text.upper())
+    if not match:
+        raise ValueError(f"Invalid size: {text}")
+    return int(float(match.group(1)) * _SIZE_UNITS[match.group(2)])
+
+
+def format_size(n_bytes: float) -> str:
+    """Format a byte count for display."""
+    for unit in ('B', 'KB', 'MB'):
+        if abs(n_bytes) < 1024:
+            return f"{n_bytes:.1f} {unit}"
+        n_bytes /= 1024
+    return f"{n_bytes:.1f} GB"
+
+
+def sizeof(value: Any) -> int:
+    """Estimate the memory footprint of arrays, DataFrames and plain Python objects."""
+    if value is None:
+        return 0
+    if hasattr(value, 'memory_usage') and hasattr(value, 'columns'):  # pandas DataFrame
+        return int(value.memory_usage(deep=True).sum())
+    if hasattr(value, 'nbytes'):  # numpy array or pandas Series
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(k) + sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(v) for v in value)
+    if dataclasses.is_dataclass(value):
+        return sys.getsizeof(value) + sum(sizeof(getattr(value, f.name)) for f in dataclasses.fields(value))
+    return sys.getsizeof(value)
+
+
+def downcast_floats(df):
+    """Convert the float64 columns of a DataFrame to float32 in place and return it."""
+    columns = df.select_dtypes(include='float64').columns
+    if len(columns):
+        df[columns] = df[columns].astype('float32')
+    return df
+
+
+class LRUCache:
+    """
+    Size-aware least-recently-used cache.
+
+    Entries are evicted oldest first whenever the summed size of the cached
+    values exceeds max_bytes. Supports the dict operations used for caches
+    (in, [], get, len).
+    """
+
+    def __init__(self, max_bytes: int, sizer: Callable[[Any], int] = sizeof):
+        self.max_bytes = max_bytes
+        self.sizer = sizer
+        self.nbytes = 0
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def __getitem__(self, key: Hashable) -> Any:
+        value = self._entries[key]
+        self._entries.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        if key in self._entries:
+            self._remove(key)
+        size = self.sizer(value)
+        if size > self.max_bytes:  # Never cache values larger than the whole cache
+            return
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.nbytes += size
+        self._evict(self.max_bytes)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        return self[key] if key in self._entries else default
+
+    def _remove(self, key: Hashable) -> None:
+        del self._entries[key]
+        self.nbytes -= self._sizes.pop(key)
+
+    def _evict(self, limit: int) -> int:
+        freed = 0
+        while self._entries and self.nbytes > limit:
+            key = next(iter(self._entries))
+            freed += self._sizes[key]
+            self._remove(key)
+        return freed
+
+    def resize(self, max_bytes: int) -> int:
+        """Change the capacity, evicting entries as needed; returns the bytes freed."""
+        self.max_bytes = max_bytes
+        return self._evict(max_bytes)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._sizes.clear()
+        self.nbytes = 0
+
+
+class MemoryAccountant:
+    """
+    Central memory accounting with an optional budget.
+
+    Components report their footprint through a measure callback. When the
+    total exceeds the budget, registered shedders run in order of increasing
+    value until the total fits; each shedder frees one kind of data and
+    returns a description of what it dropped. Shedders are discarded once
+    they have freed something and kept for the next call otherwise.
+    """
+
+    def __init__(self, budget: Optional[int] = None):
+        self.budget = budget
+        self.components: Dict[str, Callable[[], int]] = {}
+        self._shed_queue: List[tuple] = []
+        self.shed_log: List[str] = []
+
+    def register(self, name: str, measure: Callable[[], int]) -> None:
+        """Register (or replace) a component and the callback measuring its size in bytes."""
+        self.components[name] = measure
+
+    def add_shedder(self, priority: int, shedder: Callable[[], Optional[str]]) -> None:
+        """
+        Add a way to free memory.
+
+        Args:
+            priority: Lower values are shed first (least valuable data)
+            shedder: Callable freeing memory, returning a description or None if nothing was freed
+        """
+        self._shed_queue.append((priority, len(self._shed_queue), shedder))
+        self._shed_queue.sort(key=lambda item: item[:2])
+
+    def usage(self) -> Dict[str, int]:
+        return {name: measure() for name, measure in self.components.items()}
+
+    def total(self) -> int:
+        return sum(self.usage().values())
+
+    def enforce(self) -> bool:
+        """
+        Shed data until the total fits the budget.
+
+        Returns:
+            True if the total is within the budget (or there is no budget)
+        """
+        if self.budget is None:
+            return True
+
+        # A shedder that frees nothing stays queued: its data may not be loaded yet (modalities loaded on first use)
+        for item in list(self._shed_queue):
+            if self.total() <= self.budget:
+                break
+            description = item[2]()
+            if description:
+                self._shed_queue.remove(item)
+                self.shed_log.append(description)
+                print(f"Memory budget: shed {description}")
+
+        within = self.total() <= self.budget
+        if not within:
+            print(f"Warning: Memory usage {format_size(self.total())} exceeds budget "
+                  f"{format_size(self.budget)} after shedding all optional data")
+        return within
+
+    def breakdown(self) -> str:
+        """Human readable table of the memory used per component."""
+        usage = sorted(self.usage().items(), key=lambda item: item[1], reverse=True)
+        total = sum(size for _, size in usage)
+        width = max([len(name) for name, _ in usage] + [5])
+        lines = [f"  {name:<{width}}  {format_size(size):>10}" for name, size in usage]
+        budget = f" of {format_size(self.budget)} budget" if self.budget is not None else ""
+        lines.append(f"  {'total':<{width}}  {format_size(total):>10}{budget}")
+        if self.shed_log:
+            lines.append(f"  shed: {'; '.join(self.shed_log)}")
+        return "Memory breakdown:\n" + "\n".join(lines)
@@ -0,0 +1,63 @@
+from typing import Optional
+import socket
+import threading
+import time
+
+
+class ThrottledSink:
+    """
+    Local TCP stand-in for a remote Rerun viewer on a slow link.
+
+    Accepts connections from rr.connect and discards the received data while
+    reading at most `rate` bytes per second, so the sender experiences the
+    back-pressure of a limited link. The receive buffer is kept small so the
+    throttling is not hidden by kernel buffering.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 9877, rate: Optional[int] = None,
+                 chunk_size: int = 16 << 10):
+        """
+        Args:
+            host: Interface to listen on
+            port: Port to listen on, 0 picks a free port
+            rate: Maximum bytes read per second, unlimited if None
+            chunk_size: Bytes read per receive call
+        """
+        self.rate = rate
+        self.chunk_size = chunk_size
+        self.received = 0
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((host, port))
+        self._server.listen()
+        self.address = self._server.getsockname()
+        self._lock = threading.Lock()
+
+    def serve_forever(self) -> None:
+        """Accept connections, each handled in its own thread."""
+        while True:
+            try:
+                connection, _ = self._server.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._receive, args=(connection,), daemon=True).start()
+
+    def start(self) -> "ThrottledSink":
+        """Serve in a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def _receive(self, connection: socket.socket) -> None:
+        connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.chunk_size * 4)
+        with connection:
+            while True:
+                data = connection.recv(self.chunk_size)
+                if not data:
+                    break
+                with self._lock:
+                    self.received += len(data)
+                if self.rate:
+                    time.sleep(len(data) / self.rate)
+
+    def close(self) -> None:
+        self._server.close()
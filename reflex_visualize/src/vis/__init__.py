@@ -1,4 +1,16 @@
-from .visualizer import DataVisualizer
-from .layouts import create_default_rrb
+import importlib
 
-__all__ = ['DataVisualizer', 'create_default_layout']
+_LAZY_IMPORTS = {
+    'DataVisualizer': '.visualizer',
+    'LiveVisualizer': '.live',
+    'create_default_rrb': '.layouts',
+    'build_comparison': '.comparison',
+}
+
+__all__ = ['DataVisualizer', 'LiveVisualizer', 'create_default_rrb', 'build_comparison']
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,133 @@
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+import time
+
+import rerun as rr
+
+# The blocking flush below uses the internal bindings of rerun-sdk 0.18 (pinned in pyproject.toml)
+FLUSH_SDK_VERSION = "0.18."
+
+
+def _blocking_flush_function() -> Optional[Callable[[], None]]:
+    """
+    Return a flush that waits until the pending log data has reached the sink.
+
+    rerun-sdk 0.18 has no public blocking flush; `rerun_bindings.flush` is its
+    internal API and may change in any release, so on other versions None is
+    returned up front instead of failing mid-run.
+    """
+    try:
+        import rerun_bindings
+    except ImportError:
+        return None
+    if not rr.__version__.startswith(FLUSH_SDK_VERSION) or not hasattr(rerun_bindings, "flush"):
+        return None
+    return lambda: rerun_bindings.flush(blocking=True)
+
+
+@dataclass
+class AdaptiveBounds:
+    """Limits within which the adaptive controller moves the image settings."""
+    min_quality: int = 5
+    max_quality: int = 60
+    min_scale: float = 0.25
+    max_scale: float = 1.0
+    quality_step: int = 5
+    scale_step: float = 0.8
+    target_rate: Optional[int] = None  # bytes/s toward the sink, only latency is used if None
+    interval: int = 10  # frames between measurements
+    recover_after: int = 3  # measurements with headroom before stepping up
+
+
+class AdaptiveQualityController:
+    """
+    Adjust JPEG quality and image scale to the measured sink throughput.
+
+    Every `interval` frames the pending log data is flushed to the sink with a
+    blocking flush. The flush time is the logging latency: a sink that cannot
+    keep up makes the flush wait for the link to drain. The bytes logged since
+    the previous measurement divided by the wall time give the throughput.
+
+    When the sink is saturated (latency above half the interval, or image
+    throughput above the target rate) quality is lowered first, then the scale.
+    After several measurements with plenty of headroom the scale is restored
+    first, then the quality. The chosen values are logged under 'Adaptive' as
+    time series.
+
+    Without the blocking flush (other rerun-sdk versions) the latency cannot
+    be measured; the settings then only follow the target rate.
+    """
+
+    def __init__(self, quality: int, bounds: Optional[AdaptiveBounds] = None):
+        """
+        Args:
+            quality: Initial JPEG quality, clamped to the bounds
+            bounds: Limits and step sizes of the adjustments
+        """
+        self.bounds = bounds or AdaptiveBounds()
+        self.quality = min(max(quality, self.bounds.min_quality), self.bounds.max_quality)
+        self.scale = self.bounds.max_scale
+        self.throughput = 0.0
+        self.latency = 0.0
+        self._bytes = 0
+        self._frames = 0
+        self._headroom = 0
+        self._since = time.perf_counter()
+        self._flush = _blocking_flush_function()
+        if self._flush is None:
+            print(f"Warning: rerun-sdk {rr.__version__} has no blocking flush (needs {FLUSH_SDK_VERSION}x), "
+                  f"adaptive quality only follows the target rate"
+                  + ("" if self.bounds.target_rate is not None else ", which is not set"))
+
+    def add_bytes(self, n_bytes: int) -> None:
+        """Account for image data logged toward the sink."""
+        self._bytes += n_bytes
+
+    def frame_logged(self) -> None:
+        """Call after every logged frame; measures and adapts once per interval."""
+        self._frames += 1
+        if self._frames < self.bounds.interval:
+            return
+
+        flush_start = time.perf_counter()
+        if self._flush is not None:
+            self._flush()
+        now = time.perf_counter()
+
+        elapsed = max(now - self._since, 1e-6)
+        self.latency = now - flush_start
+        self.throughput = self._bytes / elapsed
+        self._adapt(saturated=self.latency > 0.5 * elapsed
+                    or (self.bounds.target_rate is not None and self.throughput > self.bounds.target_rate),
+                    headroom=self.latency < 0.1 * elapsed
+                    and (self.bounds.target_rate is None or self.throughput < 0.7 * self.bounds.target_rate))
+        self._log_state()
+
+        self._bytes = 0
+        self._frames = 0
+        self._since = time.perf_counter()
+
+    def _adapt(self, saturated: bool, headroom: bool) -> None:
+        b = self.bounds
+        self._headroom = self._headroom + 1 if headroom else 0
+        if saturated:
+            if self.quality > b.min_quality:
+                self.quality = max(b.min_quality, self.quality - b.quality_step)
+            elif self.scale > b.min_scale:
+                self.scale = max(b.min_scale, self.scale * b.scale_step)
+        elif self._headroom >= b.recover_after:
+            self._headroom = 0
+            if self.scale < b.max_scale:
+                self.scale = min(b.max_scale, self.scale / b.scale_step)
+            elif self.quality < b.max_quality:
+                self.quality = min(b.max_quality, self.quality + b.quality_step)
+
+    def _log_state(self) -> None:
+        rr.log("Adaptive/quality", rr.Scalar(self.quality))
+        rr.log("Adaptive/scale", rr.Scalar(self.scale))
+        rr.log("Adaptive/throughput_kbps", rr.Scalar(self.throughput / 1024))
+        rr.log("Adaptive/latency_ms", rr.Scalar(self.latency * 1000))
+
+    def output_size(self, width: int, height: int) -> Tuple[int, int]:
+        """Size of a frame after applying the current scale."""
+        return max(2, int(round(width * self.scale))), max(2, int(round(height * self.scale)))
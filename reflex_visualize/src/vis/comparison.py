@@ -0,0 +1,255 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import rerun as rr
+
+from ..core.data_types import ComparisonConfig
+from ..core.video import VideoSource
+from ..data_io.archive import DataPath, as_data_path
+from ..data_io.frame_table import load_frame_table
+from ..data_io.readers import VideoReader
+from .encoding import FRAME_BUFFERS, encode_jpeg
+from .layouts import create_comparison_rrb
+from .lists import negative_emotions, positive_emotions
+
+COMPARISON_APPLICATION = "REFLEX-Comparison"
+
+# Shared timeline: seconds since the onset of the compared failure
+ONSET_TIMELINE = "onset"
+
+# Series colour of every participant of a strategy
+STRATEGY_COLORS = {
+    "C1": (31, 119, 180),
+    "C2": (44, 160, 44),
+    "C3": (148, 103, 189),
+    "D1": (255, 127, 14),
+    "D2": (214, 39, 40),
+}
+
+
+def participant_sort_key(code: str) -> Tuple[str, int]:
+    """Order participants by strategy, then by number (C1-2 before C1-10)."""
+    strategy, _, number = code.partition("-")
+    return strategy, int(number) if number.isdigit() else 0
+
+
+def failure_onset(table: pd.DataFrame, round_no: int, action: str) -> Optional[Tuple[int, float]]:
+    """
+    Find the first frame of the Failure phase of a round and action.
+
+    Args:
+        table: Frame table of a participant
+        round_no: Round number
+        action: Action of the round (Pick, Carry, Place)
+
+    Returns:
+        (frame, seconds) of the onset, or None if the participant has no such phase
+    """
+    if not {'Round No.', 'Action', 'State'} <= set(table.columns):
+        return None
+    failure = table[(table['Round No.'] == round_no) & (table['Action'] == action) & (table['State'] == 'Failure')]
+    if failure.empty:
+        return None
+    first = failure.iloc[0]
+    return int(first['Frame']), float(first['Seconds'])
+
+
+def _send_scalars(entity_path: str, times: npt.NDArray[np.float64], values: npt.NDArray) -> None:
+    """Log a whole series at once, leaving out the frames without a value."""
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return
+    rr.send_columns(entity_path, times=[rr.TimeSecondsColumn(ONSET_TIMELINE, times[valid])],
+                    components=[rr.components.ScalarBatch(values[valid])])
+
+
+def _send_label_runs(entity_path: str, times: npt.NDArray[np.float64], labels: pd.Series,
+                     empty_text: str) -> None:
+    """Log a text document at every frame whose label differs from the previous frame."""
+    texts = np.array([f"# {label}" if pd.notna(label) else empty_text for label in labels], dtype=object)
+    if not len(texts):
+        return
+    changes = np.concatenate(([0], np.flatnonzero(texts[1:] != texts[:-1]) + 1))
+    rr.send_columns(
+        entity_path,
+        times=[rr.TimeSecondsColumn(ONSET_TIMELINE, times[changes])],
+        components=[
+            rr.TextDocument.indicator(),
+            rr.components.TextBatch(list(texts[changes])),
+            rr.components.MediaTypeBatch([rr.MediaType.MARKDOWN] * len(changes)),
+        ],
+    )
+
+
+def _log_thumbnails(entity_path: str, video_path: DataPath, frames: npt.NDArray[np.int64],
+                    times: npt.NDArray[np.float64], config: ComparisonConfig) -> int:
+    """Decode the frames of the window at thumbnail size and log them as JPEGs, returning the count."""
+    native_width = VideoReader(video_path).read()['width']
+    scale = min(1.0, config.thumbnail_width / native_width) if native_width else 1.0
+    seconds = dict(zip(frames.tolist(), times.tolist()))
+    logged = 0
+    with VideoSource(video_path, backend=config.decoder, scale=scale, pixel_format="bgr",
+                     buffers=FRAME_BUFFERS) as video:
+        video.seek(int(frames[0]) - 1)
+        for frame in video.stream():
+            frame_id = frame.id_ + 1
+            if frame_id > frames[-1]:
+                break
+            if frame_id not in seconds:
+                continue
+            rr.set_time_seconds(ONSET_TIMELINE, seconds[frame_id])
+            rr.log(entity_path, encode_jpeg(frame.data, config.jpeg_quality))
+            logged += 1
+    return logged
+
+
+def log_participant(code: str, data_path: DataPath, config: ComparisonConfig, output: Path,
+                    recording_id: str) -> Optional[str]:
+    """
+    Log the onset-aligned window of one participant into its own .rrd file.
+
+    Every stream is logged under 'participants/<code>' on the shared onset
+    timeline; the files of all participants share one recording ID so that
+    they merge into a single recording.
+
+    Args:
+        code: Participant code
+        data_path: Participant folder
+        config: Comparison configuration
+        output: .rrd file to write
+        recording_id: Recording ID shared by all participants
+
+    Returns:
+        None if the participant was logged, otherwise why it was skipped
+    """
+    table = load_frame_table(data_path, participant_code=code)
+    onset = failure_onset(table, config.round_no, config.action)
+    if onset is None:
+        return f"no Round {config.round_no} {config.action} failure"
+    onset_frame, onset_seconds = onset
+
+    offsets = table['Seconds'].to_numpy(dtype=np.float64) - onset_seconds
+    window = (offsets >= -config.before) & (offsets <= config.after)
+    rows = table[window]
+    times = offsets[window]
+
+    # Each participant is its own process-wide recording; files merge by the shared ID
+    rr.init(COMPARISON_APPLICATION, recording_id=recording_id)
+    rr.save(output)
+    prefix = f"participants/{code}"
+    try:
+        rr.log(f"{prefix}/info", rr.TextDocument(
+            f"# {code}\nRound {config.round_no} {config.action} failure at frame {onset_frame}",
+            media_type=rr.MediaType.MARKDOWN), static=True)
+
+        color = STRATEGY_COLORS.get(code[:2])
+        for name in ('Valence', 'Arousal'):
+            if name in rows.columns:
+                rr.log(f"{prefix}/Affect/{name}", rr.SeriesLine(color=color, name=f"{code} {name}"), static=True)
+                _send_scalars(f"{prefix}/Affect/{name}", times, rows[name].to_numpy())
+
+        for group, emotions in (("Positive", positive_emotions), ("Negative", negative_emotions)):
+            for emotion in emotions:
+                if emotion in rows.columns:
+                    entity_path = f"{prefix}/{group}/{rr.escape_entity_path_part(emotion)}"
+                    _send_scalars(entity_path, times, rows[emotion].to_numpy())
+
+        if 'State' in rows.columns:
+            _send_label_runs(f"{prefix}/Phase", times, rows['State'], "Outside the analysis phases")
+        if 'Gaze' in rows.columns:
+            _send_label_runs(f"{prefix}/Gaze", times, rows['Gaze'], "No gaze classification")
+
+        video_path = data_path / "video_cam1.mp4"
+        if config.video and video_path.is_file() and len(rows):
+            _log_thumbnails(f"{prefix}/video", video_path, rows['Frame'].to_numpy(dtype=np.int64),
+                            times, config)
+    finally:
+        rr.disconnect()  # Flushes and closes the file sink
+    return None
+
+
+def _comparison_task(args) -> Tuple[str, Optional[str]]:
+    code, data_path, config, output, recording_id = args
+    try:
+        return code, log_participant(code, data_path, config, output, recording_id)
+    except (ValueError, OSError, KeyError) as e:
+        return code, str(e)
+
+
+def merge_recordings(parts: Sequence[Path], output: Path) -> None:
+    """Merge .rrd files into one with the rerun CLI."""
+    output.unlink(missing_ok=True)
+    result = subprocess.run([sys.executable, "-m", "rerun", "rrd", "merge", "-o", str(output), *map(str, parts)],
+                            stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    # The CLI skips unreadable inputs and can exit with 0 without writing the output
+    if result.returncode != 0 or not output.is_file():
+        raise RuntimeError(f"Could not merge recordings into {output}: {result.stderr.strip()}")
+
+
+def build_comparison(participant_folders: Dict[str, Union[str, Path, DataPath]], output: Union[str, Path],
+                     config: Optional[ComparisonConfig] = None) -> List[str]:
+    """
+    Log several participants around the same failure into one recording.
+
+    Participants are loaded and logged in a process pool, in the order of
+    participant_folders, each into a temporary .rrd file; the files are then
+    merged into the output together with a grid blueprint of the
+    participants that have the failure, ordered by strategy and number.
+
+    Args:
+        participant_folders: Mapping of participant code to folder
+        output: Merged .rrd file
+        config: Comparison configuration, defaults to Round 1 Pick
+
+    Returns:
+        Codes of the participants in the recording
+    """
+    config = config or ComparisonConfig()
+    output = Path(output)
+    recording_id = str(uuid.uuid4())
+    codes = list(participant_folders)  # Submitted in the given order, e.g. largest first
+
+    start = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix="reflex_compare_") as tmp_dir:
+        parts = {code: Path(tmp_dir) / f"{code}.rrd" for code in codes}
+        tasks = [(code, as_data_path(participant_folders[code]), config, parts[code], recording_id)
+                 for code in codes]
+
+        done = []
+        with ProcessPoolExecutor(max_workers=max(1, config.workers)) as pool:
+            futures = [pool.submit(_comparison_task, task) for task in tasks]
+            for future in as_completed(futures):
+                code, error = future.result()
+                if error:
+                    print(f"Warning: Skipping {code}: {error}")
+                else:
+                    done.append(code)
+        if not done:
+            return []
+        done.sort(key=participant_sort_key)
+
+        # The blueprint only knows the logged participants once the pool is done
+        blueprint_part = Path(tmp_dir) / "blueprint.rrd"
+        rr.init(COMPARISON_APPLICATION, recording_id=recording_id)
+        rr.save(blueprint_part, default_blueprint=create_comparison_rrb(done, video=config.video))
+        rr.disconnect()
+
+        merged = Path(tmp_dir) / "merged.rrd"
+        merge_recordings([blueprint_part, *(parts[code] for code in done)], merged)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        shutil.move(merged, output)
+
+    print(f"Compared {len(done)} participants around Round {config.round_no} {config.action} "
+          f"in {time.perf_counter() - start:.1f}s")
+    return done
@@ -0,0 +1,113 @@
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+import rerun as rr
+
+from ..core.video import VideoSource
+
+# Buffers per video source: the frame being logged and the look-ahead frames of a growing video
+FRAME_BUFFERS = 3
+
+# Decoding setups compared by benchmark_frame_path
+FRAME_PATHS = {
+    'allocating': dict(pixel_format="rgb", buffers=0),
+    'pooled': dict(pixel_format="bgr", buffers=FRAME_BUFFERS),
+}
+
+
+def encode_jpeg(image: npt.NDArray[np.uint8], quality: int) -> rr.EncodedImage:
+    """
+    JPEG-encode a BGR frame for logging.
+
+    OpenCV encodes BGR natively, so the frame needs neither a colour
+    conversion nor the copy into an rr.Image that rr.Image.compress makes.
+
+    Args:
+        image: BGR image
+        quality: JPEG quality (1-100)
+
+    Returns:
+        EncodedImage holding the JPEG bytes
+    """
+    success, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, int(quality)])
+    if not success:
+        raise ValueError("Failed to encode frame as JPEG")
+    return rr.EncodedImage(contents=encoded, media_type="image/jpeg")
+
+
+def _encode(image: npt.NDArray[np.uint8], pixel_format: str, quality: int):
+    if pixel_format == "rgb":
+        return rr.Image(image).compress(jpeg_quality=quality)
+    return encode_jpeg(image, quality)
+
+
+def _run_frame_path(path: Path, n_frames: int, quality: int, trace: bool, **options) -> Dict[str, float]:
+    pixel_format = options["pixel_format"]
+    decoded = 0
+    transient = 0
+    with VideoSource(path, **options) as video:
+        frames = video.stream()
+        start = time.perf_counter()
+        while decoded < n_frames:
+            if trace:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+            frame = next(frames, None)
+            if frame is None:
+                break
+            _encode(frame.data, pixel_format, quality)
+            if trace:
+                transient += tracemalloc.get_traced_memory()[1] - baseline
+            decoded += 1
+        elapsed = time.perf_counter() - start
+        # Without a pool every decoded frame is a new array
+        buffers = video.pool.allocations if video.pool is not None else decoded
+    return {'fps': decoded / elapsed if elapsed else 0.0, 'frames': decoded, 'buffers': buffers,
+            'transient': transient / decoded if decoded else 0.0}
+
+
+def benchmark_frame_path(path: Union[str, Path], n_frames: int = 300, backends: Optional[List[str]] = None,
+                         quality: int = 15, **options) -> Dict[str, Dict[str, Dict[str, float]]]:
+    """
+    Compare decoding and JPEG encoding with a new array per frame against pooled buffers.
+
+    Every setup of FRAME_PATHS runs twice per backend: once untraced to
+    measure the throughput and once under tracemalloc to measure the memory
+    allocated while a frame is decoded and encoded.
+
+    Args:
+        path: Video file to decode
+        n_frames: Number of frames per run
+        backends: Decoder backends to measure, all available by default
+        quality: JPEG quality
+        **options: Decoder options (scale, threads)
+
+    Returns:
+        Per backend and setup: frames/s ('fps'), frame buffers allocated
+        ('buffers') and peak bytes allocated per frame ('transient')
+    """
+    from ..core.decoders import available_backends
+
+    results = {}
+    for backend in backends or available_backends():
+        results[backend] = {}
+        for name, setup in FRAME_PATHS.items():
+            run_options = dict(options, backend=backend, **setup)
+            try:
+                result = _run_frame_path(Path(path), n_frames, quality, trace=False, **run_options)
+                tracemalloc.start()
+                try:
+                    traced = _run_frame_path(Path(path), n_frames, quality, trace=True, **run_options)
+                finally:
+                    tracemalloc.stop()
+            except (ValueError, OSError) as e:
+                print(f"Warning: Skipping decoder backend {backend}: {e}")
+                break
+            result['transient'] = traced['transient']
+            results[backend][name] = result
+    return results
@@ -0,0 +1,217 @@
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import rerun as rr
+
+from .lists import negative_emotions, positive_emotions
+
+HUME_METADATA_COLUMNS = ('Frame', 'x', 'y', 'w', 'h')
+SPEECH_METADATA_COLUMNS = ('Id', 'Text', 'BeginTime', 'EndTime', 'Confidence', 'SpeakerConfidence')
+
+ROW_HEIGHT = 12
+LABEL_WIDTH = 190
+AXIS_HEIGHT = 20
+MAX_WIDTH = 1600
+MIN_CELL_WIDTH = 4
+
+BACKGROUND = (32, 32, 32)
+MISSING = (70, 70, 70)
+TEXT_COLOR = (235, 235, 235)
+SEPARATOR_COLOR = (0, 0, 0)
+CURSOR_COLOR = (255, 255, 255)
+
+
+@dataclass
+class EmotionMatrix:
+    """
+    Emotion scores of a whole session as one matrix.
+
+    Row i holds the scores of the interval [starts[i], ends[i]]: a single
+    frame for Hume, a speech segment (in seconds) for prosody.
+    """
+    values: npt.NDArray[np.float32]  # (n_rows, n_emotions), NaN where missing
+    labels: List[str]
+    starts: npt.NDArray[np.float64]
+    ends: npt.NDArray[np.float64]
+    unit: str  # 'frame' or 'time'
+
+    @property
+    def empty(self) -> bool:
+        return self.values.size == 0
+
+    def row_at(self, position: float) -> float:
+        """
+        Fractional row index of a frame or time.
+
+        Returns:
+            i + 0.5 inside row i, or the boundary i + 1 between rows i and i + 1
+        """
+        row = int(np.searchsorted(self.starts, position, side='right')) - 1
+        if row < 0:
+            return 0.0
+        return row + 0.5 if position <= self.ends[row] else row + 1.0
+
+    def gaps(self) -> npt.NDArray[np.int64]:
+        """Indexes of the frame rows that do not directly follow the previous frame."""
+        if self.unit != 'frame':  # Pauses between speech segments are expected
+            return np.empty(0, dtype=np.int64)
+        return np.flatnonzero(self.starts[1:] > self.ends[:-1] + 1) + 1
+
+
+def _score_columns(df: pd.DataFrame, metadata: Sequence[str],
+                   keep: Callable[[str], bool] = lambda col: True) -> List[str]:
+    return [col for col in df.columns
+            if col not in metadata and keep(col) and pd.api.types.is_numeric_dtype(df[col])]
+
+
+def hume_matrix(hume: pd.DataFrame, action_units: bool = False) -> EmotionMatrix:
+    """
+    Build the (frames x emotions) matrix of the frames with Hume data.
+
+    Args:
+        hume: hume.csv rows; only the first face of every frame is used
+        action_units: Use the AU columns instead of the emotions selected in vis.lists
+
+    Returns:
+        EmotionMatrix with one row per frame, in frame order
+    """
+    if action_units:
+        columns = _score_columns(hume, HUME_METADATA_COLUMNS, lambda col: col.startswith('AU'))
+    else:
+        selected = set(positive_emotions + negative_emotions)
+        present = _score_columns(hume, HUME_METADATA_COLUMNS, lambda col: col in selected)
+        columns = [emotion for emotion in positive_emotions + negative_emotions if emotion in present]
+    if hume.empty or not columns:
+        return EmotionMatrix(np.empty((0, len(columns)), np.float32), columns,
+                             np.empty(0), np.empty(0), 'frame')
+    first = hume.sort_values('Frame', kind='stable').drop_duplicates('Frame')
+    frames = first['Frame'].to_numpy(dtype=np.float64)
+    return EmotionMatrix(first[columns].to_numpy(dtype=np.float32), columns, frames, frames, 'frame')
+
+
+def speech_matrix(speech: pd.DataFrame) -> EmotionMatrix:
+    """
+    Build the (segments x emotions) matrix of the speech prosody scores.
+
+    Args:
+        speech: speech.csv rows
+
+    Returns:
+        EmotionMatrix with one row per segment, ordered by begin time
+    """
+    columns = _score_columns(speech, SPEECH_METADATA_COLUMNS)
+    if speech.empty or not columns:
+        return EmotionMatrix(np.empty((0, len(columns)), np.float32), columns,
+                             np.empty(0), np.empty(0), 'time')
+    segments = speech.sort_values('BeginTime', kind='stable')
+    return EmotionMatrix(segments[columns].to_numpy(dtype=np.float32), columns,
+                         segments['BeginTime'].to_numpy(dtype=np.float64),
+                         segments['EndTime'].to_numpy(dtype=np.float64), 'time')
+
+
+def _resample_rows(values: npt.NDArray[np.float32], width: int) -> npt.NDArray[np.float32]:
+    """Average (or repeat) the rows of a matrix into `width` columns, ignoring NaN."""
+    n_rows = values.shape[0]
+    if n_rows <= width:
+        return values[np.arange(width) * n_rows // width]
+    starts = np.linspace(0, n_rows, width + 1).round().astype(np.int64)[:-1]
+    valid = ~np.isnan(values)
+    sums = np.add.reduceat(np.where(valid, values, 0.0), starts, axis=0)
+    counts = np.add.reduceat(valid, starts, axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan).astype(np.float32)
+
+
+def _format_position(value: float, unit: str) -> str:
+    return f"{int(value)}" if unit == 'frame' else f"{value:.0f}s"
+
+
+class Heatmap:
+    """
+    Rendered heatmap of an EmotionMatrix: emotions on the vertical axis,
+    session rows (frames or speech segments) on the horizontal axis.
+    """
+
+    def __init__(self, matrix: EmotionMatrix, max_width: int = MAX_WIDTH):
+        self.matrix = matrix
+        n_rows = matrix.values.shape[0]
+        self.width = int(min(max(n_rows, 1) * MIN_CELL_WIDTH, max_width))
+        self.height = len(matrix.labels) * ROW_HEIGHT
+        self.vmax = float(np.nanmax(matrix.values)) if np.isfinite(matrix.values).any() else 1.0
+
+    def x(self, row: float) -> float:
+        """Image x coordinate of a fractional matrix row."""
+        return LABEL_WIDTH + row * self.width / max(self.matrix.values.shape[0], 1)
+
+    def cursor(self, position: float) -> npt.NDArray[np.float32]:
+        """Vertical line over the heat area at a frame or time."""
+        x = self.x(self.matrix.row_at(position))
+        return np.array([[x, 0], [x, self.height]], dtype=np.float32)
+
+    def render(self) -> npt.NDArray[np.uint8]:
+        """
+        Draw the heatmap with the emotion names as row labels and positions as column ticks.
+
+        Returns:
+            RGB image
+        """
+        matrix = self.matrix
+        columns = _resample_rows(matrix.values, self.width).T  # (n_emotions, width)
+        scaled = np.clip(np.nan_to_num(columns / (self.vmax or 1.0), nan=0.0) * 255, 0, 255).astype(np.uint8)
+        heat = cv2.cvtColor(cv2.applyColorMap(scaled, cv2.COLORMAP_VIRIDIS), cv2.COLOR_BGR2RGB)
+        heat[np.isnan(columns)] = MISSING
+        heat = np.repeat(heat, ROW_HEIGHT, axis=0)
+
+        image = np.full((self.height + AXIS_HEIGHT, LABEL_WIDTH + self.width, 3), BACKGROUND, dtype=np.uint8)
+        image[:self.height, LABEL_WIDTH:] = heat
+        for gap in matrix.gaps():
+            x = int(round(self.x(gap)))
+            image[:self.height, max(x - 1, LABEL_WIDTH):x + 1] = SEPARATOR_COLOR
+
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        for i, label in enumerate(matrix.labels):
+            cv2.putText(image, label[:28], (4, (i + 1) * ROW_HEIGHT - 2), font, 0.35, TEXT_COLOR, 1, cv2.LINE_AA)
+        n_rows = matrix.values.shape[0]
+        free_x = LABEL_WIDTH
+        for row in np.linspace(0, n_rows - 1, min(n_rows, 6)).round().astype(int):
+            text = _format_position(matrix.starts[row], matrix.unit)
+            (text_width, _), _ = cv2.getTextSize(text, font, 0.35, 1)
+            x = min(int(self.x(row + 0.5)), image.shape[1] - text_width)
+            if x < free_x:  # Would overlap the previous tick
+                continue
+            cv2.putText(image, text, (x, self.height + AXIS_HEIGHT - 6), font, 0.35, TEXT_COLOR, 1, cv2.LINE_AA)
+            free_x = x + text_width + 8
+        cv2.putText(image, f"max {self.vmax:.2f}", (4, self.height + AXIS_HEIGHT - 6), font, 0.35,
+                    TEXT_COLOR, 1, cv2.LINE_AA)
+        return image
+
+    def log(self, entity_path: str) -> None:
+        """Log the rendered heatmap as a static PNG and the raw scores as a static tensor."""
+        success, encoded = cv2.imencode(".png", cv2.cvtColor(self.render(), cv2.COLOR_RGB2BGR))
+        if success:
+            rr.log(f"{entity_path}/image", rr.EncodedImage(contents=encoded, media_type="image/png"), static=True)
+        rr.log(f"{entity_path}/scores", rr.Tensor(self.matrix.values, dim_names=[self.matrix.unit, "emotion"]),
+               static=True)
+
+    def log_cursor(self, entity_path: str, position: float) -> None:
+        """Log the cursor of the current frame or time over the heatmap."""
+        rr.log(f"{entity_path}/image/cursor", rr.LineStrips2D([self.cursor(position)], colors=[CURSOR_COLOR]))
+
+
+def build_heatmaps(hume: Optional[pd.DataFrame], speech: Optional[pd.DataFrame]) -> List[Tuple[str, Heatmap]]:
+    """
+    Build the heatmaps of a session that has data.
+
+    Returns:
+        (entity path, Heatmap) pairs for Hume emotions, Hume AUs and speech prosody
+    """
+    matrices = []
+    if hume is not None:
+        matrices += [("Heatmaps/Hume", hume_matrix(hume)), ("Heatmaps/AUs", hume_matrix(hume, action_units=True))]
+    if speech is not None:
+        matrices.append(("Heatmaps/Speech", speech_matrix(speech)))
+    return [(path, Heatmap(matrix)) for path, matrix in matrices if not matrix.empty]
@@ -0,0 +1,178 @@
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Union
+import hashlib
+import json
+import uuid
+
+import rerun as rr
+
+from .. import __version__
+from ..data_io.archive import as_data_path
+from . import lists
+
+STATE_FILE = "layers.json"
+
+# Inputs of every layer: participant files it reads, configuration options and vis.lists selections it depends on.
+# time.csv and the frame range affect every layer since they define the timelines.
+LAYER_INPUTS: Dict[str, Dict[str, Sequence[str]]] = {
+    'base': {'files': ("video_cam2.mp4", "analysis.csv", "video_cam1.mp4"),
+             'options': ("face_3d", "body_3d", "overview", "emotion_heatmaps", "detail")},
+    'video': {'files': ("video_cam1.mp4", "video_cam2.mp4", "analysis.csv"),
+              'options': ("jpeg_quality", "video_scale", "outside_phase_fps", "phase_padding")},
+    'face': {'files': ("openface.csv",), 'options': ("face_3d", "gaze_3d", "openface_confidence", "video_scale")},
+    'body': {'files': ("body.csv", "video_cam1.mp4"), 'options': ("body_3d", "video_scale")},
+    'affect': {'files': ("facetorch.csv",), 'options': ("detail",)},
+    'hume': {'files': ("hume.csv",), 'options': ("video_scale", "emotion_heatmaps", "detail"),
+             'lists': ("positive_emotions", "negative_emotions", "aus")},
+    'speech': {'files': ("speech.csv",), 'options': ("emotion_heatmaps",), 'lists': ("speech_emotions",)},
+    'text': {'files': ("analysis.csv", "gaze.csv"), 'options': ()},
+}
+
+COMMON_FILES = ("time.csv",)
+COMMON_OPTIONS = ("start_frame", "max_frames")
+
+
+def _file_signature(path: Path) -> Optional[List[int]]:
+    """Cheap change signature of an input file (size and modification time), None if missing."""
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def layer_fingerprint(name: str, config) -> str:
+    """
+    Hash the inputs of a layer.
+
+    Args:
+        name: Layer name from LAYER_INPUTS
+        config: VisualizationConfig of the run
+
+    Returns:
+        Hex digest that changes whenever an input file, option or emotion list of the layer changes
+    """
+    inputs = LAYER_INPUTS[name]
+    files = sorted(set(COMMON_FILES) | set(inputs['files']))
+    options = sorted(set(COMMON_OPTIONS) | set(inputs['options']))
+    payload = {
+        'version': __version__,
+        'layer': name,
+        'files': {file: _file_signature(as_data_path(config.data_path) / file) for file in files},
+        'options': {option: getattr(config, option) for option in options},
+        'lists': {list_name: getattr(lists, list_name) for list_name in inputs.get('lists', ())},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class LayeredRecording:
+    """
+    Split the logged data into one .rrd file per modality.
+
+    All layers share one application and recording ID, so the viewer merges
+    them into a single recording when they are opened together. Every layer
+    stores a fingerprint of its inputs; on a re-run only the layers whose
+    fingerprint changed are rebuilt and the others are reused as they are.
+
+    Without a directory there is a single layer: everything is logged to the
+    current global recording, as in a plain run.
+    """
+
+    def __init__(self, application_id: str, directory: Optional[Union[str, Path]] = None, config=None,
+                 force: bool = False):
+        """
+        Args:
+            application_id: Rerun application ID shared by all layers
+            directory: Folder holding the layer files, None to log to the global recording
+            config: VisualizationConfig used to fingerprint the layers
+            force: Rebuild all layers even if they are up to date
+        """
+        self.application_id = application_id
+        self.directory = Path(directory) if directory is not None else None
+        self.streams: Dict[str, rr.RecordingStream] = {}
+        self.fingerprints: Dict[str, str] = {}
+        self.stale: List[str] = list(LAYER_INPUTS)
+
+        if self.directory is None:
+            return
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        state = self._read_state()
+        self.recording_id = state.get('recording_id') or str(uuid.uuid4())
+        previous = state.get('layers', {})
+        self.fingerprints = {name: layer_fingerprint(name, config) for name in LAYER_INPUTS}
+        self.stale = [
+            name for name in LAYER_INPUTS
+            if force or previous.get(name) != self.fingerprints[name] or not self.layer_path(name).is_file()
+        ]
+
+        for name in self.stale:
+            stream = rr.new_recording(application_id, recording_id=self.recording_id)
+            stream.save(self._partial_path(name))
+            self.streams[name] = stream
+
+    @property
+    def layered(self) -> bool:
+        return self.directory is not None
+
+    def _read_state(self) -> Dict[str, Any]:
+        try:
+            return json.loads((self.directory / STATE_FILE).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def layer_path(self, name: str) -> Path:
+        return self.directory / f"{name}.rrd"
+
+    def _partial_path(self, name: str) -> Path:
+        return self.directory / f"{name}.rrd.partial"
+
+    def needs(self, name: str) -> bool:
+        """Whether the layer is being rebuilt in this run."""
+        return name in self.stale
+
+    @contextmanager
+    def layer(self, name: str) -> Iterator[None]:
+        """Route rr.log calls made inside the block to the given layer."""
+        stream = self.streams.get(name)
+        if stream is None:
+            yield
+            return
+        previous = rr.set_thread_local_data_recording(stream)
+        try:
+            yield
+        finally:
+            rr.set_thread_local_data_recording(previous)
+
+    def log_layer(self, name: str, log: Callable[..., None], *args) -> None:
+        """Call a logging function inside a layer, skipping it if the layer is up to date."""
+        if name in self.stale:
+            with self.layer(name):
+                log(*args)
+
+    def set_time(self, frame: int, seconds: Optional[float] = None) -> None:
+        """Set the frame (and time) timelines of every layer being rebuilt."""
+        for stream in self.streams.values() if self.layered else [None]:
+            rr.set_time_sequence("frame", frame, recording=stream)
+            if seconds is not None:
+                rr.set_time_seconds("time", seconds, recording=stream)
+
+    def finish(self) -> None:
+        """Flush the rebuilt layers, move them into place and store their fingerprints."""
+        if not self.layered:
+            return
+
+        for name, stream in self.streams.items():
+            rr.disconnect(recording=stream)  # Flushes and closes the file sink
+            self._partial_path(name).replace(self.layer_path(name))
+        self.streams.clear()
+
+        state = {'recording_id': self.recording_id, 'layers': self.fingerprints}
+        (self.directory / STATE_FILE).write_text(json.dumps(state, indent=1))
+
+    def files(self) -> List[Path]:
+        """Layer files to open together in the viewer."""
+        if not self.layered:
+            return []
+        return [self.layer_path(name) for name in LAYER_INPUTS if self.layer_path(name).is_file()]
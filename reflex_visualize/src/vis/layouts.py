@@ -1,10 +1,43 @@
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+import math
 import rerun as rr
 import rerun.blueprint as rrb
 
 
 # For more information about Rerun Blueprint, visit: https://rerun.io/docs/concepts/blueprint
-def create_default_rrb() -> rrb.Blueprint:
+def _overview_views(overview: bool) -> list:
+    """Views of the static participant overview, if enabled."""
+    return [rrb.Spatial2DView(origin="overview", name="Overview")] if overview else []
+
+
+def _adaptive_views(adaptive: bool) -> list:
+    """Views of the adaptive streaming settings, if enabled."""
+    return [rrb.TimeSeriesView(origin="Adaptive", name="Adaptive Streaming")] if adaptive else []
+
+
+def _lod_views(lod: bool) -> list:
+    """View of the min/max envelope of the decimated series, if enabled."""
+    return [rrb.TimeSeriesView(origin="LOD", name="Series Range")] if lod else []
+
+
+def _emotion_views(heatmaps: bool) -> list:
+    """Per-emotion time series, or the session heatmaps replacing them."""
+    if heatmaps:
+        return [
+            rrb.Spatial2DView(origin="Heatmaps/Hume", name="Hume Heatmap"),
+            rrb.Spatial2DView(origin="Heatmaps/AUs", name="AU Heatmap"),
+            rrb.Spatial2DView(origin="Heatmaps/Speech", name="Speech Prosody Heatmap"),
+        ]
+    return [
+        rrb.TimeSeriesView(origin="Positive", name="Positive Emotions"),
+        rrb.TimeSeriesView(origin="Negative", name="Negative Emotions"),
+        rrb.TimeSeriesView(origin="AUs", name="AUs"),
+        rrb.TimeSeriesView(origin="Speech", name="Speech Prosody"),
+    ]
+
+
+def create_default_rrb(overview: bool = False, adaptive: bool = False, heatmaps: bool = False,
+                       lod: bool = False) -> rrb.Blueprint:
     """Create default rerun blueprint."""
     return rrb.Blueprint(
         rrb.Horizontal(
@@ -13,6 +46,7 @@ def create_default_rrb() -> rrb.Blueprint:
                     rrb.Spatial2DView(origin="cam2", name="Cam2"),
                     rrb.Spatial3DView(origin="Body3D", name="Body3D"),
                     rrb.Spatial3DView(origin="Face3D", name="Face3D"),
+                    *_overview_views(overview),
                 ),
                 rrb.Tabs(
                     rrb.Spatial2DView(origin="description", name="Failure Description"),
@@ -31,13 +65,12 @@ def create_default_rrb() -> rrb.Blueprint:
                 ),
                 rrb.Tabs(
                     rrb.TimeSeriesView(origin="Affect", name="Affect State"),
-                    rrb.TimeSeriesView(origin="Positive", name="Positive Emotions"),
-                    rrb.TimeSeriesView(origin="Negative", name="Negative Emotions"),
-                    rrb.TimeSeriesView(origin="AUs", name="AUs"),
-                    rrb.TimeSeriesView(origin="Speech", name="Speech Prosody"),
+                    *_emotion_views(heatmaps),
+                    *_lod_views(lod),
+                    *_adaptive_views(adaptive),
                 ),
                 name="More Data",
-                row_shares=[3, 1, 1],
+                row_shares=[3, 1, 2] if heatmaps else [3, 1, 1],
             ),
         ),
         rrb.BlueprintPanel(state="collapsed"),
@@ -45,7 +78,8 @@ def create_default_rrb() -> rrb.Blueprint:
         rrb.TimePanel(state="collapsed"),
     )
 
-def create_single_cam_rrb() -> rrb.Blueprint:
+def create_single_cam_rrb(overview: bool = False, adaptive: bool = False, heatmaps: bool = False,
+                          lod: bool = False) -> rrb.Blueprint:
     """Create rerun blueprint."""
     return rrb.Blueprint(
         rrb.Horizontal(
@@ -53,6 +87,7 @@ def create_single_cam_rrb() -> rrb.Blueprint:
                 rrb.Tabs(
                     rrb.Spatial3DView(origin="Body3D", name="Body3D"),
                     rrb.Spatial3DView(origin="Face3D", name="Face3D"),
+                    *_overview_views(overview),
                 ),
                 rrb.Tabs(
                     rrb.TextDocumentView(origin="Failure", name="Failure Status"),
@@ -71,16 +106,50 @@ def create_single_cam_rrb() -> rrb.Blueprint:
                 ),
                 rrb.Tabs(
                     rrb.TimeSeriesView(origin="Affect", name="Affect State"),
-                    rrb.TimeSeriesView(origin="Positive", name="Positive Emotions"),
-                    rrb.TimeSeriesView(origin="Negative", name="Negative Emotions"),
-                    rrb.TimeSeriesView(origin="AUs", name="AUs"),
-                    rrb.TimeSeriesView(origin="Speech", name="Speech Prosody"),
+                    *_emotion_views(heatmaps),
+                    *_lod_views(lod),
+                    *_adaptive_views(adaptive),
                 ),
                 name="More Data",
-                row_shares=[3, 1, 1],
+                row_shares=[3, 1, 2] if heatmaps else [3, 1, 1],
             ),
         ),
         rrb.BlueprintPanel(state="collapsed"),
         rrb.SelectionPanel(state="collapsed"),
         rrb.TimePanel(state="collapsed"),
     )
+
+def _comparison_cell(code: str, video: bool) -> rrb.Vertical:
+    """Thumbnail video and tabbed data of one participant in the comparison grid."""
+    origin = f"participants/{code}"
+    views = [rrb.Spatial2DView(origin=f"{origin}/video", name=code)] if video else []
+    views.append(rrb.Tabs(
+        rrb.TimeSeriesView(origin=f"{origin}/Affect", name="Affect State"),
+        rrb.TimeSeriesView(origin=f"{origin}/Positive", name="Positive Emotions"),
+        rrb.TimeSeriesView(origin=f"{origin}/Negative", name="Negative Emotions"),
+        rrb.TextDocumentView(origin=f"{origin}/Phase", name="Phase"),
+        rrb.TextDocumentView(origin=f"{origin}/Gaze", name="Gaze Classification"),
+        rrb.TextDocumentView(origin=f"{origin}/info", name="Info"),
+    ))
+    return rrb.Vertical(*views, name=code, row_shares=[3, 2] if video else None)
+
+
+def create_comparison_rrb(participants: List[str], video: bool = True) -> rrb.Blueprint:
+    """Create the blueprint of a multi-participant comparison: shared affect plots above a participant grid."""
+    columns = max(1, math.ceil(math.sqrt(len(participants))))
+    return rrb.Blueprint(
+        rrb.Vertical(
+            rrb.Horizontal(
+                *(rrb.TimeSeriesView(
+                    origin="participants",
+                    contents=[f"/participants/{code}/Affect/{name}" for code in participants],
+                    name=f"{name} (all participants)",
+                ) for name in ("Valence", "Arousal")),
+            ),
+            rrb.Grid(*(_comparison_cell(code, video) for code in participants), grid_columns=columns),
+            row_shares=[1, 3],
+        ),
+        rrb.BlueprintPanel(state="collapsed"),
+        rrb.SelectionPanel(state="collapsed"),
+        rrb.TimePanel(state="expanded"),
+    )
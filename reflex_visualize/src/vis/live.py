@@ -0,0 +1,258 @@
+from pathlib import Path
+from typing import Dict, Optional
+import time
+
+import numpy as np
+import pandas as pd
+import rerun as rr
+
+from ..core.data_types import VisualizationConfig
+from ..core.gaze import GazeTimeline
+from ..core.video import GrowingVideoSource
+from ..data_io.readers import AudioDataReader, FRAME_COLUMNS
+from ..data_io.tail import CSVTail
+from ..utils.helpers import get_synchronized_start
+from ..utils.memory import downcast_floats, sizeof
+from .encoding import FRAME_BUFFERS
+from .layers import LayeredRecording
+from .visualizer import GAZE_EMPTY_TEXT, DataVisualizer
+
+# Frame-indexed modalities followed in watch mode: attribute -> file
+FRAME_SOURCES = {
+    'times': "time.csv",
+    'openface': "openface.csv",
+    'body': "body.csv",
+    'hume': "hume.csv",
+    'facetorch': "facetorch.csv",
+}
+
+# Modalities kept indexed by their frame column, as in DataVisualizer
+INDEXED_SOURCES = ('times', 'openface')
+
+# Initial capacity of the time.csv buffers, doubled whenever they fill up
+TIME_BUFFER_ROWS = 4096
+
+
+class LiveVisualizer(DataVisualizer):
+    """
+    Visualize a session that is still being recorded.
+
+    Every participant file is followed with a CSVTail and the videos with a
+    GrowingVideoSource. Only rows of frames that have not been logged yet are
+    kept in memory; once a frame is logged its rows are dropped, so the cost
+    of an update depends on the newly appended data and not on the size of
+    the files.
+
+    A frame is logged once cam1 has recorded it and time.csv has reached it.
+    The other modalities are waited for up to `watch_lag` frames, so a stalled
+    file does not block the visualization.
+    """
+
+    def __init__(self, config: VisualizationConfig, recording: Optional[LayeredRecording] = None):
+        self.latest: Dict[str, int] = {}
+        # Seconds of every frame read from time.csv; unlike self.times this is never trimmed.
+        # Only the first timed_rows rows of the buffers are filled.
+        self.frame_times = np.empty(TIME_BUFFER_ROWS, dtype=np.float64)
+        self.frame_seconds = np.empty(TIME_BUFFER_ROWS, dtype=np.float64)
+        self.timed_rows = 0
+        self._gaze_started = False
+        super().__init__(config, recording)
+
+    def _load_data_files(self, data_path: Path):
+        """Start following the data files and read what has been recorded so far."""
+        self.tails = {attr: CSVTail(data_path / name) for attr, name in FRAME_SOURCES.items()}
+        self.tails['analysis'] = CSVTail(data_path / "analysis.csv")
+        self.tails['speech'] = CSVTail(data_path / "speech.csv")
+        self.tails['gaze'] = CSVTail(data_path / "gaze.csv")
+
+        for attr, name in FRAME_SOURCES.items():
+            empty = pd.DataFrame(columns=[FRAME_COLUMNS[name]])
+            setattr(self, attr, empty.set_index(FRAME_COLUMNS[name]) if attr in INDEXED_SOURCES else empty)
+        self.analysis = []
+        self.speech = []
+        self.gaze = GazeTimeline.from_frame_labels([], [])
+        self.phase_windows = np.empty((0, 2), dtype=np.int64)
+        self.heatmaps = []  # Heatmaps need the whole session
+        self.lod = None  # So do pyramids
+
+        for name in ("analysis", "times", "openface", "speech", "gaze", "body", "hume", "facetorch"):
+            self.memory.register(name, lambda attr=name: sizeof(getattr(self, attr, None)))
+
+        self._poll_data(log_gaze=False)
+
+    def _poll_data(self, log_gaze: bool = True) -> None:
+        """Append the rows written since the last poll to the pending data."""
+        for attr, name in FRAME_SOURCES.items():
+            new_rows = self.tails[attr].read_new()
+            if new_rows is None or new_rows.empty:
+                continue
+            column = FRAME_COLUMNS[name]
+            self.latest[attr] = max(self.latest.get(attr, 0), int(new_rows[column].max()))
+            if attr == 'times':
+                self._append_times(new_rows[column].to_numpy(dtype=np.float64),
+                                   new_rows['Seconds'].to_numpy(dtype=np.float64))
+            if attr != 'times':
+                new_rows = downcast_floats(new_rows)
+            if attr in INDEXED_SOURCES:
+                new_rows = new_rows.set_index(column)
+            pending = getattr(self, attr)
+            setattr(self, attr, new_rows if pending.empty else pd.concat([pending, new_rows]))
+
+        new_phases = self.tails['analysis'].read_new()
+        if new_phases is not None and not new_phases.empty:
+            self.analysis.extend(new_phases.to_dict('records'))
+
+        new_segments = self.tails['speech'].read_new()
+        if new_segments is not None and not new_segments.empty:
+            self.speech.extend(AudioDataReader.parse(new_segments))
+
+        new_gaze = self.tails['gaze'].read_new()
+        if new_gaze is not None and not new_gaze.empty:
+            self.gaze = GazeTimeline.from_dataframe(new_gaze)
+            if log_gaze:
+                self.recording.log_layer("text", self._log_gaze_classification)
+
+    def _append_times(self, frames: np.ndarray, seconds: np.ndarray) -> None:
+        """Append time.csv rows, doubling the buffers when they are full so appends stay amortised O(1)."""
+        end = self.timed_rows + len(frames)
+        if end > len(self.frame_times):
+            capacity = max(end, 2 * len(self.frame_times))
+            for attr in ('frame_times', 'frame_seconds'):
+                grown = np.empty(capacity, dtype=np.float64)
+                grown[:self.timed_rows] = getattr(self, attr)[:self.timed_rows]
+                setattr(self, attr, grown)
+        self.frame_times[self.timed_rows:end] = frames
+        self.frame_seconds[self.timed_rows:end] = seconds
+        self.timed_rows = end
+
+    def _seconds_at(self, frames: np.ndarray) -> np.ndarray:
+        """Interpolate the seconds of frames time.csv has reached, over the rows from the first of them on."""
+        times = self.frame_times[:self.timed_rows]
+        first = max(int(np.searchsorted(times, frames.min(), side='right')) - 1, 0)
+        return np.interp(frames, times[first:], self.frame_seconds[first:self.timed_rows])
+
+    def _log_gaze_classification(self):
+        """
+        Log the gaze runs read in the last poll.
+
+        Only the first call starts with the empty message at frame 1; repeating
+        it would overwrite a run starting there. Frames that time.csv has not
+        reached yet are only logged on the frame timeline instead of being
+        clamped to its last second.
+        """
+        if self.gaze.empty:
+            if self._gaze_started:
+                return
+            frames, texts = [1], [GAZE_EMPTY_TEXT]
+        else:
+            frames, texts = self._gaze_runs(placeholder=not self._gaze_started)
+        self._gaze_started = True
+
+        frames = np.asarray(frames, dtype=np.int64)
+        texts = np.asarray(texts, dtype=object)
+        if self.timed_rows:
+            timed = frames <= self.frame_times[self.timed_rows - 1]
+        else:
+            timed = np.zeros(len(frames), dtype=bool)
+        if timed.any():
+            self._send_gaze_runs(frames[timed], list(texts[timed]), self._seconds_at(frames[timed]))
+        if not timed.all():
+            self._send_gaze_runs(frames[~timed], list(texts[~timed]))
+
+    # Trimming empties the pending rows between detections; once the file is followed an
+    # empty frame means "no data for this frame", so the overlays are cleared as in a full run.
+    def _log_hume_data(self, frame):
+        if self.hume.empty and self.tails['hume'].header is not None:
+            self._clear_hume_logs()
+        else:
+            super()._log_hume_data(frame)
+
+    def _log_valence_arousal(self, frame):
+        if self.facetorch.empty and self.tails['facetorch'].header is not None:
+            rr.log("Affect", rr.Clear(recursive=True))
+        else:
+            super()._log_valence_arousal(frame)
+
+    def _trim(self, last_logged: int) -> None:
+        """Drop the pending rows of frames that have been logged."""
+        for attr, name in FRAME_SOURCES.items():
+            df = getattr(self, attr)
+            if df.empty:
+                continue
+            frames = df.index if attr in INDEXED_SOURCES else df[FRAME_COLUMNS[name]]
+            setattr(self, attr, df[frames.to_numpy() > last_logged])
+
+    def _ready_frame(self) -> int:
+        """Last frame whose data can be logged."""
+        if 'times' not in self.latest:
+            return self.config.max_frames  # Without time.csv only the video limits the progress
+        ready = self.latest['times']
+        others = [self.latest[attr] for attr in FRAME_SOURCES if attr != 'times' and attr in self.latest]
+        if others:
+            ready = min(ready, max(min(others), ready - self.config.watch_lag))
+        return ready
+
+    def _log_recorded_frames(self, cam1: GrowingVideoSource, cam2: GrowingVideoSource, next_frame: int,
+                             ready: int, final: bool = False) -> int:
+        """
+        Log the frames from next_frame up to ready that both cameras have recorded.
+
+        Args:
+            cam1: Primary camera
+            cam2: Secondary camera
+            next_frame: First frame to log
+            ready: Last frame whose data can be logged
+            final: The recording has stopped, log the frames at the end of the videos too
+
+        Returns:
+            The next frame to log
+        """
+        first_frame = next_frame
+        while next_frame <= ready:
+            frame2 = cam2.frame_at(get_synchronized_start(next_frame + 1) - 1, final)
+            if frame2 is None and self.video_cam2_found and not final:
+                break
+            frame1 = cam1.frame_at(next_frame - 1, final)
+            if frame1 is None:
+                break
+            if next_frame == first_frame:
+                self._set_overlay_scale(cam1.source)
+            frame1.id_ = next_frame
+            self.log_frame_data(frame1, frame2)
+            next_frame += 1
+        return next_frame
+
+    def log_and_visualize(self):
+        """Follow the recording and log new frames as they become available."""
+        video_options = dict(backend=self.config.decoder, scale=self.config.video_scale, pixel_format="bgr",
+                             threads=self.config.decoder_threads, buffers=FRAME_BUFFERS)
+        cam1 = GrowingVideoSource(self.video_cam1, **video_options)
+        cam2 = GrowingVideoSource(self.video_cam2, **video_options)
+
+        next_frame = self.config.start_frame
+        last_progress = time.monotonic()
+        print(f"Watching {self.config.data_path} (Ctrl+C to stop)")
+        try:
+            while next_frame <= self.config.max_frames:
+                self._poll_data()
+                self.video_cam2_found = self.video_cam2.is_file()
+                ready = min(self._ready_frame(), self.config.max_frames)
+
+                logged_until = self._log_recorded_frames(cam1, cam2, next_frame, ready)
+                if logged_until > next_frame:
+                    next_frame = logged_until
+                    self._trim(next_frame - 1)
+                    last_progress = time.monotonic()
+                elif (self.config.watch_timeout is not None
+                      and time.monotonic() - last_progress > self.config.watch_timeout):
+                    next_frame = self._log_recorded_frames(cam1, cam2, next_frame, ready, final=True)
+                    print(f"No new data for {self.config.watch_timeout:.0f}s, stopping at frame {next_frame - 1}")
+                    break
+                else:
+                    time.sleep(self.config.watch_interval)
+        except KeyboardInterrupt:
+            print(f"Stopped watching at frame {next_frame - 1}")
+        finally:
+            cam1.close()
+            cam2.close()
+            print(self.memory.breakdown())
@@ -1,24 +1,74 @@
-from typing import Dict, List, Optional
+from typing import Callable, Dict, List, Optional, Tuple
+from pathlib import Path
+import re
 import rerun as rr
 import cv2
 import numpy as np
 import pandas as pd
 
-from src.core.data_types import VisualizationConfig, VideoFrame
-from core.video import VideoSource
-from data_io.readers import AudioDataReader, CSVReader
-from utils.helpers import get_synchronized_frame
-from vis.lists import *
-from vis.layouts import create_single_cam_rrb, create_default_rrb
+from ..core.data_types import VisualizationConfig, VideoFrame
+from ..core.video import VideoSource
+from ..core.sampling import KeyframeSampler, phase_windows
+from ..data_io.modalities import LazyModality, ModalityLoader
+from ..data_io.pyramids import choose_factor, load_pyramid
+from ..data_io.readers import CSVReader
+from ..utils.helpers import get_synchronized_frame, get_synchronized_start
+from ..utils.memory import LRUCache, MemoryAccountant, sizeof
+from .lists import *
+from .layouts import create_single_cam_rrb, create_default_rrb
+from .layers import LayeredRecording
+from .adaptive import AdaptiveBounds, AdaptiveQualityController
+from .encoding import FRAME_BUFFERS, encode_jpeg
+from .heatmaps import build_heatmaps
+
+VISUALS_PATH = Path(__file__).resolve().parent.parent / "visuals"
+
+# Upper bound for the failure image cache; lowered to a fraction of a small memory budget
+IMAGE_CACHE_BYTES = 64 << 20
+
+# Layer holding each emotion heatmap
+HEATMAP_LAYERS = {"Heatmaps/Hume": "hume", "Heatmaps/AUs": "hume", "Heatmaps/Speech": "speech"}
+
+# Gaze text outside the classified runs
+GAZE_EMPTY_TEXT = "Empty (Only on Failure Phases)"
+
+# Entity path and frame table column of the facetorch affect series
+AFFECT_SERIES = [("Affect/Valence", "Valence"), ("Affect/Arousal", "Arousal")]
+
+# Modalities read by each layer; analysis.csv and time.csv are always loaded since they define the timelines
+LAYER_MODALITIES = {
+    'text': ("gaze",),
+    'speech': ("speech",),
+    'face': ("openface",),
+    'body': ("body",),
+    'affect': ("facetorch",),
+    'hume': ("hume",),
+}
 
 
 class DataVisualizer:
     """Handles visualization of multi-modal participant data."""
 
-    def __init__(self, config: VisualizationConfig):
-        """Initialize visualizer with configuration."""
+    # Loaded on first use through self.modalities
+    times = LazyModality("times")
+    openface = LazyModality("openface")
+    speech = LazyModality("speech")
+    gaze = LazyModality("gaze")
+    body = LazyModality("body")
+    hume = LazyModality("hume")
+    facetorch = LazyModality("facetorch")
+
+    def __init__(self, config: VisualizationConfig, recording: Optional[LayeredRecording] = None):
+        """
+        Initialize visualizer with configuration.
+
+        Args:
+            config: Visualization configuration
+            recording: Per-modality layer files to write, everything goes to the global recording if None
+        """
         # Store configuration
         self.config = config
+        self.recording = recording or LayeredRecording(f"Participant-{config.participant_code}")
 
         # Set up data paths
         self.video_cam1 = config.data_path / "video_cam1.mp4"
@@ -29,37 +79,170 @@ class DataVisualizer:
         if not self.video_cam2_found:
             print(f"Warning: Video 2 not found at: {self.video_cam2}")
 
+        # Track memory of every loaded modality and cache
+        self.memory = MemoryAccountant(config.memory_budget)
+
         # Load CSV data files
         self._load_data_files(config.data_path)
 
         # Initialize caches
-        self.image_cache = {}
+        cache_bytes = IMAGE_CACHE_BYTES
+        if config.memory_budget is not None:
+            cache_bytes = min(cache_bytes, config.memory_budget // 16)
+        self.image_cache = LRUCache(cache_bytes)
+        self.memory.register("image cache", lambda: self.image_cache.nbytes)
+        self.decode_scale = 1.0
+        self.overlay_scale = 1.0
+        self.image_size = (0, 0)
+
+        # Adapt image quality and scale to the sink throughput
+        self.adaptive = None
+        self._downscaled: Dict[str, np.ndarray] = {}  # Reused resize targets per camera
+        if config.adaptive_quality:
+            bounds = AdaptiveBounds(min_quality=min(config.min_jpeg_quality, config.jpeg_quality),
+                                    max_quality=config.jpeg_quality, min_scale=config.min_video_scale,
+                                    target_rate=config.target_rate)
+            self.adaptive = AdaptiveQualityController(config.jpeg_quality, bounds)
+
+        self._register_memory_shedders()
+        self.memory.enforce()
 
         # Set up Rerun visualization
         self._setup_rerun()
 
     def _load_data_files(self, data_path):
         """
-        Load all data files from the data path.
+        Load the data files needed by the layers being written.
+
+        The modalities of the stale layers are read concurrently; the others
+        are only read if something uses them. Missing files leave their
+        modality empty.
 
         Args:
             data_path (Path): Path to the data directory
         """
-        # Load analysis data - convert to records for sequential access
-        analysis_df = CSVReader(data_path / "analysis.csv").read()
+        config = self.config
+        self.modalities = ModalityLoader(data_path, config.loader_workers, config.loader,
+                                         face_3d=config.face_3d, body_3d=config.body_3d)
+        required = ["analysis", "times"]
+        for layer, names in LAYER_MODALITIES.items():
+            if self.recording.needs(layer):
+                required.extend(names)
+        self.modalities.start(required)
+        try:
+            for name in required[1:]:
+                setattr(self, name, self.modalities.get(name))
+            analysis_df = self.modalities.get("analysis")
+        finally:
+            self.modalities.close()
+        print(self.modalities.summary())
+
+        # Convert analysis data to records for sequential access
         self.analysis = analysis_df.to_dict('records') if not analysis_df.empty else []
-
-        # Load data files
-        self.times = CSVReader(data_path / "time.csv").read().set_index('Frame')
-        self.openface = CSVReader(data_path / "openface.csv").read().set_index('frame')
-        self.speech = AudioDataReader(data_path / "speech.csv").read()
-        self.gaze = CSVReader(data_path / "gaze.csv").read()
-        self.body = CSVReader(data_path / "body.csv").read()
-        self.hume = CSVReader(data_path / "hume.csv").read()
-        self.facetorch = CSVReader(data_path / "facetorch.csv").read()
+        self.phase_windows = phase_windows(analysis_df, config.phase_padding)
+
+        # Built before any Hume column can be shed, the speech segments only keep a few emotions
+        self.heatmaps = []
+        if config.emotion_heatmaps and (self.recording.needs("hume") or self.recording.needs("speech")):
+            speech_path = data_path / "speech.csv"
+            self.heatmaps = build_heatmaps(self.hume, CSVReader(speech_path).read() if speech_path.is_file() else None)
+
+        # Whole-session series are read from a cached pyramid level instead of being logged per frame
+        self.lod_factor = self._detail_factor()
+        self.lod = None
+        if self.lod_factor and (self.recording.needs("affect") or self.recording.needs("hume")):
+            series = [column for _, column in AFFECT_SERIES + self._hume_series()]
+            self.lod = load_pyramid(data_path, self.lod_factor, columns=series,
+                                    participant_code=config.participant_code)
+
+        # Modalities that have not been loaded take no memory
+        for name in ("analysis", "times", "openface", "speech", "gaze", "body", "hume", "facetorch"):
+            self.memory.register(name, lambda attr=name: sizeof(self.__dict__.get(attr)))
+        self.memory.register("heatmaps", lambda: sum(heatmap.matrix.values.nbytes for _, heatmap in self.heatmaps))
+        self.memory.register("pyramid", lambda: sizeof(self.lod))
+
+    def _detail_factor(self) -> int:
+        """Decimation factor of the logged emotion and affect series, 0 to log them per frame."""
+        detail = self.config.detail
+        if detail == "frame":
+            return 0
+        if detail == "auto":
+            last_frame = int(self.times.index.max()) if not self.times.empty else self.config.max_frames
+            return choose_factor(min(last_frame, self.config.max_frames) - self.config.start_frame + 1)
+        return int(detail)
+
+    def _hume_series(self) -> List[Tuple[str, str]]:
+        """Entity path and column of every Hume series, none when the heatmaps replace them."""
+        if self.heatmaps:
+            return []
+        return ([(f"Positive/{emotion}", emotion) for emotion in positive_emotions]
+                + [(f"Negative/{emotion}", emotion) for emotion in negative_emotions]
+                + [(f"AUs/{au.replace(' ', '')}", au) for au in aus])
+
+    def _on_modality_loaded(self, name: str) -> None:
+        """Keep a modality loaded on first use within the memory budget."""
+        self.memory.enforce()
+
+    def _drop_columns(self, attr: str, drop: Callable[[str], bool], description: str) -> Optional[str]:
+        """Drop the matching columns of a loaded DataFrame, returning a description if anything was dropped."""
+        df = self.__dict__.get(attr)
+        columns = [col for col in df.columns if drop(col)] if df is not None else []
+        if not columns:
+            return None
+        setattr(self, attr, df.drop(columns=columns))
+        return f"{description} ({len(columns)} columns)"
+
+    def _register_memory_shedders(self) -> None:
+        """Register the data that may be dropped when over the memory budget, least valuable first."""
+        if not self.config.face_3d:
+            self.memory.add_shedder(10, lambda: self._drop_columns(
+                "openface", lambda col: re.fullmatch(r"[XYZ]_\d+", col) is not None, "OpenFace 3D landmarks"))
+        if not self.config.body_3d:
+            self.memory.add_shedder(10, lambda: self._drop_columns(
+                "body", lambda col: "_3d_" in col, "body 3D keypoints"))
+
+        # With heatmaps or pyramids no per-frame emotion series is logged
+        per_frame_series = not self.heatmaps and self.lod is None
+        shown_emotions = set(positive_emotions + negative_emotions + aus) if per_frame_series else set()
+        self.memory.add_shedder(20, lambda: self._drop_columns(
+            "hume", lambda col: col not in shown_emotions and col not in ('Frame', 'x', 'y', 'w', 'h'),
+            "unused Hume emotions"))
+
+        def unused_openface_column(col):
+            return not (col in ('success', 'confidence') or col.startswith('gaze_')
+                        or re.fullmatch(r"[xy]_\d+", col) is not None
+                        or (self.config.face_3d and re.fullmatch(r"[XYZ]_\d+", col) is not None))
+
+        self.memory.add_shedder(30, lambda: self._drop_columns(
+            "openface", unused_openface_column, "unused OpenFace features"))
+
+        used_body = {f'{i}_{axis}' for i in range(11, 25) for axis in ('x', 'y')}
+        self.memory.add_shedder(30, lambda: self._drop_columns(
+            "body", lambda col: col.split('_')[0].isdigit() and col not in used_body and "_3d_" not in col,
+            "unused body keypoints"))
+
+        def shrink_image_cache():
+            freed = self.image_cache.resize(0)
+            return "failure image cache" if freed else None
+
+        self.memory.add_shedder(50, shrink_image_cache)
 
     def _setup_rerun(self) -> None:
         """Configure rerun visualization settings."""
+        self.recording.log_layer("base", self._log_static_setup)
+
+        # Gaze classification changes rarely, so it is logged once per run
+        self.recording.log_layer("text", self._log_gaze_classification)
+
+        for path, heatmap in self.heatmaps:
+            self.recording.log_layer(HEATMAP_LAYERS[path], heatmap.log, path)
+
+        if self.lod is not None:
+            self.recording.log_layer("affect", self._log_series_level, AFFECT_SERIES)
+            self.recording.log_layer("hume", self._log_series_level, self._hume_series())
+
+    def _log_static_setup(self) -> None:
+        """Log the view coordinates, annotation context and blueprint."""
         if self.config.face_3d:
             rr.log("Face3D", rr.ViewCoordinates.RIGHT_HAND_Y_DOWN, static=True)
         if self.config.body_3d:
@@ -90,22 +273,62 @@ class DataVisualizer:
             static=True,
         )
 
-        blueprint_default = create_default_rrb()
-        rr.send_blueprint(blueprint_default)
+        if self.video_cam2_found:
+            rr.send_blueprint(create_default_rrb(overview=self.config.overview,
+                                                  adaptive=self.config.adaptive_quality,
+                                                  heatmaps=self.config.emotion_heatmaps,
+                                                  lod=self.config.detail != "frame"))
+        else:
+            rr.send_blueprint(create_single_cam_rrb(overview=self.config.overview,
+                                                     adaptive=self.config.adaptive_quality,
+                                                     heatmaps=self.config.emotion_heatmaps,
+                                                     lod=self.config.detail != "frame"))
+
+        if self.config.overview:
+            self._log_overview()
+
+    def _log_overview(self) -> None:
+        """Log the cached per-phase contact sheet as a static image."""
+        from ..export.contact_sheets import load_contact_sheet
+
+        sheet = load_contact_sheet(self.config.data_path, decoder=self.config.decoder)
+        if sheet is None:
+            print("Warning: No analysis phases for the overview")
+            return
+        rr.log("overview", rr.Image(sheet).compress(jpeg_quality=80), static=True)
 
     def log_and_visualize(self):
         """Process and visualize video data from cameras."""
+        if not self.recording.stale:
+            print("All layers are up to date")
+            return
+
+        if self.recording.layered:
+            print(f"Rebuilding layers: {', '.join(self.recording.stale)}")
+        try:
+            if self.recording.needs("video"):
+                self._log_videos()
+            else:
+                self._log_without_video()
+            self.recording.finish()
+        finally:
+            print(self.memory.breakdown())
+
+    def _log_videos(self):
+        """Stream both cameras (or only cam1) and log every frame."""
         # Use single camera mode if second camera not found
         if not self.video_cam2_found:
-            blueprint_single_camera = create_single_cam_rrb()
-            rr.send_blueprint(blueprint_single_camera)
             self._process_single_camera()
             return
 
-        with VideoSource(self.video_cam1) as video_source1, \
-                VideoSource(self.video_cam2) as video_source2:
+        with self._open_video(self.video_cam1) as video_source1, \
+                self._open_video(self.video_cam2) as video_source2:
+            self._set_overlay_scale(video_source1)
+            sampler = self._create_sampler(video_source1)
+            video_source1.seek(self.config.start_frame - 1)
+            video_source2.seek(get_synchronized_start(self.config.start_frame))
 
-            for frame1 in video_source1.stream_bgr():
+            for frame1 in video_source1.stream(lambda index: sampler.keep(index + 1)):
                 # Adjust frame ID to match expected data indexing
                 frame1.id_ += 1
 
@@ -114,7 +337,7 @@ class DataVisualizer:
                     break
 
                 # Get corresponding frame from camera 2 with appropriate skipping
-                frame2 = get_synchronized_frame(video_source2, frame1.id_)
+                frame2 = get_synchronized_frame(video_source2, frame1.id_, decode=frame1.data is not None)
 
                 # Log data for this frame pair
                 self.log_frame_data(frame1, frame2)
@@ -123,8 +346,11 @@ class DataVisualizer:
         """Process and visualize data from the primary camera only."""
         print("Processing with single camera mode")
 
-        with VideoSource(self.video_cam1) as video:
-            for frame in video.stream_bgr():
+        with self._open_video(self.video_cam1) as video:
+            self._set_overlay_scale(video)
+            sampler = self._create_sampler(video)
+            video.seek(self.config.start_frame - 1)
+            for frame in video.stream(lambda index: sampler.keep(index + 1)):
                 # Adjust frame ID to match expected data indexing
                 frame.id_ += 1
 
@@ -135,34 +361,105 @@ class DataVisualizer:
                 # Log data for this frame
                 self.log_frame_data(frame)
 
-    def log_frame_data(self, frame1: VideoFrame, frame2: VideoFrame = None) -> None:
-        """Log data for a single frame across all modalities."""
-        rr.set_time_sequence("frame", frame1.id_)
-
+    def _log_without_video(self):
+        """Log the modalities of every frame without decoding, when the video layer is up to date."""
+        with self._open_video(self.video_cam1) as video:
+            self._set_overlay_scale(video)
+            width, height = self.image_size
+            last_frame = min(self.config.max_frames, video.get_frame_count())
+
+        for frame_id in range(self.config.start_frame, last_frame + 1):
+            time_in_secs = self._set_frame_time(frame_id)
+            self._log_modalities(frame_id, time_in_secs, height, width)
+
+    def _open_video(self, path) -> VideoSource:
+        """Open a video decoding BGR frames at the configured scale into a small ring of reused buffers."""
+        return VideoSource(path, backend=self.config.decoder, scale=self.config.video_scale,
+                           pixel_format="bgr", threads=self.config.decoder_threads, buffers=FRAME_BUFFERS)
+
+    def _set_overlay_scale(self, video: VideoSource) -> None:
+        """Scale pixel-space overlays (face landmarks, boxes) to the decoded frame size."""
+        native_width = video.decoder.frame_size[0]
+        self.image_size = video.get_frame_size()
+        self.decode_scale = self.image_size[0] / native_width if native_width else 1.0
+        self.overlay_scale = self.decode_scale
+
+    def _create_sampler(self, video: VideoSource) -> KeyframeSampler:
+        """Sample the images at full rate inside the analysis phases and decimated elsewhere."""
+        sampler = KeyframeSampler(self.phase_windows, video.get_fps(), self.config.outside_phase_fps)
+        if sampler.step > 1:
+            last_frame = min(self.config.max_frames, video.get_frame_count())
+            kept = int(sampler.keep_mask(np.arange(self.config.start_frame, last_frame + 1)).sum())
+            print(f"Keyframe sampling: logging {kept} of {max(last_frame - self.config.start_frame + 1, 0)} "
+                  f"images (1 in {sampler.step} outside the analysis phases)")
+        return sampler
+
+    def _set_frame_time(self, frame: int) -> float:
+        """Set the timelines of a frame, returning its time in seconds or -1 if unknown."""
         try:
-            time_in_secs = self.times.loc[frame1.id_, 'Seconds']
-            rr.set_time_seconds("time", time_in_secs)
+            time_in_secs = self.times.loc[frame, 'Seconds']
         except KeyError:
-            time_in_secs = -1.0
-
-        rgb = cv2.cvtColor(frame1.data, cv2.COLOR_BGR2RGB)
-        rr.log("video/image",
-               rr.Image(rgb).compress(jpeg_quality=self.config.jpeg_quality))
-        height, width, _ = rgb.shape
+            self.recording.set_time(frame)
+            return -1.0
+        self.recording.set_time(frame, time_in_secs)
+        return time_in_secs
 
+    def log_frame_data(self, frame1: VideoFrame, frame2: VideoFrame = None) -> None:
+        """Log data for a single frame across all modalities."""
+        time_in_secs = self._set_frame_time(frame1.id_)
+        if frame1.data is not None:
+            if self.adaptive is not None:
+                frame1 = self._downscale(frame1, "cam1")
+                frame2 = self._downscale(frame2, "cam2")
+                self.overlay_scale = self.decode_scale * self.adaptive.scale
+            self.recording.log_layer("video", self._log_images, frame1, frame2)
+            self.image_size = (frame1.data.shape[1], frame1.data.shape[0])
+
+        # Frames skipped by the sampler keep the overlay scale of the last logged image
+        width, height = self.image_size
+        self._log_modalities(frame1.id_, time_in_secs, height, width)
+
+        if self.adaptive is not None:
+            self.adaptive.frame_logged()
+
+    def _downscale(self, frame: Optional[VideoFrame], camera: str) -> Optional[VideoFrame]:
+        """Resize a frame by the current adaptive scale into the reused buffer of its camera."""
+        if frame is None or frame.data is None or self.adaptive.scale >= 1.0:
+            return frame
+        height, width = frame.data.shape[:2]
+        out_width, out_height = self.adaptive.output_size(width, height)
+        target = self._downscaled.get(camera)
+        if target is None or target.shape != (out_height, out_width, 3):
+            target = self._downscaled[camera] = np.empty((out_height, out_width, 3), dtype=np.uint8)
+        frame.data = cv2.resize(frame.data, (out_width, out_height), dst=target, interpolation=cv2.INTER_AREA)
+        return frame
+
+    def _log_images(self, frame1: VideoFrame, frame2: VideoFrame = None) -> None:
+        """Log the camera images; BGR frames are JPEG-encoded without a colour conversion."""
+        quality = self.adaptive.quality if self.adaptive is not None else self.config.jpeg_quality
+        images = [("video/image", frame1)]
         if frame2 and frame2.data is not None:
-            rgb = cv2.cvtColor(frame2.data, cv2.COLOR_BGR2RGB)
-            rr.log("cam2/image",
-                   rr.Image(rgb).compress(jpeg_quality=self.config.jpeg_quality))
-
-        # Log various data modalities
-        self._log_failure(frame1.id_)
-        self._log_transcript(time_in_secs)
-        self._log_face_and_gaze(frame1.id_)
-        self._log_gaze_classification(frame1.id_)
-        self._log_body_pose(frame1.id_, height, width)
-        self._log_valence_arousal(frame1.id_)
-        self._log_hume_data(frame1.id_)
+            images.append(("cam2/image", frame2))
+
+        for path, frame in images:
+            encoded = encode_jpeg(frame.data, quality)
+            if self.adaptive is not None:
+                self.adaptive.add_bytes(encoded.blob.as_arrow_array().nbytes)
+            rr.log(path, encoded)
+
+    def _log_modalities(self, frame: int, time_in_secs: float, height: int, width: int) -> None:
+        """Log the non-video modalities of a frame, each into its own layer."""
+        layers = self.recording
+        layers.log_layer("text", self._log_failure, frame)
+        layers.log_layer("speech", self._log_transcript, time_in_secs)
+        layers.log_layer("face", self._log_face_and_gaze, frame)
+        layers.log_layer("body", self._log_body_pose, frame, height, width)
+        layers.log_layer("affect", self._log_valence_arousal, frame)
+        layers.log_layer("hume", self._log_hume_data, frame)
+        for path, heatmap in self.heatmaps:
+            position = frame if heatmap.matrix.unit == 'frame' else time_in_secs
+            if position >= 0:
+                layers.log_layer(HEATMAP_LAYERS[path], heatmap.log_cursor, path, position)
 
     def _log_failure(self, frame):
         """
@@ -175,7 +472,7 @@ class DataVisualizer:
         def log_no_failure():
             """Display the 'No Failure' message and empty image."""
             rr.log("Failure", rr.TextDocument("# No Failure", media_type=rr.MediaType.MARKDOWN))
-            image_ = get_failure_image(f"visuals/empty.png")
+            image_ = get_failure_image(VISUALS_PATH / "empty.png")
             if image_ is not None:
                 rr.log("description", rr.Image(image_).compress(jpeg_quality=15))
 
@@ -184,16 +481,16 @@ class DataVisualizer:
                 img = self.image_cache[image_path]
             else:
                 try:
-                    img = cv2.imread(image_path)
+                    img = cv2.imread(str(image_path))
                     if img is not None:
                         self.image_cache[image_path] = img  # Cache the image for future use
                     else:  # Fall back to empty image
-                        fallback_path = "visuals/empty.png"
-                        if fallback_path not in self.image_cache:
-                            fallback_image = cv2.imread(fallback_path)
-                            if fallback_image is not None:
-                                self.image_cache[fallback_path] = fallback_image
+                        fallback_path = VISUALS_PATH / "empty.png"
                         img = self.image_cache.get(fallback_path)
+                        if img is None:
+                            img = cv2.imread(str(fallback_path))
+                            if img is not None:
+                                self.image_cache[fallback_path] = img
                 except Exception as e:
                     return
             return img
@@ -206,8 +503,8 @@ class DataVisualizer:
         # Get current phase
         current_phase = self.analysis[0]
 
-        # Check if we've passed the current phase
-        if frame > current_phase['End Frame']:
+        # Skip all phases we have passed (more than one when starting mid-session)
+        while frame > current_phase['End Frame']:
             # Remove the current phase and move to the next one
             self.analysis.pop(0)
 
@@ -233,7 +530,7 @@ class DataVisualizer:
             image_name = f"{action.lower()}{chosen}"
 
             # Load and log the appropriate image
-            image = get_failure_image(f"visuals/{image_name}.png")
+            image = get_failure_image(VISUALS_PATH / f"{image_name}.png")
             if image is not None:
                 rr.log("description", rr.Image(image).compress(jpeg_quality=20))
         else:
@@ -259,8 +556,8 @@ class DataVisualizer:
         # Process current speech segment
         current_speech = self.speech[0]
 
-        # If we've passed the current speech segment, remove it and get the next one
-        if frame_time > current_speech['end']:
+        # Remove all speech segments we have passed and get the next one
+        while frame_time > current_speech['end']:
             self.speech.pop(0)
 
             # If no more speech segments, clear displays and return
@@ -278,8 +575,8 @@ class DataVisualizer:
             text = f"### {current_speech['text']} \n ({speaker})"
             rr.log("Transcript", rr.TextDocument(text, media_type=rr.MediaType.MARKDOWN))
 
-            # Log all emotion values
-            for emotion in speech_emotions:
+            # Log all emotion values, unless the static heatmaps show them
+            for emotion in speech_emotions if not self.heatmaps else ():
                 rr.log(f"Speech/{emotion}", rr.Scalar(current_speech[emotion]))
         else:
             # We're not in any active speech segment, clear displays
@@ -352,7 +649,7 @@ class DataVisualizer:
                 face_y = [frame_data[f'y_{i}'] for i in range(68) if f'y_{i}' in frame_data]
 
                 if face_x and face_y:
-                    face_pairs = list(zip(face_x, face_y))
+                    face_pairs = np.column_stack((face_x, face_y)) * self.overlay_scale
                     rr.log("video/face", rr.Points2D(face_pairs))
             except Exception as e:
                 print(f"Error logging 2D face data: {e}")
@@ -369,9 +666,6 @@ class DataVisualizer:
             print(f"Error logging 2D eye gaze data: {e}")
             rr.log("video/gaze", rr.Clear(recursive=True))
 
-            # Filter for current frame
-            frame_data = self.gaze[self.gaze['Frame'] == frame]
-
         # Log 3D face data if configured
         if self.config.face_3d:
             try:
@@ -400,31 +694,62 @@ class DataVisualizer:
                 print(f"Error logging 3D eye gaze data: {e}")
                 rr.log("Gaze3D", rr.Clear(recursive=True))
 
-    def _log_gaze_classification(self, frame):
+    def _log_gaze_classification(self):
         """
-        Log gaze classification data for the current frame.
+        Log the gaze classification runs as intervals.
 
-        Args:
-            frame (int): The current frame number
+        Each run is logged once at its first frame, followed by an empty message
+        at the first frame after it unless the next run starts right away.
         """
-        # Check if we have the gaze classification DataFrame
+        # Check if we have the gaze classification runs
         if not hasattr(self, 'gaze') or self.gaze is None or self.gaze.empty:
+            rr.log("Gaze", rr.TextDocument(GAZE_EMPTY_TEXT, media_type=rr.MediaType.MARKDOWN), static=True)
             return
 
-        # Filter for current frame
-        frame_data = self.gaze[self.gaze['Frame'] == frame]
+        frames, texts = self._gaze_runs()
+        seconds = None
+        if not self.times.empty:
+            seconds = np.interp(frames, self.times.index.to_numpy(dtype=float),
+                                self.times['Seconds'].to_numpy(dtype=float))
+        self._send_gaze_runs(frames, texts, seconds)
 
-        if not frame_data.empty:
-            # Get gaze classification text
-            gaze_text = frame_data.iloc[0]['Gaze']
+    def _gaze_runs(self, placeholder: bool = True) -> Tuple[List[int], List[str]]:
+        """
+        Frames and texts of the gaze runs and the empty messages between them.
 
-            # Format and log the text
-            text = f"# {gaze_text}"
-            rr.log("Gaze", rr.TextDocument(text, media_type=rr.MediaType.MARKDOWN))
-        else:
-            # Clear visualization if no data for this frame
-            text = "Empty (Only on Failure Phases)"
-            rr.log("Gaze", rr.TextDocument(text, media_type=rr.MediaType.MARKDOWN))
+        Args:
+            placeholder: Start with the empty message at frame 1
+        """
+        frames = [1] if placeholder else []
+        texts = [GAZE_EMPTY_TEXT] if placeholder else []
+        for start, end, code in zip(self.gaze.starts, self.gaze.ends, self.gaze.codes):
+            if start > self.config.max_frames:
+                break
+            if frames and frames[-1] == start:  # Replace the empty message the run starts on
+                frames.pop()
+                texts.pop()
+            frames.append(int(start))
+            texts.append(f"# {self.gaze.labels[code]}")
+            frames.append(int(end) + 1)
+            texts.append(GAZE_EMPTY_TEXT)
+        return frames, texts
+
+    @staticmethod
+    def _send_gaze_runs(frames: List[int], texts: List[str], seconds: Optional[np.ndarray] = None) -> None:
+        """Log gaze texts at their frames, and on the time timeline if their seconds are given."""
+        times = [rr.TimeSequenceColumn("frame", frames)]
+        if seconds is not None:
+            times.append(rr.TimeSecondsColumn("time", seconds))
+
+        rr.send_columns(
+            "Gaze",
+            times=times,
+            components=[
+                rr.TextDocument.indicator(),
+                rr.components.TextBatch(texts),
+                rr.components.MediaTypeBatch([rr.MediaType.MARKDOWN] * len(texts)),
+            ],
+        )
 
     def _log_body_pose(self, frame, height, width):
         """
@@ -525,6 +850,42 @@ class DataVisualizer:
 
         rr.log("body", rr.TextDocument(text, media_type=rr.MediaType.MARKDOWN))
 
+    def _log_series_level(self, series: List[Tuple[str, str]]) -> None:
+        """
+        Log whole-session series from the pyramid level at once.
+
+        The bin means take the place of the per-frame values at the usual
+        entity paths, one point at the first frame of every bin; the min/max
+        envelope of the bins goes to 'LOD/x<factor>/<path>/min' and '.../max'.
+
+        Args:
+            series: Entity path and frame table column of every series
+        """
+        level = self.lod
+        level = level[(level['Frame'] >= self.config.start_frame) & (level['Frame'] <= self.config.max_frames)]
+        frames = level['Frame'].to_numpy(dtype=np.int64)
+        if not len(frames):
+            return
+        seconds = None
+        if not self.times.empty:
+            seconds = np.interp(frames, self.times.index.to_numpy(dtype=float),
+                                self.times['Seconds'].to_numpy(dtype=float))
+
+        for path, column in series:
+            targets = (("mean", path), ("min", f"LOD/x{self.lod_factor}/{path}/min"),
+                       ("max", f"LOD/x{self.lod_factor}/{path}/max"))
+            for statistic, entity_path in targets:
+                if f"{column}:{statistic}" not in level.columns:
+                    break
+                values = level[f"{column}:{statistic}"].to_numpy(dtype=np.float64)
+                valid = ~np.isnan(values)
+                if not valid.any():
+                    continue
+                times = [rr.TimeSequenceColumn("frame", frames[valid])]
+                if seconds is not None:
+                    times.append(rr.TimeSecondsColumn("time", seconds[valid]))
+                rr.send_columns(entity_path, times=times, components=[rr.components.ScalarBatch(values[valid])])
+
     def _log_valence_arousal(self, frame):
         """
         Log valence and arousal data for the current frame.
@@ -532,6 +893,9 @@ class DataVisualizer:
         Args:
             frame (int): The current frame number
         """
+        if self.lod is not None:  # Logged for the whole session from the pyramid
+            return
+
         # Check if we have the FaceTorch DataFrame
         if not hasattr(self, 'facetorch') or self.facetorch is None or self.facetorch.empty:
             return
@@ -561,6 +925,14 @@ class DataVisualizer:
             # Clear visualization if no data for this frame
             rr.log("Affect", rr.Clear(recursive=True))
 
+    def _clear_hume_logs(self):
+        """Clear all Hume data visualizations."""
+        # Series logged for the whole session from the pyramid are not cleared per frame
+        log_paths = ["video/box"] if self.lod is not None else ["Positive", "Negative", "AUs", "video/box"]
+
+        for path in log_paths:
+            rr.log(path, rr.Clear(recursive=True))
+
     def _log_hume_data(self, frame):
         """
         Log Hume emotion detection data for the current frame.
@@ -568,14 +940,6 @@ class DataVisualizer:
         Args:
             frame (int): The current frame number
         """
-
-        def clear_hume_logs():
-            """Clear all Hume data visualizations."""
-            log_paths = ["Positive", "Negative", "AUs", "video/box"]
-
-            for path in log_paths:
-                rr.log(path, rr.Clear(recursive=True))
-
         # Check if we have the Hume DataFrame
         if not hasattr(self, 'hume') or self.hume is None or self.hume.empty:
             return
@@ -589,12 +953,15 @@ class DataVisualizer:
 
             try:
                 # Log bounding box
-                box = np.array([[row['x'], row['y'], row['w'], row['h']]], dtype=float)
+                box = np.array([[row['x'], row['y'], row['w'], row['h']]], dtype=float) * self.overlay_scale
                 rr.log(
                     "video/box",
                     rr.Boxes2D(array=box, array_format=rr.Box2DFormat.XYWH),
                 )
 
+                if self.heatmaps or self.lod is not None:  # The scores are logged for the whole session
+                    return
+
                 # Log positive emotions
                 for emotion in positive_emotions:
                     if emotion in row:
@@ -612,7 +979,7 @@ class DataVisualizer:
                         rr.log(f"AUs/{au_name}", rr.Scalar(float(row[au])))
 
             except (ValueError, KeyError, TypeError) as e:
-                clear_hume_logs()
+                self._clear_hume_logs()
         else:
             # Clear visualizations if no data for this frame
-            clear_hume_logs()
+            self._clear_hume_logs()
@@ -0,0 +1,91 @@
+"""Adaptive quality against a local bandwidth-limited sink."""
+import time
+
+import cv2
+import numpy as np
+import pytest
+import rerun as rr
+
+from src.utils.sink import ThrottledSink
+from src.vis import adaptive
+from src.vis.adaptive import AdaptiveBounds, AdaptiveQualityController
+from src.vis.encoding import encode_jpeg
+
+# Noise compresses badly, so the frames keep the link busy at any quality
+WIDTH, HEIGHT = 1280, 720
+IMAGE = np.random.default_rng(0).integers(0, 256, (HEIGHT, WIDTH, 3), dtype=np.uint8)
+
+# Measurements allowed for the settings to settle
+MAX_MEASUREMENTS = 40
+
+# Pause between frames standing in for decoding, so the fixed cost of a flush does not look like latency
+FRAME_INTERVAL = 0.01
+
+
+def bounds(**overrides) -> AdaptiveBounds:
+    settings = dict(min_quality=5, max_quality=30, quality_step=10, min_scale=0.25, scale_step=0.5,
+                    interval=5)
+    settings.update(overrides)
+    return AdaptiveBounds(**settings)
+
+
+@pytest.fixture
+def sink():
+    sink = ThrottledSink(port=0, rate=600_000).start()
+    rr.init("adaptive-test", spawn=False)
+    rr.connect(f"127.0.0.1:{sink.address[1]}")
+    yield sink
+    rr.disconnect()
+    sink.close()
+
+
+def log_frame(controller: AdaptiveQualityController, width: int = WIDTH, height: int = HEIGHT) -> None:
+    """Log one frame at the current settings, as DataVisualizer does."""
+    image = IMAGE[:height, :width]
+    if controller.scale < 1.0:
+        image = cv2.resize(image, controller.output_size(width, height), interpolation=cv2.INTER_AREA)
+    encoded = encode_jpeg(image, controller.quality)
+    controller.add_bytes(encoded.blob.as_arrow_array().nbytes)
+    rr.log("video/image", encoded)
+    controller.frame_logged()
+
+
+def measure_until(controller: AdaptiveQualityController, done, frame_interval: float = FRAME_INTERVAL,
+                  **frame) -> bool:
+    """Log frames until done() holds after a measurement; False if it never does."""
+    for _ in range(MAX_MEASUREMENTS):
+        for _ in range(controller.bounds.interval):
+            log_frame(controller, **frame)
+            time.sleep(frame_interval)
+        if done():
+            return True
+    return False
+
+
+def test_slow_sink_lowers_then_restores_the_settings(sink):
+    controller = AdaptiveQualityController(30, bounds())
+    assert controller._flush is not None
+
+    assert measure_until(controller, lambda: controller.scale < 1.0), (controller.quality, controller.scale)
+    assert controller.quality == controller.bounds.min_quality  # Quality is lowered before the scale
+
+    sink.rate = None
+    assert measure_until(controller, lambda: controller.quality == 30), (controller.quality, controller.scale)
+    assert controller.scale == 1.0  # The scale is restored before the quality
+    assert sink.received > 0
+
+
+def test_without_blocking_flush_the_target_rate_is_followed(sink, monkeypatch, capsys):
+    monkeypatch.setattr(adaptive, "_blocking_flush_function", lambda: None)
+    controller = AdaptiveQualityController(30, bounds(target_rate=200_000))
+    assert "only follows the target rate" in capsys.readouterr().out
+
+    # About 50 frames per second of 320x240 noise is over the target until the scale drops
+    frame = dict(frame_interval=0.02, width=320, height=240)
+    assert measure_until(controller, lambda: controller.scale < 1.0, **frame), (controller.quality, controller.scale)
+    assert controller.quality == controller.bounds.min_quality
+    assert controller.latency < 0.01  # Nothing is flushed
+
+    controller.bounds.target_rate = 10_000_000
+    assert measure_until(controller, lambda: controller.quality == 30, **frame), (controller.quality, controller.scale)
+    assert controller.scale == 1.0
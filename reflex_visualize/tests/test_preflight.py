@@ -0,0 +1,129 @@
+"""Preflight validation of participant folders, on small synthetic folders with a real video."""
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+
+import cv2
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_io.preflight import ERROR, WARNING, has_errors, validate_participant
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+VIDEO_FRAMES = 60
+
+# (state, start frame, end frame) of the synthetic phases
+PHASES = [('Action', 5, 20), ('Failure', 20, 40), ('Explanation', 40, 55)]
+
+
+def write_video(path: Path, frames: int) -> None:
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), 30, (64, 48))
+    for i in range(frames):
+        writer.write(np.full((48, 64, 3), i % 256, dtype=np.uint8))
+    writer.release()
+
+
+def write_participant(folder: Path) -> Path:
+    """Write a participant folder that passes every check."""
+    folder.mkdir(parents=True)
+    frames = np.arange(1, VIDEO_FRAMES + 1)
+    in_phases = frames[(frames >= PHASES[0][1]) & (frames <= PHASES[-1][2])]
+
+    pd.DataFrame({'Frame': frames, 'Seconds': frames / 30}).to_csv(folder / "time.csv", index=False)
+    pd.DataFrame([{'Round No.': 1, 'Object': 'Cup', 'Action': 'Pick', 'Explanation Level': 'Low', 'State': state,
+                   'Start Frame': start, 'End Frame': end} for state, start, end in PHASES]).to_csv(
+        folder / "analysis.csv", index=False)
+    pd.DataFrame({'Frame': in_phases, 'Gaze': 'Robot'}).to_csv(folder / "gaze.csv", index=False)
+    pd.DataFrame({'Frame ID': frames, 'FER Label': 'Neutral', 'Valence': 0.1, 'Arousal': 0.2}).to_csv(
+        folder / "facetorch.csv", index=False)
+    pd.DataFrame({'Frame': in_phases, 'x': 1, 'y': 2, 'w': 3, 'h': 4, 'Anger': 0.5}).to_csv(
+        folder / "hume.csv", index=False)
+    pd.DataFrame({'frame': frames, 'success': 1, 'confidence': 0.9}).to_csv(folder / "openface.csv", index=False)
+    pd.DataFrame({'Frame': frames, '11_x': 1.0}).to_csv(folder / "body.csv", index=False)
+    pd.DataFrame({'Id': ['P'], 'Text': ['Hello'], 'BeginTime': [0.0], 'EndTime': [1.0]}).to_csv(
+        folder / "speech.csv", index=False)
+    write_video(folder / "video_cam1.mp4", VIDEO_FRAMES)
+    shutil.copy(folder / "video_cam1.mp4", folder / "video_cam2.mp4")
+    return folder
+
+
+def edit_csv(path: Path, edit) -> None:
+    table = pd.read_csv(path, dtype=str)
+    edit(table)
+    table.to_csv(path, index=False)
+
+
+def set_cell(path: Path, row: int, column: str, value: str) -> None:
+    def edit(table):
+        table.loc[row, column] = value
+
+    edit_csv(path, edit)
+
+
+def issues_by_file(issues):
+    return [(issue.file, issue.severity, issue.message) for issue in issues]
+
+
+def assert_reported_once(issues, file: str, severity: str, text: str) -> None:
+    matches = [issue for issue in issues if issue.file == file and text in issue.message]
+    assert len(matches) == 1, issues_by_file(issues)
+    assert matches[0].severity == severity
+
+
+@pytest.fixture
+def participant(tmp_path):
+    return write_participant(tmp_path / "C1-Fixed-Low" / "C1-1")
+
+
+def test_clean_folder_has_no_issues(participant):
+    assert validate_participant(participant) == []
+
+
+def test_all_issues_are_reported_together(participant):
+    def break_time(table):
+        table.loc[[10, 11], 'Frame'] = table.loc[[11, 10], 'Frame'].to_numpy()  # Frames 12 and 11 swapped
+        table.loc[30, 'Frame'] = "abc"
+
+    edit_csv(participant / "time.csv", break_time)
+    edit_csv(participant / "facetorch.csv", lambda table: table.rename(columns={'Frame ID': 'Frame'}, inplace=True))
+    set_cell(participant / "analysis.csv", 2, 'End Frame', '80')
+    set_cell(participant / "hume.csv", 0, 'Frame', '2')
+
+    issues = validate_participant(participant)
+    assert has_errors(issues)
+    assert_reported_once(issues, "facetorch.csv", ERROR, "Column 'Frame ID' is missing (found 'Frame')")
+    assert_reported_once(issues, "time.csv", ERROR, "Frame is not strictly increasing at line 13")
+    assert_reported_once(issues, "time.csv", ERROR, "Frame is not a number at line 32")
+    assert_reported_once(issues, "analysis.csv", ERROR, f"Phase ends after the last cam1 frame ({VIDEO_FRAMES}) "
+                                                        f"at line 4")
+    assert_reported_once(issues, "hume.csv", WARNING, "1 rows outside the analysis phases, at line 2")
+
+    # Nothing else: the non-numeric cell is neither empty nor out of order, the other files are fine
+    assert len(issues) == 5, issues_by_file(issues)
+    assert [issue.severity for issue in issues] == sorted((issue.severity for issue in issues),
+                                                          key=lambda severity: severity != ERROR)
+
+
+def test_missing_required_file_is_reported_with_the_others(participant):
+    (participant / "analysis.csv").unlink()
+    set_cell(participant / "time.csv", 5, 'Seconds', '0.2.1')
+
+    issues = validate_participant(participant)
+    assert_reported_once(issues, "analysis.csv", ERROR, "File is missing")
+    assert_reported_once(issues, "time.csv", ERROR, "Seconds is not a number at line 7")
+    assert len(issues) == 2, issues_by_file(issues)
+
+
+def test_list_ok_prints_only_codes(tmp_path):
+    write_participant(tmp_path / "C1-Fixed-Low" / "C1-1")
+    broken = write_participant(tmp_path / "C1-Fixed-Low" / "C1-2")
+    (broken / "time.csv").unlink()
+
+    result = subprocess.run([sys.executable, "-m", "src.preflight", "--data-root", str(tmp_path), "--list-ok",
+                             "--workers", "1"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 1
+    assert result.stdout.splitlines() == ["C1-1"]
+    assert "Checked 2 participants" in result.stderr
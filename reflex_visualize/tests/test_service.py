@@ -0,0 +1,155 @@
+"""The local data service under many parallel clients, with an LRU cache smaller than the dataset."""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import json
+import random
+import threading
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_io.service import FrameServer, FrameService
+
+CLIENTS = 16
+REQUESTS = 400
+HUME_EMOTIONS = ['Anger', 'Joy']
+
+# Phases of every synthetic participant: (round, action, state, start frame, end frame)
+PHASES = [(1, 'Pick', 'Action', 10, 60), (1, 'Pick', 'Failure', 60, 120), (1, 'Pick', 'Explanation', 120, 200)]
+
+
+def frame_count(index: int) -> int:
+    return 250 + 50 * index
+
+
+def write_participant(folder: Path, index: int) -> None:
+    """Write a small participant whose values are functions of the frame number."""
+    folder.mkdir(parents=True)
+    frames = np.arange(1, frame_count(index) + 1)
+    pd.DataFrame({'Frame': frames, 'Seconds': frames / 30}).to_csv(folder / "time.csv", index=False)
+    pd.DataFrame([{'Round No.': round_no, 'Object': 'Cup', 'Action': action, 'Explanation Level': 'Low',
+                   'State': state, 'Start Frame': start, 'End Frame': end}
+                  for round_no, action, state, start, end in PHASES]).to_csv(folder / "analysis.csv", index=False)
+
+    in_phases = frames[(frames >= PHASES[0][3]) & (frames <= PHASES[-1][4])]
+    pd.DataFrame({'Frame': in_phases, 'Gaze': np.where(in_phases % 20 < 10, 'Robot', 'Table')}).to_csv(
+        folder / "gaze.csv", index=False)
+    pd.DataFrame({'Frame ID': frames, 'FER Label': 'Neutral', 'Valence': frames / 1000,
+                  'Arousal': -frames / 1000}).to_csv(folder / "facetorch.csv", index=False)
+    hume = pd.DataFrame({'Frame': in_phases, 'x': 10, 'y': 20, 'w': 30, 'h': 40})
+    for k, emotion in enumerate(HUME_EMOTIONS):
+        hume[emotion] = (in_phases % 100) / 100 + k
+    hume.to_csv(folder / "hume.csv", index=False)
+    pd.DataFrame({'frame': frames, 'success': 1, 'confidence': frames / 10000, 'x_0': frames * 2.0,
+                  'y_0': frames * 3.0}).to_csv(folder / "openface.csv", index=False)
+    pd.DataFrame({'Frame': frames, '11_x': frames * 4.0, '11_y': frames * 5.0}).to_csv(
+        folder / "body.csv", index=False)
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    root = tmp_path_factory.mktemp("Dataset")
+    folders = {}
+    for index in range(4):
+        code = f"C1-{index + 1}"
+        folders[code] = root / "C1-Fixed-Low" / code
+        write_participant(folders[code], index)
+
+    # Loads fine, but its openface.csv has no frame column and only fails once requested
+    folders["C2-1"] = root / "C2-Fixed-Medium" / "C2-1"
+    write_participant(folders["C2-1"], 0)
+    pd.DataFrame({'success': [1, 1], 'confidence': [0.9, 0.9]}).to_csv(folders["C2-1"] / "openface.csv",
+                                                                        index=False)
+    return folders
+
+
+@pytest.fixture(scope="module")
+def server(dataset):
+    server = FrameServer(("127.0.0.1", 0), FrameService(dataset, max_participants=1))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, target: str):
+    """Return the status and decoded JSON body of a request."""
+    url = f"http://127.0.0.1:{server.server_address[1]}{target}"
+    try:
+        with urllib.request.urlopen(url, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def check_frames(server, code: str, index: int, start: int, end: int) -> None:
+    status, body = get(server, f"/participants/{code}/frames/{start}:{end}?modalities=hume,openface,body,phase")
+    assert status == 200, body
+    last = min(end, frame_count(index))
+    assert body['rows'] == max(last - start + 1, 0)
+
+    rows = body['frames']
+    assert [row['Frame'] for row in rows] == list(range(start, last + 1))
+    for row in rows:
+        frame = row['Frame']
+        assert row['Seconds'] == pytest.approx(frame / 30, rel=1e-5)
+        assert row['openface.confidence'] == pytest.approx(frame / 10000, rel=1e-3)
+        assert row['body.11_x'] == pytest.approx(frame * 4.0, rel=1e-3)
+        assert 'Valence' not in row  # facetorch was not requested
+        if PHASES[0][3] <= frame <= PHASES[-1][4]:
+            assert row['Joy'] == pytest.approx((frame % 100) / 100 + 1, rel=1e-3)
+            assert row['State'] is not None
+        else:
+            assert row['Joy'] is None
+            assert row['State'] is None
+
+
+def check_phases(server, code: str) -> None:
+    status, body = get(server, f"/participants/{code}/phases")
+    assert status == 200, body
+    assert [(phase['State'], phase['Start Frame']) for phase in body['phases']] == \
+        [(state, start) for _, _, state, start, _ in PHASES]
+
+
+def test_parallel_clients_during_eviction(server):
+    codes = [f"C1-{index + 1}" for index in range(4)]
+    rng = random.Random(0)
+    requests = []
+    for _ in range(REQUESTS):
+        index = rng.randrange(len(codes))
+        start = rng.randrange(1, frame_count(index) + 40)
+        requests.append((index, start, start + rng.randrange(0, 80), rng.random() < 0.2))
+
+    def run(request):
+        index, start, end, phases = request
+        if phases:
+            check_phases(server, codes[index])
+        else:
+            check_frames(server, codes[index], index, start, end)
+
+    with ThreadPoolExecutor(max_workers=CLIENTS) as pool:
+        list(pool.map(run, requests))
+
+    status, body = get(server, "/participants")
+    assert status == 200
+    assert len(body['loaded']) == 1  # Every other participant was evicted along the way
+
+
+def test_malformed_file_is_a_server_error(server):
+    status, body = get(server, "/participants/C2-1/frames/1:10?modalities=openface")
+    assert status == 500
+    assert "C2-1" in body['error']
+
+    # The participant's other data and the server itself keep working
+    status, body = get(server, "/participants/C2-1/frames/1:10?modalities=body")
+    assert status == 200 and body['rows'] == 10
+
+
+def test_request_errors(server):
+    assert get(server, "/participants/Z9-1")[0] == 404
+    assert get(server, "/participants/C1-1/frames/20:10")[0] == 400
+    assert get(server, "/participants/C1-1/frames/1:10?modalities=smell")[0] == 400
@@ -0,0 +1,70 @@
+"""Startup cost of the visualization entry point, measured with `python -X importtime`."""
+from pathlib import Path
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Cumulative import time allowed before --help or an argument error is printed
+IMPORT_BUDGET_MS = 300
+
+# Only imported once the arguments are known to be valid
+HEAVY_MODULES = ("numpy", "pandas", "cv2", "rerun")
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def run_with_importtime(*args: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-X", "importtime", "-m", "src.main", *args],
+                          cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60)
+
+
+def parse_importtime(stderr: str):
+    """Return the imported module names and the total cumulative import time in milliseconds."""
+    modules = []
+    total_us = 0
+    for line in stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        modules.append(module)
+        if not indent:  # Top-level imports already include their nested imports
+            total_us += int(cumulative)
+    return modules, total_us / 1000
+
+
+@pytest.mark.parametrize("args, returncode", [
+    (["--help"], 0),
+    (["--participant", "Z9-1"], 2),
+])
+def test_startup_is_light(args, returncode):
+    result = run_with_importtime(*args)
+    assert result.returncode == returncode
+
+    modules, total_ms = parse_importtime(result.stderr)
+    assert "src.utils.helpers" in modules
+    heavy = sorted({module for module in modules if module.split(".")[0] in HEAVY_MODULES})
+    assert not heavy, f"Heavy modules imported before validation: {heavy}"
+    assert total_ms < IMPORT_BUDGET_MS, f"Imports took {total_ms:.0f} ms, budget is {IMPORT_BUDGET_MS} ms"
+
+
+def test_invalid_participant_is_reported():
+    result = run_with_importtime("--participant", "Z9-1")
+    assert "Invalid participant code: Z9-1" in result.stderr
+
+
+def test_missing_ffmpeg_is_an_argument_error(tmp_path):
+    folder = tmp_path / "C1-Fixed-Low" / "C1-1"
+    folder.mkdir(parents=True)
+    (folder / "video_cam1.mp4").touch()
+
+    result = subprocess.run([sys.executable, "-m", "src.main", "--participant", "C1-1", "--data-root", str(tmp_path),
+                             "--decoder", "ffmpeg"], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=60,
+                            env={**os.environ, "PATH": str(tmp_path)})
+    assert result.returncode == 2
+    assert "--decoder ffmpeg is not available on this host (ffmpeg is not on PATH)" in result.stderr